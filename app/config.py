@@ -1,6 +1,6 @@
 # app/config.py
 from functools import lru_cache
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -11,21 +11,119 @@ class Settings(BaseSettings):
 
     # DB URL – for now SQLite local
     DATABASE_URL: str = "sqlite:///./app.db"
+    # Async routes; derived from DATABASE_URL (aiosqlite / asyncpg) if unset
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Optional read replica for read-only routes (app/db/routing.py)
+    DATABASE_REPLICA_URL: Optional[str] = None
+    ASYNC_DATABASE_REPLICA_URL: Optional[str] = None
+    # Run Base.metadata.create_all when the app starts (default: only when
+    # ENV == "dev"); elsewhere create the schema with `python -m scripts.init_db`
+    DB_CREATE_SCHEMA_ON_STARTUP: Optional[bool] = None
+
+    # Connection pool (app/db/session.py); ignored for in-memory SQLite
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 10.0
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # -1 = never
+
+    # Pragmas applied to every SQLite connection
+    SQLITE_WAL: bool = True
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 64 * 1024 * 1024  # bytes; 0 = off
 
     # Twilio config
     TWILIO_ACCOUNT_SID: Optional[str] = None
     TWILIO_AUTH_TOKEN: Optional[str] = None
     TWILIO_PHONE_NUMBER: Optional[str] = None  # our Twilio caller ID
     TWILIO_WEBHOOK_SECRET: Optional[str] = None
+    # Public origin Twilio calls, if a proxy changes scheme/host (signatures)
+    TWILIO_WEBHOOK_BASE_URL: Optional[str] = None
 
     # NEW: where Twilio should fetch TwiML for the call
     TWILIO_VOICE_WEBHOOK_URL: Optional[str] = None
 
+    # Write-behind buffer for /twilio/status callbacks
+    TWILIO_STATUS_BUFFER_ENABLED: bool = True
+    TWILIO_STATUS_FLUSH_INTERVAL_MS: int = 50
+    TWILIO_STATUS_FLUSH_MAX_BATCH: int = 200
+    TWILIO_STATUS_BUFFER_MAX_PENDING: int = 10_000
+    # Failed batch flushes in a row before the batch is written call by call
+    TWILIO_STATUS_FLUSH_MAX_ATTEMPTS: int = 3
+
+    # Fold call_events into the call-stats rollup tables this often from
+    # the app (0 = only via `python -m scripts.rollup_call_events`)
+    CALL_EVENTS_ROLLUP_INTERVAL_SECONDS: float = 30.0
+
+    # In-process cache of per-call context for the voice webhooks
+    CALL_CONTEXT_TTL_SECONDS: int = 3600
+    CALL_CONTEXT_MAX_ENTRIES: int = 50_000
+
+    # Call scripts pre-generated at campaign creation
+    CALL_SCRIPT_TTL_SECONDS: int = 7 * 86_400
+    CALL_SCRIPT_MAX_ENTRIES: int = 100_000
+
+    # Replay cached responses to Twilio webhook retries
+    WEBHOOK_IDEMPOTENCY_TTL_SECONDS: int = 600
+    WEBHOOK_IDEMPOTENCY_MAX_ENTRIES: int = 20_000
+    # Also share responses across workers via the webhook_responses table
+    WEBHOOK_IDEMPOTENCY_SHARED: bool = False
+    # How often the app deletes expired shared rows (0 = only via
+    # `python -m scripts.purge_webhook_responses`)
+    WEBHOOK_IDEMPOTENCY_PURGE_INTERVAL_SECONDS: float = 300.0
+
+    # Cache of LLM-parsed /constraints/parse answers (memory LRU + SQLite file)
+    CONSTRAINTS_CACHE_ENABLED: bool = True
+    CONSTRAINTS_CACHE_PATH: Optional[str] = "./.cache/constraints_llm.sqlite3"
+    CONSTRAINTS_CACHE_TTL_SECONDS: int = 86_400
+    CONSTRAINTS_CACHE_MAX_ENTRIES: int = 1024
+
+    # Per-request SQL statement counting (app/db/query_stats.py): response
+    # headers (default: on when ENV == "dev"), N+1 warnings, and failing
+    # requests that exceed their @query_budget (for tests / CI)
+    SQL_QUERY_HEADERS: Optional[bool] = None
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
+    SQL_QUERY_BUDGET_STRICT: bool = False
+
+    # Micro-batch async transcript parses into multi-item LLM requests
+    OPENAI_BATCH_ENABLED: bool = False
+    OPENAI_BATCH_MAX_WAIT_MS: int = 20
+    OPENAI_BATCH_MAX_SIZE: int = 16
+    OPENAI_BATCH_MAX_QUEUE: int = 500
+    OPENAI_BATCH_MAX_CONCURRENCY: int = 4
+
+    # Spoken availability: trust the local grammar parser at or above this
+    # confidence and only ask OpenAI below it
+    AVAILABILITY_GRAMMAR_MIN_CONFIDENCE: float = 0.8
+
     # NEW: OpenAI integration (optional)
     # This will happily read OPENAI_API_KEY or openai_api_key from the env.
     openai_api_key: Optional[str] = None
     enable_openai: bool = False  # gate so tests never call OpenAI by accident
     openai_model: str = "gpt-4.1-mini"  # can be changed later
+    # Max time /twilio/voice/gather waits on the LLM before answering with
+    # the deterministic fallback (the parse keeps refining in the background)
+    openai_gather_budget_seconds: float = 2.5
+    openai_gather_refine_timeout_seconds: float = 30.0
+    # On shutdown, wait this long for background refinements to finish
+    # writing before cancelling them
+    openai_gather_refine_drain_seconds: float = 10.0
+    # Shared client (app/services/llm_client.py): pooling, timeouts, retries
+    openai_timeout_seconds: float = 20.0
+    openai_connect_timeout_seconds: float = 5.0
+    openai_max_retries: int = 2
+    openai_max_connections: int = 50
+    openai_max_keepalive_connections: int = 20
+    openai_keepalive_expiry_seconds: float = 60.0
+    # Circuit breaker per call site (app/services/llm_resilience.py): open after
+    # N consecutive failures or slow answers, skip the LLM for the cooldown
+    openai_call_timeout_seconds: float = 8.0
+    openai_breaker_failure_threshold: int = 5
+    openai_breaker_slow_call_seconds: float = 5.0
+    openai_breaker_cooldown_seconds: float = 30.0
+    # Async calls: send a duplicate request after this long (0 = never)
+    openai_hedge_after_seconds: float = 0.0
 
     model_config = SettingsConfigDict(
         env_file=".env",
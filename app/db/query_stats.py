@@ -0,0 +1,170 @@
+# app/db/query_stats.py
+"""
+Per-request SQL statement counting and N+1 detection.
+
+SQLAlchemy cursor events add every statement (and its time) to the
+QueryStats of the current request, found through a ContextVar that
+QueryStatsMiddleware sets; FastAPI runs sync endpoints in a threadpool
+with a copy of that context, so both sync and async handlers are covered.
+
+Per request:
+  - in dev (or with SQL_QUERY_HEADERS), X-DB-Query-Count / X-DB-Time-Ms /
+    X-DB-Repeated-Statements response headers
+  - a warning when one statement runs SQL_N_PLUS_ONE_THRESHOLD+ times
+    (the shape of a query-per-row loop)
+  - with SQL_QUERY_BUDGET_STRICT, QueryBudgetExceeded if the route ran
+    more statements than its @query_budget(n), so tests fail on regressions;
+    raised before the response starts, so the client gets the 500 (and the
+    test client the exception). Statements run after that (background
+    tasks) can only be logged.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import get_settings
+from app.services.app_metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable)
+
+_BUDGET_ATTR = "__query_budget__"
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A route ran more SQL statements than its declared budget."""
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    total_seconds: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """
+        Statements executed at least `threshold` times, most frequent first.
+        """
+        return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def query_budget(max_queries: int) -> Callable[[F], F]:
+    """
+    Declare how many SQL statements a route may run; enforced in strict mode.
+
+        @router.get("/{id}")
+        @query_budget(3)
+        def get_thing(...): ...
+    """
+
+    def decorate(fn: F) -> F:
+        setattr(fn, _BUDGET_ATTR, max_queries)
+        return fn
+
+    return decorate
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        # A connection runs one statement at a time
+        conn.info["query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    started = conn.info.pop("query_started", None)
+    if started is None:
+        return
+    stats.count += 1
+    stats.total_seconds += time.perf_counter() - started
+    stats.statements[statement] += 1
+
+
+def instrument_engine_queries(engine: Engine) -> None:
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """
+    Pure ASGI middleware collecting QueryStats for each HTTP request.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        settings = get_settings()
+        headers_on = settings.SQL_QUERY_HEADERS
+        if headers_on is None:
+            headers_on = settings.ENV == "dev"
+        threshold = settings.SQL_N_PLUS_ONE_THRESHOLD
+
+        strict = settings.SQL_QUERY_BUDGET_STRICT
+        stats = QueryStats()
+        token = _current.set(stats)
+
+        def over_budget() -> Optional[str]:
+            budget = getattr(scope.get("endpoint"), _BUDGET_ATTR, None)
+            if budget is None or stats.count <= budget:
+                return None
+            path = route_template(scope) or scope["path"]
+            return f"{scope['method']} {path} ran {stats.count} SQL statements (budget {budget})"
+
+        async def send_wrapper(message: Message) -> None:
+            if strict and message["type"] == "http.response.start":
+                exceeded = over_budget()
+                if exceeded:
+                    raise QueryBudgetExceeded(exceeded)
+            # Headers go out before the body, so only statements run by
+            # then (i.e. the handler's, not background tasks') are counted
+            if headers_on and message["type"] == "http.response.start":
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-db-query-count", str(stats.count).encode()),
+                    (b"x-db-time-ms", f"{stats.total_seconds * 1000:.2f}".encode()),
+                    (b"x-db-repeated-statements", str(len(stats.repeated(threshold))).encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+
+        path = route_template(scope) or scope["path"]
+        for sql, n in stats.repeated(threshold):
+            logger.warning(
+                "Possible N+1 in %s %s: statement ran %d times: %s",
+                scope["method"], path, n, sql.splitlines()[0][:200],
+            )
+
+        exceeded = over_budget()
+        if exceeded and strict:
+            # The response is already out; failing now would only reach the log
+            logger.warning("Query budget exceeded after the response started: %s", exceeded)
@@ -0,0 +1,178 @@
+# app/db/routing.py
+"""
+Read/write routing between the primary database and a read replica.
+
+With DATABASE_REPLICA_URL set, read-heavy routes depend on get_read_db /
+get_async_read_db instead of get_db / get_async_db. Their sessions are
+RoutingSessions:
+
+  - SELECTs go to the replica
+  - flushes and INSERT / UPDATE / DELETE statements go to the primary
+  - once anything in the current request (or this session) has written
+    to the primary, later reads go to the primary too, so a request
+    never reads its own write back from a replica that hasn't caught up
+
+Without a replica URL the read dependencies are just the primary ones.
+
+The per-request "has written" flag is set by a cursor hook on every
+engine (register_engine_hook(mark_request_writes)) inside a request scope
+opened by ReadAfterWriteMiddleware; like query stats, FastAPI's threadpool
+copies the ContextVar, so sync and async routes share the same flag.
+"""
+from __future__ import annotations
+
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import Delete, Insert, Update, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.db import session as db_session
+
+_READ_PREFIXES = ("SELECT", "PRAGMA", "WITH", "EXPLAIN")
+
+
+class _RequestWrites:
+    __slots__ = ("wrote",)
+
+    def __init__(self):
+        self.wrote = False
+
+
+_request_writes: ContextVar[Optional[_RequestWrites]] = ContextVar("request_writes", default=None)
+
+
+def request_has_written() -> bool:
+    state = _request_writes.get()
+    return state is not None and state.wrote
+
+
+def _mark_write(conn, cursor, statement, parameters, context, executemany):
+    state = _request_writes.get()
+    if state is not None and not state.wrote:
+        if not statement.lstrip()[:7].upper().startswith(_READ_PREFIXES):
+            state.wrote = True
+
+
+def mark_request_writes(engine: Engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", _mark_write):
+        event.listen(engine, "before_cursor_execute", _mark_write)
+
+
+class ReadAfterWriteMiddleware:
+    """
+    Pure ASGI middleware opening a per-request write flag.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _request_writes.set(_RequestWrites())
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_writes.reset(token)
+
+
+class RoutingSession(Session):
+    """
+    Session that reads from `replica` and writes to `primary`.
+    """
+
+    def __init__(self, *, primary: Engine, replica: Engine, **kw):
+        super().__init__(**kw)
+        self._primary = primary
+        self._replica = replica
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self.info["wrote"] = True
+            return self._primary
+        if self.info.get("wrote") or request_has_written():
+            return self._primary
+        return self._replica
+
+
+_replica_engine: Optional[Engine] = None
+_ReadSessionLocal: Optional[sessionmaker] = None
+_async_replica_engine = None
+_async_read_sessionmaker = None
+
+
+def get_replica_engine() -> Optional[Engine]:
+    global _replica_engine
+    settings = db_session.settings
+    if _replica_engine is None and settings.DATABASE_REPLICA_URL:
+        _replica_engine = db_session.build_engine(settings.DATABASE_REPLICA_URL, settings)
+        db_session.track_engine(_replica_engine)
+    return _replica_engine
+
+
+def get_read_sessionmaker() -> sessionmaker:
+    global _ReadSessionLocal
+    replica = get_replica_engine()
+    if replica is None:
+        return db_session.SessionLocal
+    if _ReadSessionLocal is None:
+        _ReadSessionLocal = sessionmaker(
+            class_=RoutingSession,
+            primary=db_session.engine,
+            replica=replica,
+            autocommit=False,
+            autoflush=False,
+        )
+    return _ReadSessionLocal
+
+
+def get_async_read_sessionmaker():
+    global _async_replica_engine, _async_read_sessionmaker
+    settings = db_session.settings
+    if not settings.DATABASE_REPLICA_URL:
+        return db_session.get_async_sessionmaker()
+    if _async_read_sessionmaker is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        _async_replica_engine = db_session.build_async_engine(
+            settings.ASYNC_DATABASE_REPLICA_URL
+            or db_session.async_database_url(settings.DATABASE_REPLICA_URL),
+            settings,
+        )
+        _async_read_sessionmaker = async_sessionmaker(
+            sync_session_class=RoutingSession,
+            primary=db_session.get_async_engine().sync_engine,
+            replica=_async_replica_engine.sync_engine,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _async_read_sessionmaker
+
+
+async def dispose_replica_engines() -> None:
+    global _replica_engine, _ReadSessionLocal, _async_replica_engine, _async_read_sessionmaker
+    if _async_replica_engine is not None:
+        db_session.untrack_engine(_async_replica_engine.sync_engine)
+        await _async_replica_engine.dispose()
+    if _replica_engine is not None:
+        db_session.untrack_engine(_replica_engine)
+        _replica_engine.dispose()
+    _replica_engine = _ReadSessionLocal = None
+    _async_replica_engine = _async_read_sessionmaker = None
+
+
+def get_read_db():
+    db = get_read_sessionmaker()()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    async with get_async_read_sessionmaker()() as db:
+        yield db
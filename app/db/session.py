@@ -1,18 +1,183 @@
 # app/db/session.py
-from sqlalchemy import create_engine
+"""
+Database engines and session dependencies.
+
+- engine / SessionLocal / get_db: sync, for scripts and threadpool routes
+- get_async_engine() / get_async_db: async (aiosqlite / asyncpg), for the
+  webhook and optimizer routes, so a request waiting on the database
+  holds no threadpool thread. Built on first use, so code that only needs
+  the sync engine doesn't require the async driver.
+
+Sync service functions (they all take a Session) stay usable from both:
+async routes call them through `await db.run_sync(service_fn, ...)`.
+"""
+from typing import Callable, List
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
-from app.config import get_settings
+from app.config import Settings, get_settings
 
 settings = get_settings()
 
-# For SQLite, `check_same_thread=False` is needed for FastAPI dev usage
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {},
-)
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _is_sqlite_memory(url: str) -> bool:
+    return _is_sqlite(url) and (":memory:" in url or url.rstrip("/") in ("sqlite:", "sqlite+pysqlite:"))
+
+
+def engine_options(url: str, s: Settings) -> dict:
+    """
+    create_engine() keyword arguments for `url`, from Settings.
+
+    In-memory SQLite uses a single shared connection, so the pool sizing
+    options don't apply there.
+    """
+    options: dict = {"pool_pre_ping": s.DB_POOL_PRE_PING}
+    if _is_sqlite(url):
+        # For SQLite, `check_same_thread=False` is needed for FastAPI dev usage
+        options["connect_args"] = {"check_same_thread": False}
+    if not _is_sqlite_memory(url):
+        options.update(
+            pool_size=s.DB_POOL_SIZE,
+            max_overflow=s.DB_MAX_OVERFLOW,
+            pool_timeout=s.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=s.DB_POOL_RECYCLE_SECONDS,
+        )
+    return options
+
+
+def apply_sqlite_pragmas(engine: Engine, s: Settings) -> None:
+    """
+    Run the SQLite pragmas from Settings on every new DBAPI connection.
+
+    WAL lets readers proceed while a writer commits (the default DELETE
+    journal serialises them); synchronous=NORMAL is durable in WAL mode
+    except for the last transactions on power loss; busy_timeout makes a
+    blocked writer wait instead of failing with "database is locked".
+    """
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            if s.SQLITE_WAL and not _is_sqlite_memory(str(engine.url)):
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute(f"PRAGMA synchronous={s.SQLITE_SYNCHRONOUS}")
+            cursor.execute(f"PRAGMA busy_timeout={int(s.SQLITE_BUSY_TIMEOUT_MS)}")
+            if s.SQLITE_MMAP_SIZE:
+                cursor.execute(f"PRAGMA mmap_size={int(s.SQLITE_MMAP_SIZE)}")
+        finally:
+            cursor.close()
+
+
+def build_engine(url: str, s: Settings) -> Engine:
+    new_engine = create_engine(url, **engine_options(url, s))
+    if _is_sqlite(url):
+        apply_sqlite_pragmas(new_engine, s)
+    return new_engine
+
+
+engine = build_engine(settings.DATABASE_URL, settings)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Applied to every engine, including ones built later (async, replica):
+# instrumentation such as query counting and pool timing
+_engine_hooks: List[Callable[[Engine], None]] = []
+_engines: List[Engine] = [engine]
+
+_async_engine = None
+_async_sessionmaker = None
+
+
+def register_engine_hook(hook: Callable[[Engine], None]) -> None:
+    _engine_hooks.append(hook)
+    for e in _engines:
+        hook(e)
+
+
+def track_engine(new_engine: Engine) -> None:
+    """
+    Apply the registered hooks to an engine built after startup (for an
+    AsyncEngine, pass its .sync_engine).
+    """
+    _engines.append(new_engine)
+    for hook in _engine_hooks:
+        hook(new_engine)
+
+
+def untrack_engine(old_engine: Engine) -> None:
+    if old_engine in _engines:
+        _engines.remove(old_engine)
+
+
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    """
+    `url` with its sync driver swapped for the asyncio one
+    (sqlite -> aiosqlite, postgresql -> asyncpg).
+    """
+    scheme, sep, rest = url.partition("://")
+    return _ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+def build_async_engine(url: str, s: Settings):
+    """
+    AsyncEngine for `url` (already an async URL), configured and tracked
+    like the sync engine.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    new_engine = create_async_engine(url, **engine_options(url, s))
+    if _is_sqlite(url):
+        apply_sqlite_pragmas(new_engine.sync_engine, s)
+    track_engine(new_engine.sync_engine)
+    return new_engine
+
+
+def get_async_engine():
+    global _async_engine, _async_sessionmaker
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        url = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+        new_engine = build_async_engine(url, settings)
+
+        # expire_on_commit=False: reading attributes after commit must not
+        # trigger implicit (sync) IO on an async session
+        _async_sessionmaker = async_sessionmaker(
+            new_engine, autoflush=False, expire_on_commit=False
+        )
+        _async_engine = new_engine
+    return _async_engine
+
+
+def get_async_sessionmaker():
+    get_async_engine()
+    return _async_sessionmaker
+
+
+async def dispose_async_engine() -> None:
+    """
+    Close the async pool (app shutdown); it is rebuilt on next use.
+    """
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        old, _async_engine, _async_sessionmaker = _async_engine, None, None
+        untrack_engine(old.sync_engine)
+        await old.dispose()
+
 
 def get_db():
     from sqlalchemy.orm import Session
@@ -21,3 +186,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
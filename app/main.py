@@ -1,27 +1,111 @@
 # app/main.py
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from sqlalchemy import text
 
 from app.config import get_settings
-from app.db.session import engine
+from app.db.routing import ReadAfterWriteMiddleware, dispose_replica_engines, mark_request_writes
+from app.db.query_stats import QueryStatsMiddleware, instrument_engine_queries
+from app.db.session import SessionLocal, dispose_async_engine, engine, register_engine_hook
 from app.models import Base
 from app.routers import twilio_voice as twilio_router
 from app.routers import calls as calls_router
 from app.routers import meeting_requests as mr_router
 
-from app.routers import constraints, campaigns, calls, twilio_status, twilio_voice
+from app.routers import constraints, campaigns, calls, metrics, twilio_status, twilio_voice
+from app.services.app_metrics import MetricsMiddleware, instrument_engine_pool
+from app.services.call_analytics_service import run_rollup_periodically
+from app.services.call_status_buffer import (
+    CallStatusBuffer,
+    get_call_status_buffer,
+    set_call_status_buffer,
+)
+from app.services.constraints_cache import close_constraints_cache
+from app.services.llm_batcher import TranscriptBatcher, set_transcript_batcher
+from app.services.llm_client import close_llm_clients
+from app.services.llm_resilience import breaker_snapshot
+from app.services.twiml_templates import warm_twiml_templates
+from app.services.twilio_signature import TwilioSignatureMiddleware
+from app.services.webhook_idempotency import run_purge_periodically
 settings = get_settings()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    Base.metadata.create_all(bind=engine)
-    yield
+    create_schema = settings.DB_CREATE_SCHEMA_ON_STARTUP
+    if create_schema is None:
+        create_schema = settings.ENV == "dev"
+    if create_schema:
+        Base.metadata.create_all(bind=engine)
+    warm_twiml_templates()
+
+    status_buffer = None
+    if settings.TWILIO_STATUS_BUFFER_ENABLED:
+        status_buffer = CallStatusBuffer(
+            SessionLocal,
+            flush_interval_ms=settings.TWILIO_STATUS_FLUSH_INTERVAL_MS,
+            max_batch=settings.TWILIO_STATUS_FLUSH_MAX_BATCH,
+            max_pending=settings.TWILIO_STATUS_BUFFER_MAX_PENDING,
+            max_flush_attempts=settings.TWILIO_STATUS_FLUSH_MAX_ATTEMPTS,
+        )
+        await status_buffer.start()
+        set_call_status_buffer(status_buffer)
+
+    periodic_tasks = []
+    if settings.CALL_EVENTS_ROLLUP_INTERVAL_SECONDS > 0:
+        periodic_tasks.append(asyncio.create_task(
+            run_rollup_periodically(SessionLocal, settings.CALL_EVENTS_ROLLUP_INTERVAL_SECONDS),
+            name="call-events-rollup",
+        ))
+    if settings.WEBHOOK_IDEMPOTENCY_SHARED and settings.WEBHOOK_IDEMPOTENCY_PURGE_INTERVAL_SECONDS > 0:
+        periodic_tasks.append(asyncio.create_task(
+            run_purge_periodically(SessionLocal, settings.WEBHOOK_IDEMPOTENCY_PURGE_INTERVAL_SECONDS),
+            name="webhook-responses-purge",
+        ))
+
+    transcript_batcher = None
+    if settings.OPENAI_BATCH_ENABLED:
+        transcript_batcher = TranscriptBatcher(
+            max_wait_ms=settings.OPENAI_BATCH_MAX_WAIT_MS,
+            max_batch=settings.OPENAI_BATCH_MAX_SIZE,
+            max_queue=settings.OPENAI_BATCH_MAX_QUEUE,
+            max_concurrency=settings.OPENAI_BATCH_MAX_CONCURRENCY,
+        )
+        await transcript_batcher.start()
+        set_transcript_batcher(transcript_batcher)
+
+    try:
+        yield
+    finally:
+        # Let gather refinements finish their writes while the engines are up
+        await twilio_voice.drain_background_tasks(settings.openai_gather_refine_drain_seconds)
+        for task in periodic_tasks:
+            task.cancel()
+        await asyncio.gather(*periodic_tasks, return_exceptions=True)
+        # Drain buffered status callbacks before the process exits
+        if status_buffer is not None:
+            set_call_status_buffer(None)
+            await status_buffer.stop()
+        if transcript_batcher is not None:
+            set_transcript_batcher(None)
+            await transcript_batcher.stop()
+        await close_llm_clients()
+        close_constraints_cache()
+        await dispose_replica_engines()
+        await dispose_async_engine()
 
 
 app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
+app.add_middleware(TwilioSignatureMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(ReadAfterWriteMiddleware)
+# Outermost, so rejected webhooks are counted too
+app.add_middleware(MetricsMiddleware)
+register_engine_hook(instrument_engine_pool)
+register_engine_hook(instrument_engine_queries)
+register_engine_hook(mark_request_writes)
 
 # Routers
 app.include_router(twilio_router.router, prefix="/twilio", tags=["twilio"])
@@ -32,8 +116,10 @@ app.include_router(campaigns.router, prefix="/campaigns", tags=["campaigns"])
 app.include_router(calls.router)
 app.include_router(twilio_status.router)
 app.include_router(twilio_voice.router)
+app.include_router(metrics.router)
 @app.get("/health")
 def health_check():
+    status_buffer = get_call_status_buffer()
     db_status = "ok"
     try:
         with engine.connect() as conn:
@@ -46,4 +132,6 @@ def health_check():
         "app": settings.APP_NAME,
         "env": settings.ENV,
         "database": db_status,
+        "llm_circuits": breaker_snapshot(),
+        "call_status_buffer": status_buffer.snapshot() if status_buffer is not None else None,
     }
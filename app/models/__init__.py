@@ -7,3 +7,7 @@ from app.models.meeting_slot import MeetingSlot  # noqa: F401
 from app.models.call import Call  # noqa: F401
 from app.models.meeting import Meeting  # noqa: F401
 from app.models.participant_availability import ParticipantAvailability
+from app.models.call_event import CallEvent  # noqa: F401
+from app.models.call_timing import CallTiming  # noqa: F401
+from app.models.campaign_call_stats import CampaignCallStats  # noqa: F401
+from app.models.webhook_response import WebhookResponse  # noqa: F401
@@ -31,6 +31,10 @@ class Call(Base):
     direction = Column(String(16), nullable=False, default="outbound")
     status = Column(String(32), nullable=False, default="initiated")
 
+    # Failure context from Twilio status callbacks (ErrorCode / ErrorMessage)
+    error_code = Column(String(16), nullable=True)
+    error_message = Column(String(255), nullable=True)
+
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(
         DateTime,
@@ -0,0 +1,39 @@
+# app/models/call_event.py
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, false
+
+from app.models.base import Base
+
+
+class CallEvent(Base):
+    """
+    Append-only log of Twilio status callbacks.
+
+    `Call.status` only holds the latest state; this table keeps every
+    transition so ring time, answer time and duration can be derived
+    later (see call_analytics_service). Rows are never updated, except
+    to set `rolled_up` once the rollup has folded them in.
+    """
+
+    __tablename__ = "call_events"
+
+    id = Column(Integer, primary_key=True)
+
+    # Resolved from provider_call_id at insert time; NULL if unknown CallSid
+    call_id = Column(
+        Integer,
+        ForeignKey("calls.id", ondelete="CASCADE"),
+        nullable=True,
+    )
+    provider_call_id = Column(String(64), nullable=False)
+
+    status = Column(String(32), nullable=False)
+    # When Twilio says the transition happened (falls back to receive time)
+    ts = Column(DateTime, nullable=False)
+
+    # Only sent with terminal statuses
+    call_duration = Column(Integer, nullable=True)
+    error_code = Column(String(16), nullable=True)
+
+    rolled_up = Column(Boolean, nullable=False, default=False, server_default=false())
+
+    __table_args__ = (Index("ix_call_events_call_id_ts", "call_id", "ts"),)
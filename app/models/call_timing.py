@@ -0,0 +1,33 @@
+# app/models/call_timing.py
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+
+from app.models.base import Base
+
+
+class CallTiming(Base):
+    """
+    Per-call rollup of CallEvent rows (one row per call).
+
+    Maintained incrementally by call_analytics_service.rollup_call_events;
+    `last_event_id` is the id of the newest CallEvent folded in.
+    """
+
+    __tablename__ = "call_timings"
+
+    call_id = Column(
+        Integer,
+        ForeignKey("calls.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    meeting_request_id = Column(Integer, nullable=True, index=True)
+
+    started_at = Column(DateTime, nullable=True)  # queued / initiated
+    ringing_at = Column(DateTime, nullable=True)
+    answered_at = Column(DateTime, nullable=True)  # in-progress
+    ended_at = Column(DateTime, nullable=True)  # first terminal status
+
+    final_status = Column(String(32), nullable=True)
+    ring_seconds = Column(Integer, nullable=True)
+    talk_seconds = Column(Integer, nullable=True)
+
+    last_event_id = Column(Integer, nullable=False, index=True)
@@ -0,0 +1,30 @@
+# app/models/campaign_call_stats.py
+from sqlalchemy import Column, ForeignKey, Integer
+
+from app.models.base import Base
+
+
+class CampaignCallStats(Base):
+    """
+    Per-campaign (MeetingRequest) dialling counters, updated incrementally
+    from CallTiming transitions so dashboards never scan raw events.
+    """
+
+    __tablename__ = "campaign_call_stats"
+
+    meeting_request_id = Column(
+        Integer,
+        ForeignKey("meeting_requests.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    calls_total = Column(Integer, nullable=False, default=0)
+    calls_answered = Column(Integer, nullable=False, default=0)
+    calls_ended = Column(Integer, nullable=False, default=0)
+
+    total_ring_seconds = Column(Integer, nullable=False, default=0)
+    total_talk_seconds = Column(Integer, nullable=False, default=0)
+
+    @property
+    def answer_rate(self) -> float:
+        return self.calls_answered / self.calls_ended if self.calls_ended else 0.0
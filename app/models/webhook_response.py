@@ -0,0 +1,26 @@
+# app/models/webhook_response.py
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, LargeBinary, String
+
+from app.models.base import Base
+
+
+class WebhookResponse(Base):
+    """
+    Shared idempotency store for Twilio webhooks.
+
+    Keyed on sha256(CallSid, endpoint, payload); holds the response we
+    sent the first time so retries hitting another worker can replay it.
+    """
+
+    __tablename__ = "webhook_responses"
+
+    key = Column(String(64), primary_key=True)
+    endpoint = Column(String(64), nullable=False)
+    provider_call_id = Column(String(64), nullable=True)
+
+    body = Column(LargeBinary, nullable=False)
+    media_type = Column(String(64), nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
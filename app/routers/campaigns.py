@@ -2,16 +2,29 @@
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
+from app.db.query_stats import query_budget
+from app.db.routing import get_read_db
 from app.db.session import get_db
 from app.models.lead import Lead
 from app.models.call import Call
 from app.models.meeting_request import MeetingRequest
 from app.services.scheduling_service import create_meeting_request_and_slots
 from app.services.call_service import initiate_outbound_call
+from app.services.call_script_cache import pregenerate_campaign_scripts
+from app.services.lead_service import bulk_upsert_leads
+from app.services.json_response import FastJSONResponse
+from app.services.call_analytics_service import get_campaign_call_stats
+from app.services.lead_import_service import (
+    import_leads,
+    iter_csv_records,
+    iter_ndjson_records,
+    iter_text_lines,
+)
 from app.services.twilio_client import TwilioClient, get_twilio_client
 
 router = APIRouter()
@@ -42,6 +55,43 @@ class CampaignCreateResponse(BaseModel):
     call_ids: List[int]
 
 
+class LeadImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class LeadImportResponse(BaseModel):
+    meeting_request_id: int
+    rows_received: int
+    rows_imported: int
+    rows_failed: int
+    errors: List[LeadImportRowError]
+    errors_truncated: bool
+
+
+class CampaignCallStatsResponse(BaseModel):
+    meeting_request_id: int
+    calls_total: int
+    calls_answered: int
+    calls_ended: int
+    answer_rate: float
+    avg_ring_seconds: Optional[float] = None
+    avg_talk_seconds: Optional[float] = None
+
+
+_CSV_CONTENT_TYPES = {"text/csv", "application/csv"}
+_NDJSON_CONTENT_TYPES = {
+    "application/x-ndjson",
+    "application/ndjson",
+    "application/jsonl",
+    "application/x-jsonlines",
+}
+
+
+def _validate_lead_row(row) -> dict:
+    return CampaignLeadIn.model_validate(row).model_dump()
+
+
 @router.post("/simple", response_model=CampaignCreateResponse)
 def create_campaign_simple(
     payload: CampaignCreatePayload,
@@ -53,6 +103,7 @@ def create_campaign_simple(
 
     - creates a MeetingRequest + slots
     - upserts leads by phone
+    - pre-generates every lead's call script
     - triggers outbound calls for each lead
     """
 
@@ -67,33 +118,23 @@ def create_campaign_simple(
         max_bookings=payload.max_bookings,
     )
 
+    # 2) Upsert all leads by phone in a few chunked round trips
+    leads_by_phone = bulk_upsert_leads(
+        db,
+        [lead_in.model_dump() for lead_in in payload.leads],
+    )
+
+    # 3) Scripts are ready before anyone can answer
+    pregenerate_campaign_scripts(meeting_request, leads_by_phone.values())
+
     lead_ids: list[int] = []
     call_ids: list[int] = []
 
-    # 2) For each incoming lead:
     for lead_in in payload.leads:
-        # Upsert by phone
-        lead: Optional[Lead] = (
-            db.query(Lead)
-            .filter(Lead.phone == lead_in.phone)
-            .first()
-        )
-
-        if not lead:
-            lead = Lead(
-                name=lead_in.name,
-                phone=lead_in.phone,
-                email=lead_in.email,
-                company=lead_in.company,
-                timezone=lead_in.timezone or "UTC",
-            )
-            db.add(lead)
-            db.commit()
-            db.refresh(lead)
-
+        lead: Lead = leads_by_phone[lead_in.phone]
         lead_ids.append(lead.id)
 
-        # 3) Trigger outbound call, tying it to this meeting_request
+        # 4) Trigger outbound call, tying it to this meeting_request
         call: Call = initiate_outbound_call(
             db=db,
             lead=lead,
@@ -102,9 +143,101 @@ def create_campaign_simple(
         )
         call_ids.append(call.id)
 
-    return CampaignCreateResponse(
+    # Returned as a Response: FastAPI doesn't re-validate the model
+    return FastJSONResponse(CampaignCreateResponse(
         meeting_request_id=meeting_request.id,
         slot_count=len(slots),
         lead_ids=lead_ids,
         call_ids=call_ids,
+    ))
+
+
+@router.post("/{meeting_request_id}/leads:import", response_model=LeadImportResponse)
+async def import_campaign_leads(
+    meeting_request_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    """
+    Stream a CSV (text/csv, with a header row) or NDJSON
+    (application/x-ndjson) lead list into the database.
+
+    - the body is parsed row by row as it arrives, never held in full
+    - valid rows are upserted by phone in chunks
+    - invalid rows are reported with their row number and skipped
+    """
+    content_type = request.headers.get("content-type") or ""
+    content_type = content_type.split(";")[0].strip().lower()
+    if content_type in _CSV_CONTENT_TYPES:
+        parse_records = iter_csv_records
+    elif content_type in _NDJSON_CONTENT_TYPES:
+        parse_records = iter_ndjson_records
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail="Content-Type must be text/csv or application/x-ndjson",
+        )
+
+    mr = await run_in_threadpool(db.get, MeetingRequest, meeting_request_id)
+    if not mr:
+        raise HTTPException(status_code=404, detail="MeetingRequest not found")
+
+    result = await import_leads(
+        db,
+        parse_records(iter_text_lines(request.stream())),
+        validate=_validate_lead_row,
     )
+
+    return FastJSONResponse(LeadImportResponse(
+        meeting_request_id=meeting_request_id,
+        rows_received=result.rows_received,
+        rows_imported=result.rows_imported,
+        rows_failed=result.rows_failed,
+        errors=[LeadImportRowError(row=e.row, error=e.error) for e in result.errors],
+        errors_truncated=result.errors_truncated,
+    ))
+
+
+@router.get("/{meeting_request_id}/call-stats", response_model=CampaignCallStatsResponse)
+@query_budget(2)
+def get_campaign_call_stats_endpoint(
+    meeting_request_id: int,
+    db: Session = Depends(get_read_db),
+):
+    """
+    Dialling analytics for a campaign (answer rate, ring / talk time).
+
+    Read-only: serves the rollup tables as last folded by the app's
+    periodic rollup (CALL_EVENTS_ROLLUP_INTERVAL_SECONDS) or
+    scripts/rollup_call_events.py, so it may lag the newest callbacks.
+    """
+    mr = db.get(MeetingRequest, meeting_request_id)
+    if not mr:
+        raise HTTPException(status_code=404, detail="MeetingRequest not found")
+
+    stats = get_campaign_call_stats(db, meeting_request_id)
+
+    if stats is None:
+        return FastJSONResponse(CampaignCallStatsResponse(
+            meeting_request_id=meeting_request_id,
+            calls_total=0,
+            calls_answered=0,
+            calls_ended=0,
+            answer_rate=0.0,
+        ))
+
+    return FastJSONResponse(CampaignCallStatsResponse(
+        meeting_request_id=meeting_request_id,
+        calls_total=stats.calls_total,
+        calls_answered=stats.calls_answered,
+        calls_ended=stats.calls_ended,
+        answer_rate=stats.answer_rate,
+        avg_ring_seconds=(
+            stats.total_ring_seconds / stats.calls_total if stats.calls_total else None
+        ),
+        avg_talk_seconds=(
+            stats.total_talk_seconds / stats.calls_answered
+            if stats.calls_answered
+            else None
+        ),
+    ))
@@ -5,11 +5,21 @@ from typing import Any, Dict, List, Optional
 from app.services.meeting_service import confirm_best_slot_for_meeting_request
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, model_validator, field_validator
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.query_stats import query_budget
+from app.db.routing import get_async_read_db, get_read_db
+from app.db.session import get_async_db, get_db
 from app.models.meeting_request import MeetingRequest
 from app.models.meeting_slot import MeetingSlot
+from app.schemas.meeting_requests import (
+    AvailabilityListing,
+    ConfirmBestSlotResponse,
+    MeetingRequestWithSlots,
+    SuggestedSlotResponse,
+)
+from app.services.json_response import FastJSONResponse
 from app.services.scheduling_service import create_meeting_request_and_slots
 from app.services.availability_service import record_availability_for_lead
 
@@ -48,11 +58,30 @@ class AvailabilityPayload(BaseModel):
     source_text: Optional[str] = None
 
 
-@router.post("/simple")
+def _meeting_request_body(mr: MeetingRequest, slots: List[MeetingSlot]) -> Dict[str, Any]:
+    # Datetimes are left for the JSON encoder to format
+    return {
+        "meeting_request": {
+            "id": mr.id,
+            "owner_id": mr.owner_id,
+            "title": mr.title,
+            "duration_minutes": mr.duration_minutes,
+            "max_bookings": mr.max_bookings,
+            "status": mr.status,
+            "hard_constraints": mr.hard_constraints,
+        },
+        "slots": [
+            {"id": s.id, "start_time": s.start_time, "end_time": s.end_time, "state": s.state}
+            for s in slots
+        ],
+    }
+
+
+@router.post("/simple", response_model=MeetingRequestWithSlots)
 def create_simple_meeting_request(
         payload: SimpleMeetingRequestCreate,
         db: Session = Depends(get_db),
-) -> Dict[str, Any]:
+) -> FastJSONResponse:
     """
     Create a meeting request with a simple time window and auto-generated slots.
 
@@ -74,33 +103,14 @@ def create_simple_meeting_request(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    return {
-        "meeting_request": {
-            "id": meeting_request.id,
-            "owner_id": meeting_request.owner_id,
-            "title": meeting_request.title,
-            "duration_minutes": meeting_request.duration_minutes,
-            "max_bookings": meeting_request.max_bookings,
-            "status": meeting_request.status,
-            "hard_constraints": meeting_request.hard_constraints,
-        },
-        "slots": [
-            {
-                "id": s.id,
-                "start_time": s.start_time.isoformat(),
-                "end_time": s.end_time.isoformat(),
-                "state": s.state,
-            }
-            for s in slots
-        ],
-    }
+    return FastJSONResponse(_meeting_request_body(meeting_request, slots))
 
 
-@router.get("/{meeting_request_id}")
+@router.get("/{meeting_request_id}", response_model=MeetingRequestWithSlots)
 def get_meeting_request(
         meeting_request_id: int,
-        db: Session = Depends(get_db),
-) -> Dict[str, Any]:
+        db: Session = Depends(get_read_db),
+) -> FastJSONResponse:
     """
     Fetch a meeting request and its slots.
     """
@@ -115,34 +125,16 @@ def get_meeting_request(
             .all()
     )
 
-    return {
-        "meeting_request": {
-            "id": mr.id,
-            "owner_id": mr.owner_id,
-            "title": mr.title,
-            "duration_minutes": mr.duration_minutes,
-            "max_bookings": mr.max_bookings,
-            "status": mr.status,
-            "hard_constraints": mr.hard_constraints,
-        },
-        "slots": [
-            {
-                "id": s.id,
-                "start_time": s.start_time.isoformat(),
-                "end_time": s.end_time.isoformat(),
-                "state": s.state,
-            }
-            for s in slots
-        ],
-    }
+    return FastJSONResponse(_meeting_request_body(mr, slots))
 
 
-@router.post("/{meeting_request_id}/availability")
+@router.post("/{meeting_request_id}/availability", response_model=AvailabilityListing)
+@query_budget(6)
 def submit_availability_for_meeting(
         meeting_request_id: int,
         payload: AvailabilityPayload,
         db: Session = Depends(get_db),
-) -> Dict[str, Any]:
+) -> FastJSONResponse:
     """
     Simulate what the AI caller will do after a call:
 
@@ -172,65 +164,67 @@ def submit_availability_for_meeting(
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    return {
+    return FastJSONResponse({
         "meeting_request_id": meeting_request_id,
         "lead_id": payload.lead_id,
         "availabilities": [
             {
                 "id": pa.id,
-                "start_time": pa.start_time.isoformat(),
-                "end_time": pa.end_time.isoformat(),
+                "start_time": pa.start_time,
+                "end_time": pa.end_time,
                 "state": pa.state,
                 "score": pa.score,
             }
             for pa in created
         ],
-    }
+    })
 
 
-@router.get("/{meeting_request_id}/suggested-slot")
-def get_suggested_slot(
+@router.get("/{meeting_request_id}/suggested-slot", response_model=SuggestedSlotResponse)
+@query_budget(4)
+async def get_suggested_slot(
         meeting_request_id: int,
-        db: Session = Depends(get_db),
-) -> Dict[str, Any]:
+        db: AsyncSession = Depends(get_async_read_db),
+) -> FastJSONResponse:
     """
     Compute the best concrete slot for this meeting request,
     based on all ParticipantAvailability rows.
 
     Note: This does NOT yet create a Meeting; it only suggests a slot.
     """
-    mr = db.query(MeetingRequest).filter_by(id=meeting_request_id).first()
+    mr = await db.get(MeetingRequest, meeting_request_id)
     if not mr:
         raise HTTPException(status_code=404, detail="MeetingRequest not found")
 
     try:
-        best = find_best_slot_for_meeting_request(db, meeting_request_id)
+        best = await db.run_sync(find_best_slot_for_meeting_request, meeting_request_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
     if best is None:
         # No suitable slot found (e.g. no availabilities yet)
-        return {
+        return FastJSONResponse({
             "meeting_request_id": meeting_request_id,
             "slot": None,
-        }
+        })
 
-    return {
+    return FastJSONResponse({
         "meeting_request_id": meeting_request_id,
         "slot": {
-            "start_time": best.start_time.isoformat(),
-            "end_time": best.end_time.isoformat(),
+            "start_time": best.start_time,
+            "end_time": best.end_time,
             "participant_lead_ids": best.participant_lead_ids,
             "score": best.score,
         },
-    }
+    })
 
-@router.post("/{meeting_request_id}/confirm-best-slot")
-def confirm_best_slot(
+@router.post("/{meeting_request_id}/confirm-best-slot", response_model=ConfirmBestSlotResponse)
+@query_budget(8)
+async def confirm_best_slot(
     meeting_request_id: int,
     min_participants: int = 1,
-    db: Session = Depends(get_db),
-):
+    db: AsyncSession = Depends(get_async_db),
+) -> FastJSONResponse:
     """
     Confirm (book) the best slot for this MeetingRequest:
 
@@ -239,13 +233,13 @@ def confirm_best_slot(
     - Creates a Meeting (1:1, using your existing Meeting model)
     - Marks the used availability windows for that lead as SELECTED
     """
-    mr = db.query(MeetingRequest).filter_by(id=meeting_request_id).first()
+    mr = await db.get(MeetingRequest, meeting_request_id)
     if not mr:
         raise HTTPException(status_code=404, detail="MeetingRequest not found")
 
     try:
-        result = confirm_best_slot_for_meeting_request(
-            db,
+        result = await db.run_sync(
+            confirm_best_slot_for_meeting_request,
             meeting_request_id=meeting_request_id,
             min_participants=min_participants,
         )
@@ -262,21 +256,21 @@ def confirm_best_slot(
     meeting = result.meeting
     slot = result.slot
 
-    return {
+    return FastJSONResponse({
         "meeting_request_id": meeting_request_id,
         "meeting": {
             "id": meeting.id,
             "lead_id": meeting.lead_id,
-            "scheduled_start_time": meeting.scheduled_start_time.isoformat(),
-            "scheduled_end_time": meeting.scheduled_end_time.isoformat(),
+            "scheduled_start_time": meeting.scheduled_start_time,
+            "scheduled_end_time": meeting.scheduled_end_time,
             "meeting_request_id": meeting.meeting_request_id,
             "meeting_slot_id": meeting.meeting_slot_id,
             "call_id": meeting.call_id,
         },
         "slot": {
-            "start_time": slot.start_time.isoformat(),
-            "end_time": slot.end_time.isoformat(),
+            "start_time": slot.start_time,
+            "end_time": slot.end_time,
             "participant_lead_ids": slot.participant_lead_ids,
             "score": slot.score,
         },
-    }
+    })
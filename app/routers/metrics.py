@@ -0,0 +1,32 @@
+# app/routers/metrics.py
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.services.app_metrics import render_prometheus
+from app.services.llm_metrics import LATENCY_BUCKETS_MS, get_llm_metrics
+from app.services.llm_resilience import breaker_snapshot
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+_PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """
+    Prometheus scrape target: HTTP, DB pool, Twilio and OpenAI metrics.
+    """
+    return PlainTextResponse(render_prometheus(), media_type=_PROMETHEUS_CONTENT_TYPE)
+
+
+@router.get("/llm")
+def llm_metrics():
+    """
+    Per call site: latency histogram, token totals, errors by class,
+    fallbacks by reason and cache lookups, plus circuit breaker state.
+    """
+    return {
+        "latency_buckets_ms": list(LATENCY_BUCKETS_MS),
+        "sites": get_llm_metrics().snapshot(),
+        "circuits": breaker_snapshot(),
+    }
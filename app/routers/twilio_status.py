@@ -1,24 +1,53 @@
 # app/routers/twilio_status.py
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import Optional
 
 from fastapi import APIRouter, Depends, Form, Response
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
-from app.services.call_status_service import update_call_status
+from app.db.query_stats import query_budget
+from app.db.session import get_async_db
+from app.services.call_context_cache import get_call_context_cache
+from app.services.call_status_buffer import (
+    TERMINAL_STATUSES,
+    StatusEvent,
+    get_call_status_buffer,
+)
+from app.services.call_status_service import update_call_status_fast
 
 router = APIRouter(prefix="/twilio", tags=["twilio-status"])
 
+_EMPTY_TWIML = "<Response></Response>"
+
+
+def _event_time(timestamp: Optional[str]) -> datetime:
+    """
+    Twilio's `Timestamp` (RFC 2822) as naive UTC, or now if absent/invalid.
+    """
+    if timestamp:
+        try:
+            parsed = parsedate_to_datetime(timestamp)
+            if parsed.tzinfo is not None:
+                parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+            return parsed
+        except (TypeError, ValueError):
+            pass
+    return datetime.utcnow()
+
 
 @router.post("/status", response_class=Response)
-def twilio_status_webhook(
+@query_budget(3)
+async def twilio_status_webhook(
     CallSid: str = Form(...),
     CallStatus: str = Form(...),
     From: Optional[str] = Form(None),
     To: Optional[str]  = Form(None),
     ErrorCode: Optional[str]  = Form(None),
     ErrorMessage: Optional[str]  = Form(None),
-    db: Session = Depends(get_db),
+    CallDuration: Optional[int] = Form(None),
+    Timestamp: Optional[str] = Form(None),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Twilio call status callback webhook.
@@ -27,14 +56,37 @@ def twilio_status_webhook(
       - CallSid: Twilio's call ID
       - CallStatus: queued | ringing | in-progress | completed | busy | failed | no-answer | canceled
       - ErrorCode / ErrorMessage (optional failure context)
+      - CallDuration / Timestamp (used for the call_events log)
+
+    When the write-behind buffer is running we only enqueue the event and
+    acknowledge immediately; otherwise (buffer disabled, full, or the app
+    lifespan not started) we fall back to a single synchronous UPDATE.
     """
-    update_call_status(
-        db=db,
+    event = StatusEvent(
         provider_call_id=CallSid,
         call_status=CallStatus,
         error_code=ErrorCode,
         error_message=ErrorMessage,
+        call_duration=CallDuration,
+        received_at=_event_time(Timestamp),
     )
 
+    if CallStatus.lower() in TERMINAL_STATUSES:
+        # The call is over; no more voice webhooks will need its context
+        get_call_context_cache().evict(CallSid)
+
+    buffer = get_call_status_buffer()
+    if buffer is None or not buffer.submit(event):
+        # Single UPDATE ... WHERE provider_call_id = CallSid; unknown SIDs are a no-op
+        await db.run_sync(
+            update_call_status_fast,
+            provider_call_id=CallSid,
+            call_status=CallStatus,
+            error_code=ErrorCode,
+            error_message=ErrorMessage,
+            call_duration=CallDuration,
+            event_ts=event.received_at,
+        )
+
     # Just return a minimal TwiML response with the correct media type.
-    return Response(content="<Response></Response>", media_type="text/xml")
+    return Response(content=_EMPTY_TWIML, media_type="text/xml")
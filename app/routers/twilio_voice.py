@@ -1,22 +1,54 @@
 # app/routers/twilio_voice.py
+import asyncio
+import logging
 from datetime import datetime, timedelta
 from typing import Optional, List, Tuple
 
 from zoneinfo import ZoneInfo
-from fastapi import APIRouter, Depends, Form
+from fastapi import APIRouter, Depends, Form, Request
 from fastapi.responses import Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from twilio.twiml.voice_response import VoiceResponse
 
-from app.db.session import get_db
+from app.config import get_settings
+from app.db.query_stats import query_budget
+from app.db.session import get_async_db, get_async_sessionmaker
 from app.models.call import Call
 from app.models.meeting_request import MeetingRequest
+from app.models.participant_availability import AvailabilityState, ParticipantAvailability
 from app.schemas.constraints import HardConstraints
+from app.services.call_context_cache import (
+    CallContext,
+    build_call_context,
+    get_call_context_cache,
+)
 from app.services.availability_service import record_availability_for_lead
-from app.services.availability_nlp_service import parse_availability_from_transcript
+from app.services.call_script_cache import get_call_script_cache
+from app.services.availability_nlp_service import (
+    confident_grammar_windows,
+    llm_windows_from_transcript_async,
+    parse_availability_from_speech,
+)
+from app.services.webhook_idempotency import get_webhook_idempotency, webhook_key
+from app.services.twiml_templates import (
+    ANSWER,
+    GATHER_CONFIRMATION,
+    GATHER_MISSING_CONFIG,
+    GATHER_NO_MEETING,
+    GATHER_UNKNOWN_CALL,
+    render_twiml,
+    static_twiml,
+)
 
 router = APIRouter(prefix="/twilio", tags=["twilio-voice"])
 
+logger = logging.getLogger(__name__)
+
+_GATHER_ENDPOINT = "voice/gather"
+
+# In-flight background refinements (LLM answers that missed the budget)
+_background_tasks: "set[asyncio.Task]" = set()
+
 
 def _windows_from_gather_input(
     *,
@@ -52,6 +84,7 @@ def _windows_from_gather_input(
 
 
 @router.post("/voice", response_class=Response)
+@query_budget(0)
 def twilio_voice(
     CallSid: str = Form(...),
 ):
@@ -59,87 +92,228 @@ def twilio_voice(
     Initial Twilio webhook when an outbound call is answered.
 
     We greet the lead and start a <Gather> that will POST speech/DTMF
-    to /twilio/voice/gather.
+    to /twilio/voice/gather. The lead's script was generated and rendered
+    when the campaign was created (call_script_cache); if it isn't there,
+    we answer with the generic pre-rendered TwiML. Either way, no DB or
+    LLM work happens while the lead waits.
     """
-    vr = VoiceResponse()
+    twiml = None
+    ctx = get_call_context_cache().get(CallSid)
+    if ctx is not None:
+        twiml = get_call_script_cache().answer_twiml(ctx.meeting_request_id, ctx.lead_id)
+    return Response(content=twiml or static_twiml(ANSWER), media_type="application/xml")
 
-    gather = vr.gather(
-        input="speech dtmf",
-        action="/twilio/voice/gather",
-        method="POST",
-        timeout=6,
-        num_digits=1,
-    )
-    gather.say(
-        "Hi, this is Alta, calling to schedule your meeting. "
-        "Please say one time that works for you in the requested window, "
-        "or press 1 for the earliest available time, "
-        "2 for a later time in the window, and then wait."
-    )
 
-    vr.say(
-        "If I did not get your availability, we will follow up by message. Goodbye."
+def _load_call_context(db: Session, call_sid: str) -> Tuple[Optional[CallContext], str]:
+    """
+    Cache-miss path: resolve the call's context from the DB.
+
+    Returns (context, "") on success, or (None, <TwiML template name>)
+    describing why we can't schedule from this call.
+    """
+    call = db.query(Call).filter(Call.provider_call_id == call_sid).first()
+    if not call:
+        return None, GATHER_UNKNOWN_CALL
+
+    if not call.lead_id or not call.meeting_request_id:
+        return None, GATHER_NO_MEETING
+
+    # Load meeting request + hard constraints
+    mr: Optional[MeetingRequest] = db.get(MeetingRequest, call.meeting_request_id)
+    ctx = build_call_context(call, mr)
+    if ctx is None:
+        return None, GATHER_MISSING_CONFIG
+
+    return ctx, ""
+
+
+def _replace_fallback_availability(
+    db: Session,
+    *,
+    meeting_request_id: int,
+    lead_id: int,
+    windows: List[Tuple[datetime, datetime]],
+    source_text: str,
+) -> bool:
+    """
+    Replace the lead's candidate windows with `windows`, but only while
+    they are still the ones stored for `source_text`. A later gather on the
+    call stores its own answer (different speech or digits), which a late
+    refinement of an earlier answer must not overwrite.
+    """
+    stored = {
+        text
+        for (text,) in db.query(ParticipantAvailability.source_text)
+        .filter(
+            ParticipantAvailability.meeting_request_id == meeting_request_id,
+            ParticipantAvailability.lead_id == lead_id,
+            ParticipantAvailability.state == AvailabilityState.CANDIDATE,
+        )
+        .distinct()
+    }
+    if stored != {source_text}:
+        return False
+    record_availability_for_lead(
+        db,
+        meeting_request_id=meeting_request_id,
+        lead_id=lead_id,
+        windows=windows,
+        source_text=source_text,
+        refresh=False,
     )
+    return True
+
+
+async def _refine_availability_later(
+    llm_task: "asyncio.Future[Optional[List[Tuple[datetime, datetime]]]]",
+    ctx: CallContext,
+    source_text: str,
+) -> None:
+    """
+    The LLM missed the webhook's latency budget: once it does answer,
+    replace the fallback windows we already stored with its result
+    (unless a newer gather on the call has replaced them since).
+    """
+    try:
+        windows = await asyncio.wait_for(
+            llm_task, timeout=get_settings().openai_gather_refine_timeout_seconds
+        )
+        if not windows:
+            return
+        async with get_async_sessionmaker()() as db:
+            replaced = await db.run_sync(
+                _replace_fallback_availability,
+                meeting_request_id=ctx.meeting_request_id,
+                lead_id=ctx.lead_id,
+                windows=windows,
+                source_text=source_text,
+            )
+        if not replaced:
+            logger.info("Dropped a stale availability refinement for call %s", ctx.call_id)
+    except Exception:
+        logger.exception("Background availability refinement failed")
+
 
-    return Response(content=str(vr), media_type="application/xml")
+def _spawn_background(coro) -> None:
+    # Keep a reference so the task isn't garbage-collected mid-flight
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def drain_background_tasks(timeout: float) -> int:
+    """
+    Wait up to `timeout` seconds for in-flight refinements (app shutdown),
+    then cancel the rest. Returns how many had to be cancelled.
+    """
+    if not _background_tasks:
+        return 0
+    _, pending = await asyncio.wait(set(_background_tasks), timeout=timeout)
+    for task in pending:
+        task.cancel()
+    if pending:
+        logger.warning("Cancelled %d availability refinements still running at shutdown", len(pending))
+        await asyncio.gather(*pending, return_exceptions=True)
+    return len(pending)
 
 
 @router.post("/voice/gather", response_class=Response)
-def twilio_voice_gather(
-    db: Session = Depends(get_db),
+@query_budget(6)
+async def twilio_voice_gather(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
     CallSid: str = Form(...),
     SpeechResult: Optional[str] = Form(None),
     Digits: Optional[str] = Form(None),
 ):
     """
-    Twilio <Gather> callback:
+    Twilio <Gather> callback.
+
+    Twilio retries webhooks that time out; a retry carries the same form,
+    so it is answered with the response we already produced (or are still
+    producing) instead of re-recording availability and re-asking OpenAI.
+    """
+    # Already parsed for the Form(...) params above; Starlette caches it
+    form = await request.form()
+    return await get_webhook_idempotency().run(
+        key=webhook_key(CallSid, _GATHER_ENDPOINT, form.multi_items()),
+        endpoint=_GATHER_ENDPOINT,
+        call_sid=CallSid,
+        handler=lambda: _process_gather(
+            db, CallSid=CallSid, SpeechResult=SpeechResult, Digits=Digits
+        ),
+    )
+
 
-    - Look up Call by provider_call_id (CallSid).
-    - Use its lead + meeting_request.
+async def _process_gather(
+    db: AsyncSession,
+    *,
+    CallSid: str,
+    SpeechResult: Optional[str],
+    Digits: Optional[str],
+) -> Response:
+    """
+    Handle one (non-duplicate) gather:
+
+    - Resolve the call's lead + meeting_request from the call-context
+      cache, falling back to a lookup by provider_call_id (CallSid).
     - Create ParticipantAvailability rows.
-    - For speech input we call OpenAI via parse_availability_from_transcript.
-      For digits-only we fall back to a simple slot heuristic.
+    - Speech the local grammar parses confidently ("Tuesday after 2") is
+      used directly, without any LLM call.
+    - For other speech we ask OpenAI (AsyncOpenAI) via
+      llm_windows_from_transcript_async, but only wait
+      `openai_gather_budget_seconds`; past that we answer with the
+      deterministic fallback and store the LLM's windows when they arrive.
+      For digits-only we use a simple slot heuristic.
     """
     user_input = (SpeechResult or Digits or "").strip()
-    vr = VoiceResponse()
 
-    # Look up the Call row
-    call = db.query(Call).filter(Call.provider_call_id == CallSid).first()
-    if not call:
-        vr.say(
-            "Thanks. I could not match this call, but we will follow up manually. Goodbye."
-        )
-        return Response(content=str(vr), media_type="application/xml")
+    # Hot path: context warmed by initiate_outbound_call, no DB reads
+    cache = get_call_context_cache()
+    ctx = cache.get(CallSid)
 
-    if not call.lead_id or not call.meeting_request_id:
-        vr.say(
-            "Thanks. I could not find a matching meeting for this call, "
-            "but we will follow up. Goodbye."
-        )
-        return Response(content=str(vr), media_type="application/xml")
+    if ctx is None:
+        ctx, failure = await db.run_sync(_load_call_context, CallSid)
+        if ctx is None:
+            return Response(content=static_twiml(failure), media_type="application/xml")
+        cache.put(CallSid, ctx)
 
-    # Load meeting request + hard constraints
-    mr: Optional[MeetingRequest] = db.get(MeetingRequest, call.meeting_request_id)
-    if not mr or not mr.hard_constraints:
-        vr.say(
-            "Thanks. The meeting request configuration is missing, "
-            "so we will follow up later. Goodbye."
-        )
-        return Response(content=str(vr), media_type="application/xml")
-
-    hc = HardConstraints.model_validate(mr.hard_constraints)
+    hc = ctx.hard_constraints
+    windows: Optional[List[Tuple[datetime, datetime]]] = None
+    pending_llm = None
 
-    # --- NEW: speech → LLM parser, digits → heuristic ---
+    # --- speech → local grammar, else LLM parser (time-boxed);
+    #     digits → heuristic ---
     if SpeechResult and SpeechResult.strip():
-        windows = parse_availability_from_transcript(
-            transcript=SpeechResult,
-            hard_constraints=hc,
-            duration_minutes=mr.duration_minutes,
-        )
+        windows = confident_grammar_windows(SpeechResult, hc, ctx.duration_minutes)
+
+        if not windows:
+            llm_task = asyncio.ensure_future(
+                llm_windows_from_transcript_async(
+                    transcript=SpeechResult,
+                    hard_constraints=hc,
+                    duration_minutes=ctx.duration_minutes,
+                )
+            )
+            try:
+                # shield: on timeout keep the request running for refinement
+                windows = await asyncio.wait_for(
+                    asyncio.shield(llm_task),
+                    timeout=get_settings().openai_gather_budget_seconds,
+                )
+            except asyncio.TimeoutError:
+                pending_llm = llm_task
+
+        if not windows:
+            windows = parse_availability_from_speech(
+                instruction=SpeechResult,
+                hard_constraints=hc,
+                duration_minutes=ctx.duration_minutes,
+            )
     else:
         windows = _windows_from_gather_input(
             hard_constraints=hc,
-            duration_minutes=mr.duration_minutes,
+            duration_minutes=ctx.duration_minutes,
             digits=Digits,
         )
 
@@ -147,27 +321,37 @@ def twilio_voice_gather(
     if not windows:
         windows = _windows_from_gather_input(
             hard_constraints=hc,
-            duration_minutes=mr.duration_minutes,
+            duration_minutes=ctx.duration_minutes,
             digits="1",
         )
 
     # Persist as ParticipantAvailability rows
-    record_availability_for_lead(
-        db=db,
-        meeting_request_id=mr.id,
-        lead_id=call.lead_id,
-        windows=windows,
-        source_text=user_input,
-    )
+    try:
+        await db.run_sync(
+            record_availability_for_lead,
+            meeting_request_id=ctx.meeting_request_id,
+            lead_id=ctx.lead_id,
+            windows=windows,
+            source_text=user_input,
+            refresh=False,
+        )
+    except BaseException:
+        # Nothing to refine; don't leave the shielded LLM call running
+        if pending_llm is not None:
+            pending_llm.cancel()
+        raise
+
+    # Only start refining once the fallback rows are stored, so the
+    # LLM's answer always replaces them and never the other way round
+    if pending_llm is not None:
+        _spawn_background(_refine_availability_later(pending_llm, ctx, user_input))
 
     # Simple confirmation sentence using local timezone
-    tz = ZoneInfo(hc.timezone)
+    tz = ZoneInfo(ctx.timezone)
     start_local = windows[0][0].astimezone(tz)
     friendly = start_local.strftime("%A %B %d at %H:%M")
 
-    vr.say(
-        f"Great. I have recorded that you are available on {friendly}. "
-        "We will confirm the final meeting time shortly. Goodbye."
+    return Response(
+        content=render_twiml(GATHER_CONFIRMATION, friendly),
+        media_type="application/xml",
     )
-
-    return Response(content=str(vr), media_type="application/xml")
@@ -0,0 +1,75 @@
+# app/schemas/meeting_requests.py
+"""
+Response shapes of the /meeting-requests routes.
+
+The routes return FastJSONResponse, so these document the API (OpenAPI)
+and are used by tests; they are not re-validated per response.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+
+class MeetingRequestOut(BaseModel):
+    id: int
+    owner_id: str
+    title: str
+    duration_minutes: int
+    max_bookings: int
+    status: str
+    hard_constraints: Optional[Dict[str, Any]] = None
+
+
+class SlotOut(BaseModel):
+    id: int
+    start_time: datetime
+    end_time: datetime
+    state: str
+
+
+class MeetingRequestWithSlots(BaseModel):
+    meeting_request: MeetingRequestOut
+    slots: List[SlotOut]
+
+
+class AvailabilityOut(BaseModel):
+    id: int
+    start_time: datetime
+    end_time: datetime
+    state: str
+    score: Optional[float] = None
+
+
+class AvailabilityListing(BaseModel):
+    meeting_request_id: int
+    lead_id: int
+    availabilities: List[AvailabilityOut]
+
+
+class SuggestedSlotOut(BaseModel):
+    start_time: datetime
+    end_time: datetime
+    participant_lead_ids: List[int]
+    score: float
+
+
+class SuggestedSlotResponse(BaseModel):
+    meeting_request_id: int
+    slot: Optional[SuggestedSlotOut] = None
+
+
+class ConfirmedMeetingOut(BaseModel):
+    id: int
+    lead_id: int
+    scheduled_start_time: datetime
+    scheduled_end_time: datetime
+    meeting_request_id: Optional[int] = None
+    meeting_slot_id: Optional[int] = None
+    call_id: Optional[int] = None
+
+
+class ConfirmBestSlotResponse(BaseModel):
+    meeting_request_id: int
+    meeting: ConfirmedMeetingOut
+    slot: SuggestedSlotOut
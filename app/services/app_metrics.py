@@ -0,0 +1,410 @@
+# app/services/app_metrics.py
+"""
+In-process Prometheus metrics (text exposition at GET /metrics).
+
+No client library or push gateway: counters live here and are rendered
+on scrape. The webhook hot paths only ever touch their own thread's
+shard (a plain dict, no lock); a scrape sums the shards, so a value may
+lag by the increments racing with it, which is fine for monitoring.
+
+Exported:
+  http_requests_total{method,route,status}
+  http_request_duration_seconds{method,route}   histogram
+  http_requests_in_flight                        gauge
+  db_pool_checkout_seconds                       histogram
+  db_pool_checked_out                            gauge (read on scrape)
+  twilio_request_duration_seconds{operation}     histogram
+  openai_request_duration_seconds{site}          histogram (from llm_metrics)
+  openai_tokens_total{site,kind}
+  openai_fallbacks_total{site,reason}
+  openai_circuit_open{site}                      gauge (from llm_resilience)
+  call_status_buffer_*                           write-behind buffer queue and
+                                                 flushes (while it is running)
+  cache_entries{cache}                           gauge (from ttl_cache)
+  cache_lookups_total{cache,result}
+  cache_evictions_total{cache,reason}
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.call_status_buffer import get_call_status_buffer
+from app.services.llm_metrics import LATENCY_BUCKETS_MS, get_llm_metrics
+from app.services.llm_resilience import OPEN, breaker_snapshot
+from app.services.ttl_cache import cache_snapshots
+
+# Seconds; webhook handlers should sit in the first few buckets
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+
+
+class _Sharded:
+    """
+    One dict per thread that touched the metric; writers never lock.
+    """
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard: dict = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def _snapshot_shards(self) -> List[dict]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        # copy() can race a writer adding a key; retry on the rare resize
+        out = []
+        for shard in shards:
+            while True:
+                try:
+                    out.append(shard.copy())
+                    break
+                except RuntimeError:
+                    continue
+        return out
+
+    def reset(self) -> None:
+        with self._shards_lock:
+            for shard in self._shards:
+                shard.clear()
+
+
+class Counter(_Sharded):
+    kind = "counter"
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def values(self) -> Dict[Labels, float]:
+        totals: Dict[Labels, float] = {}
+        for shard in self._snapshot_shards():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        shard = self._shard()
+        entry = shard.get(labels)
+        if entry is None:
+            # [per-bucket counts..., +Inf count, sum]
+            entry = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        entry[bisect.bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    @contextmanager
+    def time(self, labels: Labels = ()) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, labels)
+
+    def values(self) -> Dict[Labels, list]:
+        totals: Dict[Labels, list] = {}
+        for shard in self._snapshot_shards():
+            for labels, entry in shard.items():
+                total = totals.get(labels)
+                if total is None:
+                    totals[labels] = list(entry)
+                else:
+                    for i, value in enumerate(entry):
+                        total[i] += value
+        return totals
+
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route")
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being handled.")
+DB_POOL_CHECKOUT = Histogram(
+    "db_pool_checkout_seconds", "Time waiting for a connection from the DB pool."
+)
+TWILIO_LATENCY = Histogram(
+    "twilio_request_duration_seconds", "Twilio REST API latency.", ("operation",)
+)
+
+_METRICS: List[_Sharded] = [HTTP_REQUESTS, HTTP_LATENCY, HTTP_IN_FLIGHT, DB_POOL_CHECKOUT, TWILIO_LATENCY]
+# Engines whose pools are timed (read through engine.pool, which
+# dispose() replaces)
+_pool_engines: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def route_template(scope: Scope) -> Optional[str]:
+    """
+    Full path template of the route that handled `scope`, once routing
+    has run. Newer FastAPI keeps included routers' routes un-prefixed on
+    scope["route"] and the prefixed path on its effective route context.
+    """
+    context = (scope.get("fastapi") or {}).get("effective_route_context")
+    path = getattr(context, "path", None)
+    if path is None:
+        route = scope.get("route")
+        path = getattr(route, "path", None)
+        if path is not None:
+            path = scope.get("root_path", "") + path
+    return path
+
+
+def _time_pool_checkouts(pool) -> None:
+    connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            DB_POOL_CHECKOUT.observe(time.perf_counter() - started)
+
+    pool.connect = timed_connect
+
+
+def instrument_engine_pool(engine) -> None:
+    """
+    Time every pool checkout of `engine` and report its checked-out
+    connections on scrape.
+
+    SQLAlchemy has no pre-checkout pool event, so the pool's connect() is
+    wrapped; engine.dispose() swaps in a new pool, so the wrapper is
+    applied again on the engine's engine_disposed event.
+    """
+    if engine in _pool_engines:
+        return
+    _pool_engines.add(engine)
+    _time_pool_checkouts(engine.pool)
+    event.listen(engine, "engine_disposed", lambda e: _time_pool_checkouts(e.pool))
+
+
+def _checked_out() -> int:
+    total = 0
+    for engine in list(_pool_engines):
+        checkedout = getattr(engine.pool, "checkedout", None)
+        if checkedout is not None:
+            total += checkedout()
+    return total
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_le(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def _render_histogram(
+    lines: List[str],
+    name: str,
+    labelnames: Sequence[str],
+    labels: Sequence[str],
+    buckets: Sequence[float],
+    counts: Sequence[int],
+    total: float,
+) -> None:
+    cumulative = 0
+    for bound, count in zip(list(buckets) + [float("inf")], counts):
+        cumulative += count
+        le = 'le="' + _fmt_le(bound) + '"'
+        lines.append(f"{name}_bucket{_fmt_labels(labelnames, labels, le)} {cumulative}")
+    lines.append(f"{name}_sum{_fmt_labels(labelnames, labels)} {total}")
+    lines.append(f"{name}_count{_fmt_labels(labelnames, labels)} {cumulative}")
+
+
+def _render_status_buffer(lines: List[str], snap: dict) -> None:
+    def metric(name: str, kind: str, help_text: str, samples) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            lines.append(f"{name}{labels} {value}")
+
+    metric("call_status_buffer_pending", "gauge", "Calls with a status waiting to be flushed.",
+           [("", snap["pending"])])
+    metric("call_status_buffer_pending_events", "gauge", "Raw callbacks waiting to be flushed.",
+           [("", snap["pending_events"])])
+    metric("call_status_buffer_events_total", "counter", "Status callbacks by buffer outcome.",
+           [(_fmt_labels(("outcome",), (outcome,)), snap["events_" + outcome])
+            for outcome in ("received", "coalesced", "rejected", "dropped")])
+    metric("call_status_buffer_flushes_total", "counter", "Buffer flushes.", [("", snap["flushes"])])
+    metric("call_status_buffer_rows_written_total", "counter", "Call rows written by flushes.",
+           [("", snap["rows_written"])])
+    metric("call_status_buffer_flush_errors_total", "counter", "Failed buffer flushes.",
+           [("", snap["flush_errors"])])
+    metric("call_status_buffer_last_flush_seconds", "gauge", "Duration of the last flush.",
+           [("", snap["last_flush_ms"] / 1000)])
+    metric("call_status_buffer_max_flush_seconds", "gauge", "Slowest flush so far.",
+           [("", snap["max_flush_ms"] / 1000)])
+
+
+def _render_caches(lines: List[str], snaps: Dict[str, dict]) -> None:
+    lines.append("# HELP cache_entries Entries held by each in-process cache.")
+    lines.append("# TYPE cache_entries gauge")
+    for name, snap in snaps.items():
+        lines.append(f"cache_entries{_fmt_labels(('cache',), (name,))} {snap['entries']}")
+    lines.append("# HELP cache_lookups_total In-process cache lookups by result.")
+    lines.append("# TYPE cache_lookups_total counter")
+    for name, snap in snaps.items():
+        for result, key in (("hit", "hits"), ("miss", "misses")):
+            labels = _fmt_labels(("cache", "result"), (name, result))
+            lines.append(f"cache_lookups_total{labels} {snap[key]}")
+    lines.append("# HELP cache_evictions_total In-process cache entries dropped, by reason.")
+    lines.append("# TYPE cache_evictions_total counter")
+    for name, snap in snaps.items():
+        for reason, key in (("expired", "expired"), ("capacity", "evicted")):
+            labels = _fmt_labels(("cache", "reason"), (name, reason))
+            lines.append(f"cache_evictions_total{labels} {snap[key]}")
+
+
+def render_prometheus() -> str:
+    """
+    All metrics in the Prometheus text exposition format (0.0.4).
+    """
+    lines: List[str] = []
+
+    for metric in _METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        values = metric.values()
+        if isinstance(metric, Histogram):
+            for labels, entry in sorted(values.items()):
+                _render_histogram(
+                    lines, metric.name, metric.labelnames, labels, metric.buckets, entry[:-1], entry[-1]
+                )
+        else:
+            if not values and not metric.labelnames:
+                values = {(): 0}
+            for labels, value in sorted(values.items()):
+                lines.append(f"{metric.name}{_fmt_labels(metric.labelnames, labels)} {value}")
+
+    lines.append("# HELP db_pool_checked_out Connections currently checked out of the DB pool.")
+    lines.append("# TYPE db_pool_checked_out gauge")
+    lines.append(f"db_pool_checked_out {_checked_out()}")
+
+    llm = get_llm_metrics().snapshot()
+    seconds_buckets = [b / 1000 for b in LATENCY_BUCKETS_MS]
+    lines.append("# HELP openai_request_duration_seconds OpenAI request latency by call site.")
+    lines.append("# TYPE openai_request_duration_seconds histogram")
+    for site, stats in sorted(llm.items()):
+        latency = stats["latency_ms"]
+        _render_histogram(
+            lines,
+            "openai_request_duration_seconds",
+            ("site",),
+            (site,),
+            seconds_buckets,
+            list(latency["buckets"].values()),
+            latency["sum"] / 1000,
+        )
+    lines.append("# HELP openai_tokens_total OpenAI tokens by call site.")
+    lines.append("# TYPE openai_tokens_total counter")
+    for site, stats in sorted(llm.items()):
+        for kind in ("prompt", "completion"):
+            labels = _fmt_labels(("site", "kind"), (site, kind))
+            lines.append(f"openai_tokens_total{labels} {stats[kind + '_tokens']}")
+    lines.append("# HELP openai_fallbacks_total Deterministic fallbacks by call site and reason.")
+    lines.append("# TYPE openai_fallbacks_total counter")
+    for site, stats in sorted(llm.items()):
+        for reason, count in sorted(stats["fallbacks"].items()):
+            labels = _fmt_labels(("site", "reason"), (site, reason))
+            lines.append(f"openai_fallbacks_total{labels} {count}")
+    lines.append("# HELP openai_circuit_open 1 while the call site's circuit breaker is open.")
+    lines.append("# TYPE openai_circuit_open gauge")
+    for site, circuit in sorted(breaker_snapshot().items()):
+        labels = _fmt_labels(("site",), (site,))
+        lines.append(f"openai_circuit_open{labels} {int(circuit['state'] == OPEN)}")
+
+    buffer = get_call_status_buffer()
+    if buffer is not None:
+        _render_status_buffer(lines, buffer.snapshot())
+
+    _render_caches(lines, cache_snapshots())
+
+    return "\n".join(lines) + "\n"
+
+
+def reset_app_metrics() -> None:
+    for metric in _METRICS:
+        metric.reset()
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: per-route counts and latency, in-flight gauge.
+
+    Routes are labelled by their path template ("/twilio/voice/{call_id}")
+    once routing has run, so label cardinality stays bounded; requests
+    that match no route are labelled "unmatched".
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec()
+            route = route_template(scope) or "unmatched"
+            method = scope["method"]
+            HTTP_REQUESTS.inc((method, route, str(status)))
+            HTTP_LATENCY.observe(elapsed, (method, route))
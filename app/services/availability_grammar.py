@@ -0,0 +1,322 @@
+# app/services/availability_grammar.py
+"""
+Deterministic parser for spoken availability.
+
+Understands the forms leads actually say on the phone:
+
+    "Tuesday after 2"
+    "tomorrow morning"
+    "any time Thursday between 10 and 12"
+    "Monday at 3:30 pm or Wednesday afternoon"
+    "Tuesdays and Thursdays before noon"
+
+The transcript is scanned once by a compiled regex into day and time
+phrases, which are grouped into clauses ("Tuesday after 2" | "or Thursday
+morning") and resolved against the HardConstraints window in the lead's
+timezone. Typical transcripts parse in a few tens of microseconds, so this
+is the default path; the LLM is only consulted when `confidence` is low
+(nothing recognised, negations such as "I can't do Tuesday", contrasts
+such as "I have a meeting at 2 but otherwise Tuesday is fine", or phrases
+we resolve only partially).
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from app.schemas.constraints import HardConstraints
+
+# Local hours used for open-ended phrases ("after 2", "any time")
+WORKDAY_START = 8
+WORKDAY_END = 18
+
+# Resolved from explicit day + time, vs. only one of the two
+CONFIDENT = 1.0
+PARTIAL = 0.6
+UNSURE = 0.3
+
+_DAY_INDEX = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
+
+_PART_OF_DAY = {
+    "early morning": (8, 10),
+    "late morning": (10, 12),
+    "morning": (8, 12),
+    "noon": (12, 13),
+    "midday": (12, 13),
+    "lunch": (12, 14),
+    "lunchtime": (12, 14),
+    "early afternoon": (12, 15),
+    "late afternoon": (15, 18),
+    "afternoon": (12, 18),
+    "end of the day": (16, 18),
+    "evening": (17, 20),
+    "tonight": (17, 20),
+}
+
+_HOUR_WORDS = {
+    "one": 1,
+    "two": 2,
+    "three": 3,
+    "four": 4,
+    "five": 5,
+    "six": 6,
+    "seven": 7,
+    "eight": 8,
+    "nine": 9,
+    "ten": 10,
+    "eleven": 11,
+    "twelve": 12,
+    "noon": 12,
+}
+
+_DAY = (
+    r"mon(?:day)?|tue(?:s|sday)?|wed(?:nesday)?|thu(?:r|rs|rsday)?"
+    r"|fri(?:day)?|sat(?:urday)?|sun(?:day)?"
+)
+# A count of something ("2 weeks", "3 days of travel") is never an hour
+_NOT_A_COUNT = r"(?!\s*(?:day|week|month|year|hour|hr|minute|min|time|option)s?\b)"
+_HOUR = r"(?:\d{1,2}(?!\d)|(?:" + "|".join(_HOUR_WORDS) + r")\b)" + _NOT_A_COUNT
+_AMPM = r"a\.?\s?m\.?|p\.?\s?m\.?|o'?\s?clock"
+
+
+def _time(name: str, *, loose: bool = True, or_then: str = "") -> str:
+    # loose=False requires a minute or am/pm part (or `or_then` right
+    # after the hour), so a bare number ("2 weeks", "option 1") is not
+    # mistaken for a time
+    required = "" if loose else rf"(?=:\d{{2}}|\s*(?:{_AMPM}){'|' + or_then if or_then else ''})"
+    return (
+        rf"(?P<{name}_h>{_HOUR}){required}"
+        rf"(?::(?P<{name}_m>\d{{2}}))?\s*(?P<{name}_ap>{_AMPM})?"
+    )
+
+
+# "9 to 11" / "9-11": a bare hour joined to another is a time
+_SPAN_JOIN = rf"\s*(?:to\s+|-\s*)(?:{_HOUR})"
+
+_PARTS = "|".join(sorted(map(re.escape, _PART_OF_DAY), key=len, reverse=True))
+
+_TOKEN_RE = re.compile(
+    r"\b(?:"
+    rf"(?P<range>(?:between|from)\s+{_time('r1')}\s*(?:and|to|until|till|-)\s*{_time('r2')})"
+    rf"|(?P<span>{_time('s1', loose=False, or_then=_SPAN_JOIN)}\s*(?:to|until|till|-)\s*{_time('s2')})"
+    rf"|(?P<after>(?:after|from|starting(?:\s+at)?)\s+(?:{_time('a')}|(?P<a_lunch>lunch)))"
+    rf"|(?P<before>(?:before|until|till|by)\s+{_time('b')})"
+    rf"|(?P<at>(?:at|around|about)\s+{_time('p')})"
+    rf"|(?P<point>{_time('q', loose=False)})"
+    rf"|(?P<part>(?:in\s+the\s+)?(?P<part_name>{_PARTS})s?)"
+    r"|(?P<anytime>any\s?time|all\s+day|whenever|any\s+hour)"
+    r"|(?P<rel_day>today|tomorrow|day\s+after\s+tomorrow)"
+    r"|(?P<week>(?P<week_which>this|next)\s+week)"
+    r"|(?P<weekdays>weekdays?|any\s+day)"
+    rf"|(?P<day>(?:(?P<day_mod>this|next|on|coming)\s+)?(?P<day_name>{_DAY})(?P<day_plural>s)?)"
+    r"|(?P<negation>not|no|can'?t|cannot|won'?t|don'?t|doesn'?t|except|unless|busy|unavailable"
+    r"|but|otherwise)"
+    r")\b"
+)
+
+
+@dataclass
+class GrammarParse:
+    windows: List[Tuple[datetime, datetime]] = field(default_factory=list)
+    confidence: float = 0.0
+
+
+@dataclass
+class _Clause:
+    dates: List[date] = field(default_factory=list)
+    hours: List[Tuple[float, float]] = field(default_factory=list)
+    # "any time" only fills in when no specific hours were given
+    any_time: bool = False
+
+    @property
+    def has_time(self) -> bool:
+        return bool(self.hours) or self.any_time
+
+
+def _hour(m: re.Match, name: str) -> Tuple[float, bool]:
+    """
+    (hour as float, had am/pm) for the time captured under `name`.
+    """
+    raw = m.group(f"{name}_h")
+    hour = int(raw) if raw.isdigit() else _HOUR_WORDS[raw]
+    minute = int(m.group(f"{name}_m") or 0)
+    ampm = (m.group(f"{name}_ap") or "").replace(".", "").replace(" ", "")
+    if ampm.startswith("p") and hour < 12:
+        hour += 12
+    elif ampm.startswith("a") and hour == 12:
+        hour = 0
+    elif not ampm or "clock" in ampm:
+        # Nobody means 3 a.m. for a meeting
+        if 1 <= hour <= 7:
+            hour += 12
+    return hour + minute / 60, bool(ampm) and "clock" not in ampm
+
+
+def _range(m: re.Match, first: str, second: str) -> Optional[Tuple[float, float]]:
+    start, start_explicit = _hour(m, first)
+    end, _ = _hour(m, second)
+    if end <= start and end + 12 <= 24:
+        end += 12
+    if end <= start and not start_explicit and start >= 12 and start - 12 < end:
+        start -= 12
+    if end <= start or end > 24:
+        return None
+    return start, end
+
+
+def _week_dates(anchor: date, which: str) -> List[date]:
+    monday = anchor - timedelta(days=anchor.weekday())
+    if which == "next":
+        monday += timedelta(days=7)
+    days = [monday + timedelta(days=i) for i in range(5)]
+    return [d for d in days if d >= anchor]
+
+
+def _window_dates(first: date, last: date) -> List[date]:
+    return [first + timedelta(days=i) for i in range((last - first).days + 1)]
+
+
+def parse_spoken_availability(
+    transcript: str,
+    hard_constraints: HardConstraints,
+    duration_minutes: int,
+    now: Optional[datetime] = None,
+) -> GrammarParse:
+    """
+    Parse `transcript` into windows inside the hard_constraints window.
+
+    Windows are returned in the same timezone representation as
+    hard_constraints.window_start (naive = UTC), merged and sorted, and
+    each at least `duration_minutes` long.
+    """
+    tz = ZoneInfo(hard_constraints.timezone or "UTC")
+    ws, we = hard_constraints.window_start, hard_constraints.window_end
+    naive = ws.tzinfo is None
+    if naive:
+        ws, we = ws.replace(tzinfo=dt_timezone.utc), we.replace(tzinfo=dt_timezone.utc)
+
+    now = now or datetime.now(dt_timezone.utc)
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=dt_timezone.utc)
+    today = max(now, ws).astimezone(tz).date()
+    first_date = ws.astimezone(tz).date()
+    last_date = we.astimezone(tz).date()
+
+    clauses: List[_Clause] = []
+    current = _Clause()
+    negated = False
+
+    for m in _TOKEN_RE.finditer(transcript.lower()):
+        kind = m.lastgroup
+        dates: Optional[List[date]] = None
+        hours: Optional[Tuple[float, float]] = None
+
+        if kind == "range":
+            hours = _range(m, "r1", "r2")
+        elif kind == "span":
+            hours = _range(m, "s1", "s2")
+        elif kind == "after":
+            start = 13.0 if m.group("a_lunch") else _hour(m, "a")[0]
+            hours = (start, max(WORKDAY_END, start + duration_minutes / 60))
+        elif kind == "before":
+            end = _hour(m, "b")[0]
+            hours = (min(WORKDAY_START, end - duration_minutes / 60), end)
+        elif kind in ("at", "point"):
+            start = _hour(m, "p" if kind == "at" else "q")[0]
+            hours = (start, start + duration_minutes / 60)
+        elif kind == "part":
+            hours = _PART_OF_DAY[m.group("part_name")]
+            if m.group("part_name") == "tonight":
+                dates = [today]
+        elif kind == "anytime":
+            current.any_time = True
+        elif kind == "rel_day":
+            word = m.group("rel_day")
+            offset = 0 if word == "today" else 1 if word == "tomorrow" else 2
+            dates = [today + timedelta(days=offset)]
+        elif kind == "week":
+            dates = _week_dates(today, m.group("week_which"))
+        elif kind == "weekdays":
+            dates = [
+                d for d in _window_dates(max(today, first_date), last_date) if d.weekday() < 5
+            ]
+        elif kind == "day":
+            target = _DAY_INDEX[m.group("day_name")[:3]]
+            if m.group("day_plural"):
+                dates = [
+                    d
+                    for d in _window_dates(max(today, first_date), last_date)
+                    if d.weekday() == target
+                ]
+            else:
+                ahead = (target - today.weekday()) % 7
+                if ahead == 0 and m.group("day_mod") == "next":
+                    ahead = 7
+                # A bare weekday before the window opens means the one inside it
+                day = today + timedelta(days=ahead)
+                while day < first_date:
+                    day += timedelta(days=7)
+                dates = [day]
+        elif kind == "negation":
+            negated = True
+            continue
+
+        if dates is not None:
+            # A day after a complete clause starts the next one
+            if current.dates and current.has_time:
+                clauses.append(current)
+                current = _Clause()
+            current.dates.extend(dates)
+        if hours is not None:
+            current.hours.append(hours)
+
+    if current.dates or current.has_time:
+        clauses.append(current)
+    if not clauses:
+        return GrammarParse()
+
+    windows: List[Tuple[datetime, datetime]] = []
+    complete = True
+    min_len = timedelta(minutes=duration_minutes)
+    for clause in clauses:
+        complete = complete and bool(clause.dates) and clause.has_time
+        clause_dates = clause.dates or _window_dates(max(today, first_date), last_date)
+        clause_hours = clause.hours or [(WORKDAY_START, WORKDAY_END)]
+        for day in clause_dates:
+            midnight = datetime.combine(day, time.min, tzinfo=tz)
+            for start_h, end_h in clause_hours:
+                start = max(midnight + timedelta(hours=start_h), ws)
+                end = min(midnight + timedelta(hours=end_h), we)
+                if end - start >= min_len:
+                    windows.append((start, end))
+
+    if not windows:
+        return GrammarParse(confidence=UNSURE)
+
+    windows.sort()
+    merged = [windows[0]]
+    for start, end in windows[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+
+    out_tz = dt_timezone.utc if naive else ws.tzinfo
+    result = []
+    for start, end in merged:
+        start, end = start.astimezone(out_tz), end.astimezone(out_tz)
+        if naive:
+            start, end = start.replace(tzinfo=None), end.replace(tzinfo=None)
+        result.append((start, end))
+
+    if negated:
+        confidence = UNSURE
+    elif complete:
+        confidence = CONFIDENT
+    else:
+        confidence = PARTIAL
+    return GrammarParse(windows=result, confidence=confidence)
@@ -6,11 +6,14 @@ from typing import List, Optional, Tuple
 import json
 
 from app.schemas.constraints import HardConstraints
-from openai import OpenAI
 from app.config import get_settings
+from app.services.availability_grammar import parse_spoken_availability
+from app.services.llm_batcher import TranscriptItem, get_transcript_batcher
+from app.services.llm_client import get_async_openai_client, get_openai_client
+from app.services.llm_metrics import get_llm_metrics
+from app.services.llm_resilience import call_llm, call_llm_async
 
 settings = get_settings()
-_client = OpenAI(api_key=settings.openai_api_key) if getattr(settings, "openai_api_key", None) else None
 
 
 def _fallback_single_slot(
@@ -43,10 +46,18 @@ def parse_availability_from_speech(
     Parse a natural-language availability statement into one or more
     (start, end) windows.
 
-    For the assignment tests we keep this deterministic and always use
-    the local fallback. It does *not* call OpenAI, so tests stay fast
-    and stable even if OPENAI_API_KEY is set.
+    Deterministic and local: the rule-based grammar (availability_grammar)
+    resolves whatever it recognises; if it finds nothing usable we fall
+    back to the first slot of the window. It does *not* call OpenAI, so
+    tests stay fast and stable even if OPENAI_API_KEY is set.
     """
+    if instruction:
+        windows = parse_spoken_availability(
+            instruction, hard_constraints, duration_minutes, now=now
+        ).windows
+        if windows:
+            return windows
+
     return _fallback_single_slot(
         hard_constraints=hard_constraints,
         duration_minutes=duration_minutes,
@@ -54,6 +65,134 @@ def parse_availability_from_speech(
     )
 
 
+def confident_grammar_windows(
+    transcript: str,
+    hard_constraints: HardConstraints,
+    duration_minutes: int,
+    now: Optional[datetime] = None,
+) -> Optional[List[Tuple[datetime, datetime]]]:
+    """
+    Grammar windows if the parse is confident enough to skip the LLM
+    (AVAILABILITY_GRAMMAR_MIN_CONFIDENCE), else None.
+    """
+    if not transcript:
+        return None
+    parsed = parse_spoken_availability(transcript, hard_constraints, duration_minutes, now=now)
+    if parsed.windows and parsed.confidence >= settings.AVAILABILITY_GRAMMAR_MIN_CONFIDENCE:
+        return parsed.windows
+    return None
+
+
+def _build_messages(
+    transcript: str,
+    hard_constraints: HardConstraints,
+    duration_minutes: int,
+) -> List[dict]:
+    window_start = hard_constraints.window_start.isoformat()
+    window_end = hard_constraints.window_end.isoformat()
+    tz_name = hard_constraints.timezone
+
+    user_content = (
+        "You are a scheduling helper.\n"
+        "The caller described when they are free for a meeting.\n\n"
+        f"Call transcript:\n{transcript}\n\n"
+        f"Scheduling window (hard constraints):\n"
+        f"- start: {window_start}\n"
+        f"- end:   {window_end}\n"
+        f"Timezone: {tz_name}\n"
+        f"Desired meeting duration: {duration_minutes} minutes.\n\n"
+        "Pick one or more candidate start/end times for the meeting, "
+        "inside the window, in this JSON format:\n"
+        '{ "slots": [ '
+        '{ "start": "ISO-8601 datetime", "end": "ISO-8601 datetime" } '
+        "] }\n"
+        "Return ONLY valid JSON. Do not include any commentary."
+    )
+
+    return [
+        {
+            "role": "system",
+            "content": "You convert informal availability into concrete time windows.",
+        },
+        {"role": "user", "content": user_content},
+    ]
+
+
+def _windows_from_model_output(
+    raw: str,
+    hard_constraints: HardConstraints,
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Extract the JSON object from the model output and clamp its slots to
+    the hard_constraints window. Raises ValueError if there is no JSON.
+    """
+    # Try to extract a JSON object from the response
+    start_idx = raw.find("{")
+    end_idx = raw.rfind("}")
+    if start_idx == -1 or end_idx == -1:
+        raise ValueError("No JSON object found in model output")
+
+    json_str = raw[start_idx : end_idx + 1]
+    data = json.loads(json_str)
+
+    return _clamp_slots(data.get("slots") or [], hard_constraints)
+
+
+def _model_windows(
+    resp,
+    hard_constraints: HardConstraints,
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Windows from a chat completion; records why when there are none.
+    """
+    try:
+        windows = _windows_from_model_output(
+            resp.choices[0].message.content or "",
+            hard_constraints,
+        )
+    except Exception:
+        get_llm_metrics().record_fallback("availability", "bad_output")
+        return []
+    if not windows:
+        get_llm_metrics().record_fallback("availability", "no_slots")
+    return windows
+
+
+def _clamp_slots(
+    slots: list,
+    hard_constraints: HardConstraints,
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Parse the model's {"start", "end"} slots, clamped to the
+    hard_constraints window; unusable slots are dropped.
+    """
+    windows: List[Tuple[datetime, datetime]] = []
+
+    for slot in slots:
+        s = slot.get("start")
+        e = slot.get("end")
+        if not s or not e:
+            continue
+
+        try:
+            dt_start = datetime.fromisoformat(s)
+            dt_end = datetime.fromisoformat(e)
+        except Exception:
+            continue
+
+        # Clamp to the overall hard_constraints window
+        if dt_start < hard_constraints.window_start:
+            dt_start = hard_constraints.window_start
+        if dt_end > hard_constraints.window_end:
+            dt_end = hard_constraints.window_end
+        if dt_end <= dt_start:
+            continue
+
+        windows.append((dt_start, dt_end))
+
+    return windows
+
+
 def parse_availability_from_transcript(
     transcript: str,
     hard_constraints: HardConstraints,
@@ -63,13 +202,22 @@ def parse_availability_from_transcript(
     """
     Used by the Twilio voice flow.
 
+    - If the local grammar parses the transcript confidently, use that.
     - If OpenAI is not configured or transcript is empty: fall back to
-      the deterministic behavior (first slot in the window).
-    - If OpenAI *is* configured: ask it to pick one or more slots inside
-      the given hard_constraints window, then clamp the results.
+      the deterministic behavior (parse_availability_from_speech).
+    - Otherwise ask OpenAI to pick one or more slots inside the given
+      hard_constraints window, then clamp the results.
     """
+    windows = confident_grammar_windows(transcript, hard_constraints, duration_minutes, now)
+    if windows:
+        return windows
+
     # 1) If no client or no text – behave exactly like before
-    if not transcript or _client is None:
+    client = get_openai_client() if transcript else None
+    if client is None:
+        get_llm_metrics().record_fallback(
+            "availability", "no_client" if transcript else "no_transcript"
+        )
         return parse_availability_from_speech(
             instruction=transcript,
             hard_constraints=hard_constraints,
@@ -79,79 +227,18 @@ def parse_availability_from_transcript(
 
     # 2) Try OpenAI; on *any* error, we fall back to deterministic slot
     try:
-        window_start = hard_constraints.window_start.isoformat()
-        window_end = hard_constraints.window_end.isoformat()
-        tz_name = hard_constraints.timezone
-
-        user_content = (
-            "You are a scheduling helper.\n"
-            "The caller described when they are free for a meeting.\n\n"
-            f"Call transcript:\n{transcript}\n\n"
-            f"Scheduling window (hard constraints):\n"
-            f"- start: {window_start}\n"
-            f"- end:   {window_end}\n"
-            f"Timezone: {tz_name}\n"
-            f"Desired meeting duration: {duration_minutes} minutes.\n\n"
-            "Pick one or more candidate start/end times for the meeting, "
-            "inside the window, in this JSON format:\n"
-            '{ "slots": [ '
-            '{ "start": "ISO-8601 datetime", "end": "ISO-8601 datetime" } '
-            "] }\n"
-            "Return ONLY valid JSON. Do not include any commentary."
-        )
-
-        resp = _client.chat.completions.create(
+        resp = call_llm(
+            "availability",
+            client.chat.completions.create,
             model=getattr(settings, "openai_model", "gpt-4.1-mini"),
             temperature=0,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You convert informal availability into concrete time windows.",
-                },
-                {"role": "user", "content": user_content},
-            ],
+            messages=_build_messages(transcript, hard_constraints, duration_minutes),
         )
-
-        raw = resp.choices[0].message.content or ""
-        # Try to extract a JSON object from the response
-        start_idx = raw.find("{")
-        end_idx = raw.rfind("}")
-        if start_idx == -1 or end_idx == -1:
-            raise ValueError("No JSON object found in model output")
-
-        json_str = raw[start_idx : end_idx + 1]
-        data = json.loads(json_str)
-
-        slots = data.get("slots") or []
-        windows: List[Tuple[datetime, datetime]] = []
-
-        for slot in slots:
-            s = slot.get("start")
-            e = slot.get("end")
-            if not s or not e:
-                continue
-
-            try:
-                dt_start = datetime.fromisoformat(s)
-                dt_end = datetime.fromisoformat(e)
-            except Exception:
-                continue
-
-            # Clamp to the overall hard_constraints window
-            if dt_start < hard_constraints.window_start:
-                dt_start = hard_constraints.window_start
-            if dt_end > hard_constraints.window_end:
-                dt_end = hard_constraints.window_end
-            if dt_end <= dt_start:
-                continue
-
-            windows.append((dt_start, dt_end))
-
+        windows = _model_windows(resp, hard_constraints)
         if windows:
             return windows
-
     except Exception:
-        # Swallow any LLM / JSON / parsing issues and fall back
+        # Swallow any LLM issues and fall back (call_llm records them)
         pass
 
     # 3) Final fallback – deterministic, test-friendly
@@ -161,3 +248,63 @@ def parse_availability_from_transcript(
         duration_minutes=duration_minutes,
         now=now,
     )
+
+
+async def llm_windows_from_transcript_async(
+    transcript: str,
+    hard_constraints: HardConstraints,
+    duration_minutes: int,
+) -> Optional[List[Tuple[datetime, datetime]]]:
+    """
+    Ask OpenAI (via AsyncOpenAI) for windows, without any fallback.
+
+    Returns None when OpenAI isn't configured, the call fails, or the
+    answer has no usable slots, so callers can tell "the model answered"
+    apart from "use the deterministic fallback".
+
+    When the transcript batcher is running (OPENAI_BATCH_ENABLED), the
+    request is folded into a multi-item batch instead of sent alone.
+    """
+    if not transcript:
+        return None
+
+    batcher = get_transcript_batcher()
+    if batcher is not None and batcher.running:
+        slots = await batcher.parse(
+            TranscriptItem(
+                transcript=transcript,
+                window_start=hard_constraints.window_start.isoformat(),
+                window_end=hard_constraints.window_end.isoformat(),
+                timezone=hard_constraints.timezone,
+                duration_minutes=duration_minutes,
+            )
+        )
+        if slots is None:
+            get_llm_metrics().record_fallback("availability", "batch_no_result")
+            return None
+        try:
+            windows = _clamp_slots(slots, hard_constraints)
+        except Exception:
+            windows = []
+        if not windows:
+            get_llm_metrics().record_fallback("availability", "no_slots")
+        return windows or None
+
+    client = get_async_openai_client()
+    if client is None:
+        get_llm_metrics().record_fallback("availability", "no_client")
+        return None
+
+    try:
+        resp = await call_llm_async(
+            "availability",
+            client.chat.completions.create,
+            model=getattr(settings, "openai_model", "gpt-4.1-mini"),
+            temperature=0,
+            messages=_build_messages(transcript, hard_constraints, duration_minutes),
+        )
+    except Exception:
+        return None
+
+    return _model_windows(resp, hard_constraints) or None
+
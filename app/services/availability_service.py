@@ -17,6 +17,7 @@ def record_availability_for_lead(
     lead_id: int,
     windows: Iterable[Tuple[datetime, datetime]],
     source_text: Optional[str] = None,
+    refresh: bool = True,
 ) -> List[ParticipantAvailability]:
     """
     Record availability windows for a given lead & meeting request.
@@ -27,6 +28,8 @@ def record_availability_for_lead(
     - Inserts new rows for each window in `windows`.
 
     Returns the list of newly created ParticipantAvailability records.
+    Pass refresh=False when the caller doesn't read them back (e.g. the
+    voice webhook), to skip the per-row SELECT after commit.
     """
 
     # Remove existing candidate windows for idempotency
@@ -56,7 +59,8 @@ def record_availability_for_lead(
         created.append(pa)
 
     db.commit()
-    for pa in created:
-        db.refresh(pa)
+    if refresh:
+        for pa in created:
+            db.refresh(pa)
 
     return created
@@ -0,0 +1,296 @@
+# app/services/call_analytics_service.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import bindparam, func, insert, select, text, update
+from sqlalchemy.orm import Session
+
+from app.models.call import Call
+from app.models.call_event import CallEvent
+from app.models.call_timing import CallTiming
+from app.models.campaign_call_stats import CampaignCallStats
+
+logger = logging.getLogger(__name__)
+
+_START_STATUSES = {"queued", "initiated"}
+_TERMINAL_STATUSES = {"completed", "busy", "failed", "no-answer", "canceled"}
+
+
+def _insert_events_stmt():
+    calls = Call.__table__
+    call_id = (
+        select(calls.c.id)
+        .where(calls.c.provider_call_id == bindparam("sid"))
+        .scalar_subquery()
+    )
+    return insert(CallEvent.__table__).values(
+        call_id=call_id,
+        provider_call_id=bindparam("sid"),
+        status=bindparam("ev_status"),
+        ts=bindparam("ev_ts"),
+        call_duration=bindparam("ev_duration"),
+        error_code=bindparam("ev_error_code"),
+    )
+
+
+def record_call_events(db: Session, events: Sequence) -> None:
+    """
+    Append status callbacks to `call_events` in one executemany INSERT.
+
+    `events` are StatusEvent-like objects (provider_call_id, call_status,
+    received_at, call_duration, error_code).
+
+    `call_id` is resolved by a subquery on provider_call_id inside the
+    same statement, so no lookups are needed. Does not commit; callers
+    write the event log in the same transaction as the status update.
+    """
+    if not events:
+        return
+    db.execute(
+        _insert_events_stmt(),
+        [
+            {
+                "sid": e.provider_call_id,
+                "ev_status": e.call_status.lower(),
+                "ev_ts": e.received_at,
+                "ev_duration": e.call_duration,
+                "ev_error_code": e.error_code,
+            }
+            for e in events
+        ],
+    )
+
+
+def _seconds_between(start, end) -> Optional[int]:
+    if start is None or end is None or end < start:
+        return None
+    return int((end - start).total_seconds())
+
+
+def _fold_event(timing: CallTiming, event: CallEvent) -> None:
+    status = event.status
+    ts = event.ts
+
+    if status in _START_STATUSES:
+        if timing.started_at is None or ts < timing.started_at:
+            timing.started_at = ts
+    elif status == "ringing":
+        if timing.ringing_at is None or ts < timing.ringing_at:
+            timing.ringing_at = ts
+    elif status == "in-progress":
+        if timing.answered_at is None or ts < timing.answered_at:
+            timing.answered_at = ts
+    elif status in _TERMINAL_STATUSES and timing.ended_at is None:
+        timing.ended_at = ts
+        timing.final_status = status
+        if event.call_duration is not None:
+            timing.talk_seconds = event.call_duration
+        if status == "completed" and timing.answered_at is None:
+            # Twilio only reports "completed" for answered calls; if the
+            # in-progress callback was missed, derive it from the duration.
+            timing.answered_at = ts - timedelta(seconds=event.call_duration or 0)
+
+    timing.ring_seconds = _seconds_between(
+        timing.ringing_at or timing.started_at, timing.answered_at or timing.ended_at
+    )
+    if timing.talk_seconds is None and timing.answered_at and timing.ended_at:
+        timing.talk_seconds = _seconds_between(timing.answered_at, timing.ended_at)
+
+    timing.last_event_id = max(timing.last_event_id or 0, event.id)
+
+
+# Event ids can commit out of order (concurrent inserts on PostgreSQL), so
+# each run looks this far back below the highest folded id; the events'
+# own rolled_up flag decides what is actually new
+ROLLUP_LOOKBACK_IDS = 5000
+
+# Serialises rollups within the process; _lock_rollup covers other processes
+_rollup_lock = threading.Lock()
+_ROLLUP_ADVISORY_LOCK_KEY = 0x63616C6C  # "call"
+
+
+def _lock_rollup(db: Session) -> None:
+    """
+    Take the cross-process rollup lock for the current transaction.
+
+    PostgreSQL: a transaction-scoped advisory lock. SQLite serialises
+    writers itself: a concurrent rollup that read before another one
+    committed fails with SQLITE_BUSY(_SNAPSHOT) instead of folding twice.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _ROLLUP_ADVISORY_LOCK_KEY})
+
+
+def rollup_call_events(
+    db: Session,
+    *,
+    batch_size: int = 1000,
+    lookback_ids: int = ROLLUP_LOOKBACK_IDS,
+) -> int:
+    """
+    Fold new CallEvent rows into CallTiming and CampaignCallStats.
+
+    Incremental: events are read in id order, `batch_size` at a time,
+    starting `lookback_ids` below the highest CallTiming.last_event_id;
+    an event is new until its rolled_up flag is set (in the same
+    transaction that folds it), so an event that committed after higher
+    ids were folded, even of the same call, is still picked up as long as
+    it lands within the lookback. Counters on CampaignCallStats are adjusted by the delta each call
+    contributes, so re-running is cheap and never rescans the raw log.
+
+    Runs under a process lock plus _lock_rollup, so concurrent runs never
+    fold the same events twice. Call it from one place (the app's
+    periodic task or scripts/rollup_call_events.py), not from requests.
+
+    Returns the number of events processed.
+    """
+    with _rollup_lock:
+        return _rollup_locked(db, batch_size, lookback_ids)
+
+
+def _rollup_locked(db: Session, batch_size: int, lookback_ids: int) -> int:
+    processed = 0
+    cursor: Optional[int] = None
+
+    while True:
+        _lock_rollup(db)
+        if cursor is None:
+            high = db.scalar(select(func.max(CallTiming.last_event_id))) or 0
+            cursor = max(high - lookback_ids, 0)
+
+        events: List[CallEvent] = list(
+            db.scalars(
+                select(CallEvent)
+                .where(
+                    CallEvent.id > cursor,
+                    CallEvent.call_id.is_not(None),
+                    CallEvent.rolled_up.is_(False),
+                )
+                .order_by(CallEvent.id)
+                .limit(batch_size)
+            )
+        )
+        if not events:
+            db.rollback()
+            break
+
+        call_ids = {e.call_id for e in events}
+        timings: Dict[int, CallTiming] = {
+            t.call_id: t
+            for t in db.scalars(select(CallTiming).where(CallTiming.call_id.in_(call_ids)))
+        }
+        mr_by_call: Dict[int, Optional[int]] = dict(
+            db.execute(
+                select(Call.id, Call.meeting_request_id).where(Call.id.in_(call_ids))
+            ).all()
+        )
+
+        # Per-campaign deltas for this batch
+        deltas: Dict[int, Dict[str, int]] = {}
+
+        def _bump(mr_id: Optional[int], key: str, amount: int = 1) -> None:
+            if mr_id is None or not amount:
+                return
+            d = deltas.setdefault(mr_id, {})
+            d[key] = d.get(key, 0) + amount
+
+        for event in events:
+            timing = timings.get(event.call_id)
+            if timing is None:
+                timing = CallTiming(
+                    call_id=event.call_id,
+                    meeting_request_id=mr_by_call.get(event.call_id),
+                )
+                timings[event.call_id] = timing
+                db.add(timing)
+                _bump(timing.meeting_request_id, "calls_total")
+
+            was_answered = timing.answered_at is not None
+            was_ended = timing.ended_at is not None
+            old_ring = timing.ring_seconds or 0
+            old_talk = timing.talk_seconds or 0
+
+            _fold_event(timing, event)
+
+            mr_id = timing.meeting_request_id
+            if not was_answered and timing.answered_at is not None:
+                _bump(mr_id, "calls_answered")
+            if not was_ended and timing.ended_at is not None:
+                _bump(mr_id, "calls_ended")
+            _bump(mr_id, "total_ring_seconds", (timing.ring_seconds or 0) - old_ring)
+            _bump(mr_id, "total_talk_seconds", (timing.talk_seconds or 0) - old_talk)
+
+        if deltas:
+            stats = {
+                s.meeting_request_id: s
+                for s in db.scalars(
+                    select(CampaignCallStats).where(
+                        CampaignCallStats.meeting_request_id.in_(deltas)
+                    )
+                )
+            }
+            for mr_id, delta in deltas.items():
+                row = stats.get(mr_id)
+                if row is None:
+                    row = CampaignCallStats(
+                        meeting_request_id=mr_id,
+                        calls_total=0,
+                        calls_answered=0,
+                        calls_ended=0,
+                        total_ring_seconds=0,
+                        total_talk_seconds=0,
+                    )
+                    db.add(row)
+                for key, amount in delta.items():
+                    setattr(row, key, getattr(row, key) + amount)
+
+        db.execute(
+            update(CallEvent)
+            .where(CallEvent.id.in_([e.id for e in events]))
+            .values(rolled_up=True)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        processed += len(events)
+        cursor = events[-1].id
+
+        if len(events) < batch_size:
+            break
+
+    return processed
+
+
+async def run_rollup_periodically(
+    session_factory: Callable[[], Session],
+    interval_seconds: float,
+) -> None:
+    """
+    Background task (started by the app lifespan): roll up call events
+    every `interval_seconds` until cancelled.
+    """
+
+    def _rollup_once() -> int:
+        db = session_factory()
+        try:
+            return rollup_call_events(db)
+        finally:
+            db.close()
+
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(_rollup_once)
+        except Exception:
+            logger.exception("Call event rollup failed; retrying next interval")
+
+
+def get_campaign_call_stats(
+    db: Session,
+    meeting_request_id: int,
+) -> Optional[CampaignCallStats]:
+    return db.get(CampaignCallStats, meeting_request_id)
@@ -0,0 +1,111 @@
+# app/services/call_context_cache.py
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from app.config import get_settings
+from app.models.call import Call
+from app.models.meeting_request import MeetingRequest
+from app.schemas.constraints import HardConstraints
+from app.services.ttl_cache import TTLCache
+
+
+@dataclass(frozen=True)
+class CallContext:
+    """
+    Everything the voice webhooks need to know about an in-flight call,
+    so /twilio/voice/gather can answer without read queries.
+    """
+    call_id: int
+    lead_id: int
+    meeting_request_id: int
+    duration_minutes: int
+    hard_constraints: HardConstraints
+    timezone: str
+
+
+def build_call_context(
+    call: Call,
+    meeting_request: Optional[MeetingRequest],
+) -> Optional[CallContext]:
+    """
+    Build a CallContext, or None if the call can't be used for scheduling
+    (no lead / meeting request, or missing / invalid hard constraints).
+    """
+    if not call.lead_id or meeting_request is None or not meeting_request.hard_constraints:
+        return None
+
+    try:
+        hc = HardConstraints.model_validate(meeting_request.hard_constraints)
+    except ValueError:
+        return None
+
+    return CallContext(
+        call_id=call.id,
+        lead_id=call.lead_id,
+        meeting_request_id=meeting_request.id,
+        duration_minutes=meeting_request.duration_minutes,
+        hard_constraints=hc,
+        timezone=hc.timezone,
+    )
+
+
+class CallContextCache:
+    """
+    TTL + LRU cache of CallContext keyed by CallSid.
+
+    - Warmed when initiate_outbound_call creates the call.
+    - Entries expire after `ttl_seconds` (roughly the longest call we
+      expect) and are evicted early on the terminal status callback.
+    - Bounded to `max_entries`; the least recently used entry goes first.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = 3600,
+        max_entries: int = 50_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._entries: TTLCache[CallContext] = TTLCache(
+            "call_context", ttl_seconds=ttl_seconds, max_entries=max_entries, clock=clock
+        )
+
+    @property
+    def hits(self) -> int:
+        return self._entries.hits
+
+    @property
+    def misses(self) -> int:
+        return self._entries.misses
+
+    def get(self, provider_call_id: str) -> Optional[CallContext]:
+        return self._entries.get(provider_call_id)
+
+    def put(self, provider_call_id: str, ctx: CallContext) -> None:
+        self._entries.put(provider_call_id, ctx)
+
+    def evict(self, provider_call_id: str) -> None:
+        self._entries.evict(provider_call_id)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_cache: Optional[CallContextCache] = None
+
+
+def get_call_context_cache() -> CallContextCache:
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        _cache = CallContextCache(
+            ttl_seconds=settings.CALL_CONTEXT_TTL_SECONDS,
+            max_entries=settings.CALL_CONTEXT_MAX_ENTRIES,
+        )
+    return _cache
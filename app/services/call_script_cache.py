@@ -0,0 +1,138 @@
+# app/services/call_script_cache.py
+"""
+Call scripts generated ahead of time, so /twilio/voice never waits on them.
+
+Script generation may call OpenAI (call_script_service), which is far too
+slow to do while a lead is waiting on the line. Instead, when a campaign is
+created we generate:
+
+  - one script per meeting request (call_script_service, possibly LLM), and
+  - one personalised script per lead (script_service.generate_call_script)
+
+render each into answer TwiML once, and keep the bytes here keyed by
+(meeting_request_id, lead_id, TEMPLATE_VERSION). The meeting-level script
+is stored with lead_id=None and used for leads without their own entry.
+"""
+from __future__ import annotations
+
+import time
+from typing import Callable, Iterable, Optional, Tuple
+
+from app.config import get_settings
+from app.models.lead import Lead
+from app.models.meeting_request import MeetingRequest
+from app.services import call_script_service, script_service
+from app.services.ttl_cache import TTLCache
+from app.services.twiml_templates import ANSWER_WITH_SCRIPT, render_twiml
+
+# Bump when the script wording / composition changes
+TEMPLATE_VERSION = "1"
+
+_KEYPAD_PROMPT = (
+    "You can say a time that works for you, "
+    "or press 1 for the earliest available time, "
+    "2 for a later time in the window, and then wait."
+)
+
+ScriptKey = Tuple[int, Optional[int], str]
+
+
+def script_key(meeting_request_id: int, lead_id: Optional[int]) -> ScriptKey:
+    return (meeting_request_id, lead_id, TEMPLATE_VERSION)
+
+
+def personalized_script_text(
+    meeting_request: MeetingRequest,
+    lead: Lead,
+) -> str:
+    script = script_service.generate_call_script(meeting_request, lead)
+    return f"{script.greeting} {script.question} {_KEYPAD_PROMPT}"
+
+
+class CallScriptCache:
+    """
+    TTL + LRU map of ScriptKey -> answer TwiML bytes.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = 7 * 86_400,
+        max_entries: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._entries: TTLCache[bytes] = TTLCache(
+            "call_script", ttl_seconds=ttl_seconds, max_entries=max_entries, clock=clock
+        )
+
+    @property
+    def hits(self) -> int:
+        return self._entries.hits
+
+    @property
+    def misses(self) -> int:
+        return self._entries.misses
+
+    def get(self, key: ScriptKey) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    def put(self, key: ScriptKey, twiml: bytes) -> None:
+        self._entries.put(key, twiml)
+
+    def answer_twiml(self, meeting_request_id: int, lead_id: Optional[int]) -> Optional[bytes]:
+        """
+        The lead's own script, else the meeting's, else None.
+        """
+        twiml = self.get(script_key(meeting_request_id, lead_id))
+        if twiml is None and lead_id is not None:
+            twiml = self.get(script_key(meeting_request_id, None))
+        return twiml
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_cache: Optional[CallScriptCache] = None
+
+
+def get_call_script_cache() -> CallScriptCache:
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        _cache = CallScriptCache(
+            ttl_seconds=settings.CALL_SCRIPT_TTL_SECONDS,
+            max_entries=settings.CALL_SCRIPT_MAX_ENTRIES,
+        )
+    return _cache
+
+
+def pregenerate_campaign_scripts(
+    meeting_request: MeetingRequest,
+    leads: Iterable[Lead],
+) -> int:
+    """
+    Generate and cache the meeting's script and every lead's personalised
+    script. Call before dialling, so answered calls find them ready.
+
+    Returns the number of scripts stored.
+    """
+    cache = get_call_script_cache()
+
+    meeting_script = call_script_service.generate_call_script(meeting_request.title)
+    cache.put(
+        script_key(meeting_request.id, None),
+        render_twiml(ANSWER_WITH_SCRIPT, meeting_script),
+    )
+    stored = 1
+
+    for lead in leads:
+        cache.put(
+            script_key(meeting_request.id, lead.id),
+            render_twiml(ANSWER_WITH_SCRIPT, personalized_script_text(meeting_request, lead)),
+        )
+        stored += 1
+
+    return stored
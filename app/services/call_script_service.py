@@ -1,12 +1,9 @@
 # app/services/call_script_service.py
 from __future__ import annotations
 
-import os
-
-try:
-    from openai import OpenAI  # type: ignore
-except Exception:  # pragma: no cover
-    OpenAI = None
+from app.services.llm_client import get_openai_client
+from app.services.llm_metrics import get_llm_metrics
+from app.services.llm_resilience import call_llm
 
 
 _BASE_SCRIPT = (
@@ -24,12 +21,12 @@ def generate_call_script(meeting_title: str | None = None) -> str:
     - If OpenAI is not configured, we return a fixed script (exactly what tests expect).
     - If OpenAI is configured, we let the model lightly rewrite / personalize the script.
     """
-    if OpenAI is None or not os.getenv("OPENAI_API_KEY"):
+    client = get_openai_client()
+    if client is None:
+        get_llm_metrics().record_fallback("call_script", "no_client")
         return _BASE_SCRIPT
 
     try:
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
         context_title = meeting_title or "the upcoming meeting"
 
         system_msg = (
@@ -42,7 +39,9 @@ def generate_call_script(meeting_title: str | None = None) -> str:
             "them or press 1 for the earliest time and 2 for a later time in the window."
         )
 
-        resp = client.chat.completions.create(
+        resp = call_llm(
+            "call_script",
+            client.chat.completions.create,
             model="gpt-4o-mini",
             messages=[
                 {"role": "system", "content": system_msg},
@@ -53,6 +52,10 @@ def generate_call_script(meeting_title: str | None = None) -> str:
         script = (resp.choices[0].message.content or "").strip()
 
         # Guardrail: never return empty; keep base text as a backup
-        return script or _BASE_SCRIPT
+        if not script:
+            get_llm_metrics().record_fallback("call_script", "empty_answer")
+            return _BASE_SCRIPT
+        return script
     except Exception:
+        # Provider errors are recorded by call_llm
         return _BASE_SCRIPT
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from app.models.call import Call
 from app.models.lead import Lead
 from app.models.meeting_request import MeetingRequest
+from app.services.call_context_cache import build_call_context, get_call_context_cache
 from app.services.twilio_client import TwilioClient
 
 
@@ -22,6 +23,9 @@ def initiate_outbound_call(
     have one yet keep working.
 
     Later, campaign flows will always pass a MeetingRequest here.
+
+    The call's context (lead, meeting request, parsed constraints) is put
+    in the call-context cache so the voice webhooks don't have to query it.
     """
     call_sid = twilio_client.create_outbound_call(to_number=lead.phone)
 
@@ -37,8 +41,13 @@ def initiate_outbound_call(
         call.meeting_request_id = meeting_request.id
 
     db.add(call)
+    db.flush()
+    # Build before commit, while meeting_request's attributes are still loaded
+    ctx = build_call_context(call, meeting_request)
     db.commit()
     db.refresh(call)
-    return call
 
+    if ctx is not None and call.provider_call_id:
+        get_call_context_cache().put(call.provider_call_id, ctx)
 
+    return call
@@ -0,0 +1,419 @@
+# app/services/call_status_buffer.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import bindparam, case, func, update
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.models.call import Call
+from app.services.call_analytics_service import record_call_events
+
+logger = logging.getLogger(__name__)
+
+# Twilio's call lifecycle, lowest to highest. A status may only replace
+# one of equal or lower rank, so a late "ringing" never overwrites
+# "completed". Unknown statuses rank lowest.
+STATUS_PRECEDENCE: Dict[str, int] = {
+    "queued": 0,
+    "initiated": 1,
+    "ringing": 2,
+    "in-progress": 3,
+    "completed": 4,
+    "busy": 4,
+    "failed": 4,
+    "no-answer": 4,
+    "canceled": 4,
+}
+TERMINAL_STATUSES = frozenset(s for s, rank in STATUS_PRECEDENCE.items() if rank == 4)
+
+
+def status_rank(status: Optional[str]) -> int:
+    return STATUS_PRECEDENCE.get((status or "").lower(), -1)
+
+
+@dataclass
+class StatusEvent:
+    provider_call_id: str
+    call_status: str
+    error_code: Optional[str] = None
+    error_message: Optional[str] = None
+    call_duration: Optional[int] = None
+    received_at: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass
+class BufferMetrics:
+    events_received: int = 0
+    events_coalesced: int = 0
+    events_rejected: int = 0
+    events_dropped: int = 0
+    flushes: int = 0
+    rows_written: int = 0
+    flush_errors: int = 0
+    last_flush_size: int = 0
+    max_flush_size: int = 0
+    last_flush_ms: float = 0.0
+    max_flush_ms: float = 0.0
+    total_flush_ms: float = 0.0
+
+    def record_flush(self, size: int, elapsed_ms: float) -> None:
+        self.flushes += 1
+        self.rows_written += size
+        self.last_flush_size = size
+        self.max_flush_size = max(self.max_flush_size, size)
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self.total_flush_ms += elapsed_ms
+
+
+def status_update_stmt():
+    """
+    Rank-guarded status UPDATE, bound per event with status_update_params();
+    the buffer runs it with many parameter sets (executemany), the
+    synchronous webhook fallback with one.
+
+    The rank guard in the WHERE clause enforces status precedence against
+    what is already stored, across flushes as well as within one.
+    """
+    calls = Call.__table__
+    current_rank = case(
+        {status: rank for status, rank in STATUS_PRECEDENCE.items()},
+        value=calls.c.status,
+        else_=-1,
+    )
+    return (
+        update(calls)
+        .where(calls.c.provider_call_id == bindparam("sid"))
+        .where(current_rank <= bindparam("rank"))
+        .values(
+            status=bindparam("new_status"),
+            updated_at=bindparam("ts"),
+            error_code=func.coalesce(bindparam("new_error_code"), calls.c.error_code),
+            error_message=func.coalesce(
+                bindparam("new_error_message"), calls.c.error_message
+            ),
+        )
+    )
+
+
+def status_update_params(e: StatusEvent) -> Dict[str, Any]:
+    return {
+        "sid": e.provider_call_id,
+        "rank": status_rank(e.call_status),
+        "new_status": e.call_status,
+        "ts": e.received_at,
+        "new_error_code": e.error_code,
+        "new_error_message": e.error_message[:255] if e.error_message else None,
+    }
+
+
+def write_status_events(
+    db: Session,
+    events: List[StatusEvent],
+    raw_events: Optional[List[StatusEvent]] = None,
+) -> None:
+    """
+    Persist already-coalesced events in a single executemany + commit.
+
+    `raw_events` (every callback, uncoalesced) are appended to the
+    call_events log in the same transaction.
+    """
+    if not events:
+        return
+    record_call_events(db, raw_events if raw_events is not None else events)
+    db.execute(status_update_stmt(), [status_update_params(e) for e in events])
+    db.commit()
+
+
+class CallStatusBuffer:
+    """
+    Bounded, coalescing write-behind buffer for Twilio status callbacks.
+
+    - submit() is called from the webhook and returns immediately, so
+      Twilio gets its 200 without waiting on the database.
+    - Only the highest-precedence (then latest) status per CallSid is kept.
+    - Pending events are flushed every `flush_interval_ms`, or as soon as
+      `max_batch` distinct calls are pending, in one executemany.
+    - At most `max_pending` distinct calls (and `max_events` raw callbacks
+      for the call_events log) are held; beyond that submit() returns
+      False and the caller should write synchronously instead.
+    - A batch that fails `max_flush_attempts` flushes in a row is written
+      call by call; calls whose write still fails with a statement error
+      (a bad row, not a database outage) are logged and dropped, so one
+      poison row can't block the buffer.
+    - stop() drains everything still pending (wired into the app lifespan).
+
+    All methods except the flush itself run on the event loop thread.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        *,
+        flush_interval_ms: int = 50,
+        max_batch: int = 200,
+        max_pending: int = 10_000,
+        max_events: Optional[int] = None,
+        max_flush_attempts: int = 3,
+    ):
+        if (
+            flush_interval_ms <= 0
+            or max_batch <= 0
+            or max_pending < max_batch
+            or max_flush_attempts <= 0
+        ):
+            raise ValueError(
+                "flush_interval_ms, max_batch and max_flush_attempts must be "
+                "positive and max_pending >= max_batch"
+            )
+
+        self._session_factory = session_factory
+        self._flush_interval = flush_interval_ms / 1000
+        self._max_batch = max_batch
+        self._max_pending = max_pending
+        # Twilio sends at most ~6 callbacks per call
+        self._max_events = max_events or max_pending * 6
+        self._max_flush_attempts = max_flush_attempts
+        self._failed_flushes = 0
+
+        self._pending: Dict[str, StatusEvent] = {}
+        # Every accepted callback, in arrival order, for the call_events log
+        self._raw: List[StatusEvent] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._closing = False
+
+        self.metrics = BufferMetrics()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done() and not self._closing
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._closing = False
+        self._task = asyncio.create_task(self._run(), name="call-status-buffer")
+
+    async def stop(self) -> None:
+        """
+        Stop accepting events and flush everything still pending.
+        """
+        if self._task is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        await self.flush()
+        if self._pending:
+            # Last chance: isolate whatever keeps failing
+            self._failed_flushes = self._max_flush_attempts
+            await self.flush()
+        if self._pending or self._raw:
+            logger.error(
+                "Dropping %d call status updates (%d callbacks) still unwritten at shutdown",
+                len(self._pending),
+                len(self._raw),
+            )
+            self.metrics.events_dropped += len(self._raw)
+            self._pending, self._raw = {}, []
+
+    def submit(self, event: StatusEvent) -> bool:
+        if not self.running:
+            return False
+
+        sid = event.provider_call_id
+        existing = self._pending.get(sid)
+
+        if len(self._raw) >= self._max_events or (
+            existing is None and len(self._pending) >= self._max_pending
+        ):
+            self.metrics.events_rejected += 1
+            self._wakeup.set()
+            return False
+
+        self.metrics.events_received += 1
+        self._raw.append(event)
+
+        if existing is not None:
+            self.metrics.events_coalesced += 1
+            if status_rank(event.call_status) >= status_rank(existing.call_status):
+                # Keep error context from the earlier event if this one has none
+                self._pending[sid] = replace(
+                    event,
+                    error_code=event.error_code or existing.error_code,
+                    error_message=event.error_message or existing.error_message,
+                )
+            return True
+
+        self._pending[sid] = event
+        if len(self._pending) >= self._max_batch:
+            self._wakeup.set()
+        return True
+
+    async def flush(self) -> int:
+        """
+        Write all pending events now. Returns how many rows were written.
+        """
+        if not self._pending:
+            return 0
+
+        async with self._flush_lock:
+            batch, self._pending = list(self._pending.values()), {}
+            raw, self._raw = self._raw, []
+            if not batch:
+                return 0
+
+            started = time.perf_counter()
+            if self._failed_flushes >= self._max_flush_attempts:
+                return await self._flush_each(batch, raw, started)
+            try:
+                await asyncio.to_thread(self._write, batch, raw)
+            except Exception:
+                self.metrics.flush_errors += 1
+                self._failed_flushes += 1
+                logger.exception(
+                    "Failed to flush %d call status events (attempt %d of %d)",
+                    len(batch),
+                    self._failed_flushes,
+                    self._max_flush_attempts,
+                )
+                self._requeue(batch, raw)
+                return 0
+
+            self._failed_flushes = 0
+            self.metrics.record_flush(len(batch), (time.perf_counter() - started) * 1000)
+            return len(batch)
+
+    async def _flush_each(
+        self,
+        batch: List[StatusEvent],
+        raw: List[StatusEvent],
+        started: float,
+    ) -> int:
+        raw_by_sid: Dict[str, List[StatusEvent]] = {}
+        for e in raw:
+            raw_by_sid.setdefault(e.provider_call_id, []).append(e)
+
+        written, retry, dropped = await asyncio.to_thread(self._write_each, batch, raw_by_sid)
+
+        self._failed_flushes = 0
+        for e in dropped:
+            self.metrics.events_dropped += len(raw_by_sid.get(e.provider_call_id, ())) or 1
+        if retry:
+            # The database itself is failing; keep them for the next flush
+            self.metrics.flush_errors += 1
+            self._requeue(
+                retry,
+                [r for e in retry for r in raw_by_sid.get(e.provider_call_id, ())],
+            )
+        if written:
+            self.metrics.record_flush(written, (time.perf_counter() - started) * 1000)
+        return written
+
+    def _requeue(self, batch: List[StatusEvent], raw: List[StatusEvent]) -> None:
+        # Put them back unless newer events for the same calls arrived
+        self._raw[:0] = raw
+        for e in batch:
+            current = self._pending.get(e.provider_call_id)
+            if current is None or status_rank(e.call_status) > status_rank(
+                current.call_status
+            ):
+                self._pending[e.provider_call_id] = e
+
+    def snapshot(self) -> Dict[str, Any]:
+        m = self.metrics
+        return {
+            "pending": len(self._pending),
+            "pending_events": len(self._raw),
+            "events_received": m.events_received,
+            "events_coalesced": m.events_coalesced,
+            "events_rejected": m.events_rejected,
+            "events_dropped": m.events_dropped,
+            "flushes": m.flushes,
+            "rows_written": m.rows_written,
+            "flush_errors": m.flush_errors,
+            "last_flush_size": m.last_flush_size,
+            "max_flush_size": m.max_flush_size,
+            "last_flush_ms": round(m.last_flush_ms, 3),
+            "max_flush_ms": round(m.max_flush_ms, 3),
+            "avg_flush_ms": round(m.total_flush_ms / m.flushes, 3) if m.flushes else 0.0,
+        }
+
+    def _write(self, batch: List[StatusEvent], raw: List[StatusEvent]) -> None:
+        db = self._session_factory()
+        try:
+            write_status_events(db, batch, raw)
+        finally:
+            db.close()
+
+    def _write_each(
+        self,
+        batch: List[StatusEvent],
+        raw_by_sid: Dict[str, List[StatusEvent]],
+    ):
+        """
+        Write each call's status (and its callbacks) in its own transaction.
+        Returns (rows written, events to retry, events dropped).
+        """
+        written = 0
+        retry: List[StatusEvent] = []
+        dropped: List[StatusEvent] = []
+        for e in batch:
+            db = self._session_factory()
+            try:
+                write_status_events(db, [e], raw_by_sid.get(e.provider_call_id, []))
+                written += 1
+            except (OperationalError, InterfaceError):
+                retry.append(e)
+            except Exception:
+                dropped.append(e)
+                logger.exception(
+                    "Dropping call status update %s=%s (%d callbacks): write keeps failing",
+                    e.provider_call_id,
+                    e.call_status,
+                    len(raw_by_sid.get(e.provider_call_id, ())),
+                )
+            finally:
+                db.close()
+        return written, retry, dropped
+
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+
+_buffer: Optional[CallStatusBuffer] = None
+
+
+def get_call_status_buffer() -> Optional[CallStatusBuffer]:
+    """
+    The process-wide buffer, or None when it hasn't been started
+    (e.g. disabled in settings, or tests that skip the app lifespan).
+    """
+    return _buffer
+
+
+def set_call_status_buffer(buffer: Optional[CallStatusBuffer]) -> None:
+    global _buffer
+    _buffer = buffer
@@ -1,9 +1,68 @@
 # app/services/call_status_service.py
-from typing import Optional
+from datetime import datetime
+from typing import Any, Dict, Optional
 
 from sqlalchemy.orm import Session
 
 from app.models.call import Call
+from app.services.call_analytics_service import record_call_events
+from app.services.call_status_buffer import (
+    StatusEvent,
+    status_update_params,
+    status_update_stmt,
+)
+
+
+def _status_values(
+    call_status: str,
+    error_code: Optional[str],
+    error_message: Optional[str],
+) -> Dict[str, Any]:
+    values: Dict[str, Any] = {
+        "status": call_status,
+        "updated_at": datetime.utcnow(),
+    }
+    # Only overwrite error context when Twilio actually sent it
+    if error_code is not None:
+        values["error_code"] = error_code
+    if error_message is not None:
+        values["error_message"] = error_message[:255]
+    return values
+
+
+def update_call_status_fast(
+    db: Session,
+    provider_call_id: str,
+    call_status: str,
+    error_code: Optional[str] = None,
+    error_message: Optional[str] = None,
+    call_duration: Optional[int] = None,
+    event_ts: Optional[datetime] = None,
+) -> bool:
+    """
+    Hot-path variant of update_call_status for the Twilio status webhook.
+
+    Issues the write-behind buffer's rank-guarded
+      UPDATE calls SET status=..., updated_at=... WHERE provider_call_id=...
+    (so a late "ringing" never overwrites "completed") plus one INSERT
+    into the call_events log, and commits once, without loading or
+    refreshing the ORM object.
+
+    Returns True if the Call was updated, False if no Call matched or it
+    already has a later status.
+    """
+    event = StatusEvent(
+        provider_call_id=provider_call_id,
+        call_status=call_status,
+        error_code=error_code,
+        error_message=error_message,
+        call_duration=call_duration,
+        received_at=event_ts or datetime.utcnow(),
+    )
+    record_call_events(db, [event])
+    result = db.execute(status_update_stmt(), status_update_params(event))
+    db.commit()
+    return result.rowcount > 0
 
 
 def update_call_status(
@@ -21,23 +80,17 @@ def update_call_status(
       "completed", "busy", "failed", "no-answer", "canceled", ...)
     - error_code / error_message are optional diagnostic fields.
 
-    We **don't** rely on extra DB columns here, so this is safe even if
-    Call only has `status`.
+    Returns the refreshed Call, or None if there is no matching call.
+    Webhooks should prefer update_call_status_fast, which skips the
+    SELECT and refresh.
     """
     call = db.query(Call).filter_by(provider_call_id=provider_call_id).first()
     if not call:
         # No matching call; nothing to update.
         return None
 
-    # Minimal: always update .status
-    setattr(call, "status", call_status)
-
-    # If you've already added error fields as real columns, this will
-    # persist. If not, it just becomes an in-memory attribute (harmless).
-    if error_code is not None:
-        setattr(call, "error_code", error_code)
-    if error_message is not None:
-        setattr(call, "error_message", error_message)
+    for key, value in _status_values(call_status, error_code, error_message).items():
+        setattr(call, key, value)
 
     db.add(call)
     db.commit()
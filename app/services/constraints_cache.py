@@ -0,0 +1,274 @@
+# app/services/constraints_cache.py
+"""
+Content-addressed cache for LLM-parsed scheduling constraints.
+
+Account managers reuse a small set of phrasings, so the same instruction
+is sent to OpenAI again and again. Entries are keyed on
+
+    (normalised instruction, timezone, model, prompt version, date of `now`)
+
+and store the window *relative* to the `now` the model saw, so a hit is
+re-anchored to the caller's real `now` ("next two weeks" asked at 09:00
+and again at 15:00 gives two different, correct windows).
+
+Two tiers:
+  - an in-memory TTL + LRU map (microsecond hits within a worker)
+  - an on-disk SQLite file with a TTL (shared by workers, survives restarts)
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from typing import Callable, List, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.config import get_settings
+from app.schemas.constraints import HardConstraints, ParsedConstraints, SoftConstraints
+from app.services.ttl_cache import TTLCache
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _as_utc(dt: datetime) -> datetime:
+    # Naive datetimes are UTC throughout this app (datetime.utcnow())
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=dt_timezone.utc)
+    return dt.astimezone(dt_timezone.utc)
+
+
+def normalize_instruction(instruction: str) -> str:
+    return _WHITESPACE.sub(" ", instruction.replace("–", "-").replace("—", "-")).strip().lower()
+
+
+def _local_date(now: datetime, timezone: str) -> date:
+    try:
+        tz = ZoneInfo(timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        tz = dt_timezone.utc
+    return _as_utc(now).astimezone(tz).date()
+
+
+def constraints_cache_key(
+    instruction: str,
+    timezone: str,
+    model: str,
+    prompt_version: str,
+    now: datetime,
+) -> str:
+    parts = (
+        normalize_instruction(instruction),
+        timezone,
+        model,
+        prompt_version,
+        # Relative phrases ("tomorrow", "this Friday") resolve against the
+        # lead's local date, so that is the day a cached answer is good for
+        _local_date(now, timezone).isoformat(),
+    )
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def _encode(parsed: ParsedConstraints, now: datetime) -> str:
+    hc = parsed.hard_constraints
+    anchor = _as_utc(now)
+    return json.dumps(
+        {
+            "start_offset": (_as_utc(hc.window_start) - anchor).total_seconds(),
+            "end_offset": (_as_utc(hc.window_end) - anchor).total_seconds(),
+            "naive": hc.window_start.tzinfo is None,
+            "timezone": hc.timezone,
+            "soft": parsed.soft_constraints.model_dump(mode="json"),
+        },
+        separators=(",", ":"),
+    )
+
+
+def _decode(payload: str, now: datetime) -> ParsedConstraints:
+    data = json.loads(payload)
+    anchor = _as_utc(now)
+    ws = anchor + timedelta(seconds=data["start_offset"])
+    we = anchor + timedelta(seconds=data["end_offset"])
+    if data["naive"]:
+        ws, we = ws.replace(tzinfo=None), we.replace(tzinfo=None)
+    return ParsedConstraints(
+        hard_constraints=HardConstraints(
+            window_start=ws,
+            window_end=we,
+            timezone=data["timezone"],
+        ),
+        soft_constraints=SoftConstraints.model_validate(data["soft"]),
+    )
+
+
+class ConstraintsCache:
+    """
+    Two-tier (memory LRU + SQLite file) cache of parsed constraints.
+
+    Values are stored encoded (window offsets + soft constraints); get()
+    rebuilds a ParsedConstraints anchored at the caller's `now`.
+    `path=None` keeps the cache in memory only.
+    """
+
+    def __init__(
+        self,
+        *,
+        path: Optional[str] = None,
+        ttl_seconds: float = 86_400,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._path = path
+        self._ttl = ttl_seconds
+        self._clock = clock
+
+        # key -> encoded payload; expiry is kept in step with the disk tier
+        self._memory: TTLCache[str] = TTLCache(
+            "constraints", ttl_seconds=ttl_seconds, max_entries=max_entries, clock=clock
+        )
+        self._local = threading.local()
+        # Every thread's connection, so close() can reach them all
+        self._conns: List[sqlite3.Connection] = []
+        self._conns_lock = threading.Lock()
+
+        self.disk_hits = 0
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS constraint_cache ("
+                    " key TEXT PRIMARY KEY,"
+                    " payload TEXT NOT NULL,"
+                    " expires_at REAL NOT NULL)"
+                )
+
+    # ---- disk tier ----
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections are per-thread; keep one per worker thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Only ever used by this thread; close() may run on another
+            conn = sqlite3.connect(self._path, timeout=1.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """
+        Close every thread's disk-tier connection (app shutdown). A later
+        call from a thread whose connection was closed opens a new one.
+        """
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            conn.close()
+        self._local = threading.local()
+
+    def _get_disk(self, key: str, now_ts: float) -> Optional[tuple[float, str]]:
+        row = self._connect().execute(
+            "SELECT expires_at, payload FROM constraint_cache WHERE key = ? AND expires_at > ?",
+            (key, now_ts),
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def _put_disk(self, key: str, expires_at: float, payload: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO constraint_cache (key, payload, expires_at) VALUES (?, ?, ?)",
+                (key, payload, expires_at),
+            )
+
+    def purge_expired(self) -> int:
+        if not self._path:
+            return 0
+        with self._connect() as conn:
+            return conn.execute(
+                "DELETE FROM constraint_cache WHERE expires_at <= ?", (self._clock(),)
+            ).rowcount
+
+    # ---- public API ----
+
+    @property
+    def hits(self) -> int:
+        return self._memory.hits
+
+    @property
+    def misses(self) -> int:
+        # Memory misses the disk tier didn't answer either
+        return self._memory.misses - self.disk_hits
+
+    def get(self, key: str, now: datetime) -> Optional[ParsedConstraints]:
+        payload = self._memory.get(key)
+
+        if payload is None and self._path:
+            try:
+                entry = self._get_disk(key, self._clock())
+            except sqlite3.Error:
+                entry = None
+            if entry is not None:
+                self.disk_hits += 1
+                expires_at, payload = entry
+                self._memory.put(key, payload, expires_at=expires_at)
+
+        if payload is None:
+            return None
+        return _decode(payload, now)
+
+    def put(self, key: str, parsed: ParsedConstraints, now: datetime) -> None:
+        expires_at = self._clock() + self._ttl
+        payload = _encode(parsed, now)
+        self._memory.put(key, payload, expires_at=expires_at)
+        if self._path:
+            try:
+                self._put_disk(key, expires_at, payload)
+            except sqlite3.Error:
+                # Disk tier is best effort; the memory tier still has it
+                pass
+
+    def clear(self) -> None:
+        self._memory.clear()
+        self.disk_hits = 0
+
+
+_cache: Optional[ConstraintsCache] = None
+
+
+def get_constraints_cache() -> Optional[ConstraintsCache]:
+    """
+    Process-wide cache, or None when CONSTRAINTS_CACHE_ENABLED is off.
+    """
+    global _cache
+    settings = get_settings()
+    if not settings.CONSTRAINTS_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = ConstraintsCache(
+            path=settings.CONSTRAINTS_CACHE_PATH or None,
+            ttl_seconds=settings.CONSTRAINTS_CACHE_TTL_SECONDS,
+            max_entries=settings.CONSTRAINTS_CACHE_MAX_ENTRIES,
+        )
+    return _cache
+
+
+def close_constraints_cache() -> None:
+    """
+    Close the process-wide cache's disk connections, if it was built.
+    """
+    if _cache is not None:
+        _cache.close()
+
+
+def set_constraints_cache(cache: Optional[ConstraintsCache]) -> None:
+    global _cache
+    _cache = cache
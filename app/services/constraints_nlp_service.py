@@ -2,90 +2,188 @@
 from __future__ import annotations
 
 import json
-import os
-from datetime import datetime, timedelta
-from typing import Optional, List
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+from typing import Optional, List, Tuple
 from zoneinfo import ZoneInfo
 
 from app.schemas.constraints import ParsedConstraints, HardConstraints, SoftConstraints
-
-try:
-    # OpenAI Python SDK (v1+)
-    from openai import OpenAI  # type: ignore
-except Exception:  # pragma: no cover - library not installed in test env
-    OpenAI = None
+from app.services.constraints_cache import constraints_cache_key, get_constraints_cache
+from app.services.llm_client import get_openai_client
+from app.services.llm_metrics import get_llm_metrics
+from app.services.llm_resilience import call_llm
 
 
 # ---------- Heuristic helpers (used as fallback and for tests) ----------
-
-_BASE_DAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
-_DAY_CODE = {
-    "mon": "MON",
-    "tue": "TUE",
-    "wed": "WED",
-    "thu": "THU",
-    "fri": "FRI",
-    "sat": "SAT",
-    "sun": "SUN",
+#
+# The whole instruction is scanned once by a single compiled alternation
+# (_TOKEN_RE). Alternatives are ordered so longer constructs win at a given
+# position ("tue-thu" before "tue", "this friday" before "friday"), and
+# every day/time word is anchored on word boundaries, so "month" is not
+# Monday and "saturday" is only Saturday.
+
+_DAY_ORDER = ["MON", "TUE", "WED", "THU", "FRI", "SAT", "SUN"]
+_TOD_ORDER = ["MORNING", "AFTERNOON", "EVENING", "OFF_HOURS"]
+
+# Regex fragment per day: abbreviations, full names and plurals
+_DAY_PATTERNS = {
+    "MON": r"mon(?:day)?s?",
+    "TUE": r"tue(?:s|sday)?s?",
+    "WED": r"wed(?:s|nesday)?s?",
+    "THU": r"thu(?:r|rs|rsday)?s?",
+    "FRI": r"fri(?:day)?s?",
+    "SAT": r"sat(?:urday)?s?",
+    "SUN": r"sun(?:day)?s?",
 }
-_FULL_NAME_TO_BASE = {
-    "monday": "mon",
-    "tuesday": "tue",
-    "wednesday": "wed",
-    "thursday": "thu",
-    "friday": "fri",
-    "saturday": "sat",
-    "sunday": "sun",
+_DAY = r"(?:" + "|".join(_DAY_PATTERNS.values()) + r")"
+_DAY_TOKEN_RE = re.compile(
+    "|".join(f"(?P<{code}>{pattern})" for code, pattern in _DAY_PATTERNS.items())
+)
+
+_NUMBER_WORDS = {
+    "a": 1,
+    "an": 1,
+    "one": 1,
+    "two": 2,
+    "three": 3,
+    "four": 4,
+    "five": 5,
+    "six": 6,
+    "seven": 7,
+    "eight": 8,
+    "nine": 9,
+    "ten": 10,
+    "eleven": 11,
+    "twelve": 12,
+    "thirteen": 13,
+    "fourteen": 14,
+    "a couple of": 2,
+    "a couple": 2,
+    "couple of": 2,
+    "a few": 3,
+    "few": 3,
 }
-
-
-def _extract_preferred_days(text_lower: str) -> List[str]:
+_NUMBER = r"(?:\d+|" + "|".join(
+    re.escape(w) for w in sorted(_NUMBER_WORDS, key=len, reverse=True)
+) + r")"
+_UNIT_DAYS = {"day": 1, "week": 7, "month": 30}
+# Longest window a relative phrase may ask for ("within 3000000 days"
+# would overflow datetime arithmetic)
+MAX_WINDOW_DAYS = 365
+
+_TOKEN_RE = re.compile(
+    # Cheap first-character filter: skip positions no alternative can start at
+    r"(?=[abcefmnostw])\b(?:"
+    # "next two weeks", "within 10 days", "within the next 3 days", "next week"
+    r"(?:within|next|coming)\s+(?:the\s+)?(?:next\s+|coming\s+)?"
+    rf"(?P<count>{_NUMBER}\s+)?(?P<unit>day|week|month)s?"
+    # "tue-thu", "monday to wednesday"
+    rf"|(?P<range_start>{_DAY})\s*(?:-|to|through|thru|until)\s*(?P<range_end>{_DAY})"
+    # "this friday", "by thursday"
+    rf"|(?:this|by|before)\s+(?P<until_day>{_DAY})"
+    r"|(?P<until_rel>today|tomorrow|this\s+week)"
+    rf"|(?P<day>{_DAY})"
+    r"|(?P<tod>mornings?|afternoons?|evenings?|(?:to)?nights?|after[\s-]hours|off[\s-]hours)"
+    r")\b"
+)
+
+_TOD_CODE = {"m": "MORNING", "a": "AFTERNOON", "e": "EVENING", "n": "EVENING", "t": "EVENING"}
+
+
+def _day_code(word: str) -> str:
+    return _DAY_TOKEN_RE.match(word).lastgroup
+
+
+def _count(word: Optional[str]) -> int:
+    if not word:
+        return 1
+    word = " ".join(word.split())
+    return int(word) if word.isdigit() else _NUMBER_WORDS[word]
+
+
+@dataclass
+class _InstructionScan:
+    days: set = field(default_factory=set)
+    times_of_day: set = field(default_factory=set)
+    # First relative window mentioned: ("days", n) or ("until_day", code)
+    # or ("until", "today" | "tomorrow" | "this week")
+    window: Optional[Tuple[str, object]] = None
+
+    @property
+    def preferred_days(self) -> List[str]:
+        return sorted(self.days)
+
+    @property
+    def preferred_time_of_day(self) -> List[str]:
+        return [t for t in _TOD_ORDER if t in self.times_of_day]
+
+
+def _scan_instruction(text_lower: str) -> _InstructionScan:
     """
-    Handle:
-      - explicit days like "Tuesday", "Thu"
-      - ranges like "Mon-Wed", "Tue–Thu" (inclusive)
+    Single left-to-right pass over the instruction. Handles:
+      - explicit days like "Tuesday", "Thu", "Mondays"
+      - ranges like "Mon-Wed", "Tue–Thu", "monday to wednesday" (inclusive,
+        wrapping past Sunday)
+      - time-of-day words (morning / afternoon / evening, night, off hours)
+      - relative windows: "next two weeks", "within 10 days", "this Friday",
+        "tomorrow", "this week"
     """
-    normalized = (
-        text_lower.replace("–", "-")
-        .replace("—", "-")
-        .replace(" to ", "-")
-    )
-
-    found: set[str] = set()
-
-    # 1) Ranges like "tue-thu"
-    for i, start_base in enumerate(_BASE_DAYS):
-        for j, end_base in enumerate(_BASE_DAYS):
-            if i > j:
-                continue
-            pattern = f"{start_base}-{end_base}"
-            if pattern in normalized:
-                for k in range(i, j + 1):
-                    base = _BASE_DAYS[k]
-                    found.add(_DAY_CODE[base])
-
-    # 2) Full names: "tuesday", "friday"
-    for full_name, base in _FULL_NAME_TO_BASE.items():
-        if full_name in normalized:
-            found.add(_DAY_CODE[base])
-
-    # 3) Abbreviations "mon", "tue", etc.
-    for base in _BASE_DAYS:
-        if base in normalized:
-            found.add(_DAY_CODE[base])
+    scan = _InstructionScan()
+    text = text_lower.replace("–", "-").replace("—", "-")
+
+    for m in _TOKEN_RE.finditer(text):
+        kind = m.lastgroup
+        if kind == "unit":
+            if scan.window is None:
+                days = _count(m.group("count")) * _UNIT_DAYS[m.group("unit")]
+                scan.window = ("days", min(days, MAX_WINDOW_DAYS))
+        elif kind == "range_end":
+            i = _DAY_ORDER.index(_day_code(m.group("range_start")))
+            j = _DAY_ORDER.index(_day_code(m.group("range_end")))
+            span = (j - i) % 7
+            scan.days.update(_DAY_ORDER[(i + k) % 7] for k in range(span + 1))
+        elif kind == "until_day":
+            code = _day_code(m.group("until_day"))
+            scan.days.add(code)
+            if scan.window is None:
+                scan.window = ("until_day", code)
+        elif kind == "until_rel":
+            if scan.window is None:
+                scan.window = ("until", " ".join(m.group("until_rel").split()))
+        elif kind == "day":
+            scan.days.add(_day_code(m.group("day")))
+        elif kind == "tod":
+            word = m.group("tod")
+            if word.endswith("hours"):
+                scan.times_of_day.add("OFF_HOURS")
+            else:
+                scan.times_of_day.add(_TOD_CODE[word[0]])
+
+    return scan
+
+
+def _window_end(scan: _InstructionScan, now_tz: datetime) -> datetime:
+    # Default: next 7 days
+    if scan.window is None:
+        return now_tz + timedelta(days=7)
 
-    return sorted(found) if found else []
+    kind, value = scan.window
+    if kind == "days":
+        return now_tz + timedelta(days=value)
 
+    if kind == "until_day":
+        days_ahead = (_DAY_ORDER.index(value) - now_tz.weekday()) % 7
+    elif value == "today":
+        days_ahead = 0
+    elif value == "tomorrow":
+        days_ahead = 1
+    else:  # "this week": through Sunday
+        days_ahead = 6 - now_tz.weekday()
 
-def _extract_preferred_time_of_day(text_lower: str) -> List[str]:
-    tod: list[str] = []
-    if "morning" in text_lower:
-        tod.append("MORNING")
-    if "afternoon" in text_lower:
-        tod.append("AFTERNOON")
-    if "evening" in text_lower or "night" in text_lower:
-        tod.append("EVENING")
-    return tod
+    # End of that (local) day
+    end_date = now_tz.date() + timedelta(days=days_ahead + 1)
+    return datetime.combine(end_date, time.min, tzinfo=now_tz.tzinfo)
 
 
 def _heuristic_parse(
@@ -94,36 +192,118 @@ def _heuristic_parse(
     timezone: str,
 ) -> ParsedConstraints:
     """
-    The deterministic behavior used in tests.
+    The deterministic behavior used in tests (and whenever OpenAI is
+    unavailable).
     """
     tz = ZoneInfo(timezone)
     now_tz = now.astimezone(tz)
 
-    # Default: next 7 days
-    window_start = now_tz
-    window_end = now_tz + timedelta(days=7)
-
-    text_lower = instruction.lower()
-
-    if "next two weeks" in text_lower:
-        window_end = now_tz + timedelta(days=14)
-
-    preferred_days = _extract_preferred_days(text_lower)
-    preferred_tod = _extract_preferred_time_of_day(text_lower)
+    scan = _scan_instruction(instruction.lower())
 
     hc = HardConstraints(
-        window_start=window_start,
-        window_end=window_end,
+        window_start=now_tz,
+        window_end=_window_end(scan, now_tz),
         timezone=timezone,
     )
     sc = SoftConstraints(
-        preferred_days_of_week=preferred_days or None,
-        preferred_time_of_day=preferred_tod or None,
+        preferred_days_of_week=scan.preferred_days or None,
+        preferred_time_of_day=scan.preferred_time_of_day or None,
     )
 
     return ParsedConstraints(hard_constraints=hc, soft_constraints=sc)
 
 
+# ---------- OpenAI parsing (cached) ----------
+
+_MODEL = "gpt-4o-mini"
+# Bump whenever the prompt changes, so cached answers to the old one are unused
+PROMPT_VERSION = "1"
+
+
+def _llm_parse(
+    client,
+    instruction: str,
+    now: datetime,
+    timezone: str,
+) -> Optional[ParsedConstraints]:
+    """
+    Ask OpenAI to parse the instruction. Returns None on any error or if
+    the model didn't give a usable window.
+    """
+    system_msg = (
+        "You convert natural-language scheduling constraints into JSON. "
+        "Return ONLY valid JSON, with keys: "
+        "{ "
+        "  'hard_constraints': {"
+        "    'window_start': ISO8601 string,"
+        "    'window_end': ISO8601 string,"
+        "    'timezone': string"
+        "  },"
+        "  'soft_constraints': {"
+        "    'preferred_days_of_week': [ 'MON'|'TUE'|... ],"
+        "    'preferred_time_of_day': [ 'MORNING'|'AFTERNOON'|'EVENING' ]"
+        "  }"
+        "}"
+    )
+
+    user_msg = (
+        f"Instruction: {instruction!r}\n"
+        f"Now (UTC): {now.isoformat()}\n"
+        f"Lead timezone: {timezone}\n"
+        "Infer a reasonable window_start/window_end around 'now' if needed. "
+        "If something is missing, make a reasonable assumption."
+    )
+
+    try:
+        resp = call_llm(
+            "constraints",
+            client.chat.completions.create,
+            model=_MODEL,
+            messages=[
+                {"role": "system", "content": system_msg},
+                {"role": "user", "content": user_msg},
+            ],
+            max_tokens=400,
+        )
+    except Exception:
+        # Recorded (error class / fallback reason) by call_llm
+        return None
+
+    try:
+        raw = resp.choices[0].message.content or "{}"
+        parsed = json.loads(raw)
+
+        hc_data = parsed.get("hard_constraints") or {}
+        sc_data = parsed.get("soft_constraints") or {}
+
+        ws_str = hc_data.get("window_start")
+        we_str = hc_data.get("window_end")
+
+        if not ws_str or not we_str:
+            # The model didn't give a proper window
+            get_llm_metrics().record_fallback("constraints", "no_window")
+            return None
+
+        ws = datetime.fromisoformat(ws_str)
+        we = datetime.fromisoformat(we_str)
+        tz_str = hc_data.get("timezone") or timezone
+
+        hc = HardConstraints(
+            window_start=ws,
+            window_end=we,
+            timezone=tz_str,
+        )
+        sc = SoftConstraints(
+            preferred_days_of_week=sc_data.get("preferred_days_of_week"),
+            preferred_time_of_day=sc_data.get("preferred_time_of_day"),
+        )
+
+        return ParsedConstraints(hard_constraints=hc, soft_constraints=sc)
+    except Exception:
+        get_llm_metrics().record_fallback("constraints", "bad_output")
+        return None
+
+
 # ---------- Public entry point with optional OpenAI ----------
 
 
@@ -134,79 +314,33 @@ def parse_natural_language_constraints(
 ) -> ParsedConstraints:
     """
     In production:
-      - try OpenAI to parse complex instructions into JSON
-      - validate & coerce JSON into ParsedConstraints
+      - look the phrasing up in the constraints cache (memory, then disk);
+        a hit is re-anchored to this `now`
+      - otherwise try OpenAI to parse complex instructions into JSON,
+        validate & coerce it into ParsedConstraints and cache it
     In tests / offline:
       - fall back to a deterministic heuristic.
     """
     # Try OpenAI first (only if SDK + API key present)
-    if OpenAI is not None and os.getenv("OPENAI_API_KEY"):
-        try:
-            client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-            system_msg = (
-                "You convert natural-language scheduling constraints into JSON. "
-                "Return ONLY valid JSON, with keys: "
-                "{ "
-                "  'hard_constraints': {"
-                "    'window_start': ISO8601 string,"
-                "    'window_end': ISO8601 string,"
-                "    'timezone': string"
-                "  },"
-                "  'soft_constraints': {"
-                "    'preferred_days_of_week': [ 'MON'|'TUE'|... ],"
-                "    'preferred_time_of_day': [ 'MORNING'|'AFTERNOON'|'EVENING' ]"
-                "  }"
-                "}"
-            )
-
-            user_msg = (
-                f"Instruction: {instruction!r}\n"
-                f"Now (UTC): {now.isoformat()}\n"
-                f"Lead timezone: {timezone}\n"
-                "Infer a reasonable window_start/window_end around 'now' if needed. "
-                "If something is missing, make a reasonable assumption."
-            )
-
-            resp = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_msg},
-                    {"role": "user", "content": user_msg},
-                ],
-                max_tokens=400,
-            )
-            raw = resp.choices[0].message.content or "{}"
-            parsed = json.loads(raw)
-
-            hc_data = parsed.get("hard_constraints") or {}
-            sc_data = parsed.get("soft_constraints") or {}
-
-            ws_str = hc_data.get("window_start")
-            we_str = hc_data.get("window_end")
-
-            if not ws_str or not we_str:
-                # If the model didn't give a proper window, fall back
-                return _heuristic_parse(instruction, now, timezone)
-
-            ws = datetime.fromisoformat(ws_str)
-            we = datetime.fromisoformat(we_str)
-            tz_str = hc_data.get("timezone") or timezone
-
-            hc = HardConstraints(
-                window_start=ws,
-                window_end=we,
-                timezone=tz_str,
-            )
-            sc = SoftConstraints(
-                preferred_days_of_week=sc_data.get("preferred_days_of_week"),
-                preferred_time_of_day=sc_data.get("preferred_time_of_day"),
-            )
-
-            return ParsedConstraints(hard_constraints=hc, soft_constraints=sc)
-        except Exception:
-            # Any error → fallback to deterministic behavior
-            pass
+    metrics = get_llm_metrics()
+    client = get_openai_client()
+    if client is None:
+        metrics.record_fallback("constraints", "no_client")
+    else:
+        cache = get_constraints_cache()
+        key = None
+        if cache is not None:
+            key = constraints_cache_key(instruction, timezone, _MODEL, PROMPT_VERSION, now)
+            cached = cache.get(key, now)
+            metrics.record_cache("constraints", "miss" if cached is None else "hit")
+            if cached is not None:
+                return cached
+
+        parsed = _llm_parse(client, instruction, now, timezone)
+        if parsed is not None:
+            if cache is not None:
+                cache.put(key, parsed, now)
+            return parsed
 
     # Fallback path (what your tests rely on)
     return _heuristic_parse(instruction, now, timezone)
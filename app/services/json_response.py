@@ -0,0 +1,60 @@
+# app/services/json_response.py
+"""
+Fast JSON responses for the large listing routes (slots, availabilities,
+campaign results).
+
+A route that returns a plain dict goes through jsonable_encoder, which
+walks and copies the whole structure before json.dumps walks it again;
+a route with a response_model validates its return value again first.
+Returning a FastJSONResponse skips both: FastAPI sends a Response as-is,
+so the route's response_model only documents the shape.
+
+- dicts / lists are encoded in one pass by orjson when it is installed
+  (datetimes natively, same ISO 8601 text as .isoformat()), otherwise by
+  json.dumps with a small default hook
+- pydantic models are dumped straight to JSON bytes by pydantic-core
+
+Only hand it content of the documented shape: nothing validates it.
+"""
+from __future__ import annotations
+
+import enum
+import json
+from datetime import date, datetime, time
+from typing import Any
+
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    `content` as compact UTF-8 JSON.
+    """
+    if isinstance(content, BaseModel):
+        return content.__pydantic_serializer__.to_json(content)
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
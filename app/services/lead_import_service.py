@@ -0,0 +1,301 @@
+# app/services/lead_import_service.py
+from __future__ import annotations
+
+import codecs
+import csv
+import json
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Mapping, Optional, Set, Tuple, Union
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.services.lead_service import DEFAULT_CHUNK_SIZE, bulk_upsert_leads
+
+# Only the first N row errors are echoed back; the rest are just counted,
+# so a completely broken 100k-row file still produces a small response.
+MAX_REPORTED_ERRORS = 100
+
+# A quoted CSV field may span lines, but a record that hasn't closed its
+# quote within this many lines / characters is reported as a bad row and
+# the lines after its first are parsed again, so one stray quote costs
+# one row instead of swallowing the rest of the file. No single line (CSV
+# or NDJSON) may be longer than MAX_RECORD_CHARS either.
+MAX_RECORD_LINES = 20
+MAX_RECORD_CHARS = 64 * 1024
+
+Record = Tuple[int, Any]
+
+
+@dataclass
+class RowError:
+    row: int
+    error: str
+
+
+@dataclass
+class LeadImportResult:
+    rows_received: int = 0
+    rows_imported: int = 0
+    rows_failed: int = 0
+    errors: List[RowError] = field(default_factory=list)
+
+    @property
+    def errors_truncated(self) -> bool:
+        return self.rows_failed > len(self.errors)
+
+    def add_error(self, row: int, error: str) -> None:
+        self.rows_failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(RowError(row=row, error=error))
+
+
+def _describe_error(e: Exception) -> str:
+    # Pydantic errors are verbose; keep "field: message" pairs only
+    errors = getattr(e, "errors", None)
+    if callable(errors):
+        return "; ".join(
+            f"{'.'.join(str(p) for p in err.get('loc', ())) or 'row'}: {err.get('msg')}"
+            for err in errors()
+        )
+    return str(e)
+
+
+class _LineTooLong(ValueError):
+    pass
+
+
+async def iter_text_lines(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[Union[str, _LineTooLong]]:
+    """
+    Split a streamed UTF-8 body into lines without buffering the whole body.
+
+    Multi-byte characters split across network chunks are handled by the
+    incremental decoder; only the current partial line is kept in memory,
+    and only up to MAX_RECORD_CHARS. A longer line is skipped through its
+    newline and yielded as one _LineTooLong error instead.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    overflow = False
+
+    def _too_long() -> _LineTooLong:
+        return _LineTooLong(f"line longer than {MAX_RECORD_CHARS} characters")
+
+    def _pieces(text: str, final: bool) -> Iterator[Union[str, _LineTooLong]]:
+        nonlocal pending, overflow
+        # Only the new text is searched for newlines
+        *ends, tail = text.split("\n")
+        for end in ends:
+            line = "" if overflow else pending + end
+            if overflow or len(line) > MAX_RECORD_CHARS:
+                yield _too_long()
+            else:
+                yield line.rstrip("\r")
+            pending, overflow = "", False
+        if not overflow:
+            pending += tail
+            if len(pending) > MAX_RECORD_CHARS:
+                pending, overflow = "", True
+        if final and (pending or overflow):
+            yield _too_long() if overflow else pending.rstrip("\r")
+
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        for piece in _pieces(decoder.decode(chunk), final=False):
+            yield piece
+
+    for piece in _pieces(decoder.decode(b"", final=True), final=True):
+        yield piece
+
+
+class _UnterminatedRecord(ValueError):
+    pass
+
+
+class _CsvRecordSplitter:
+    """
+    Groups CSV lines into records, re-joining quoted fields that span
+    lines, with the per-record caps above.
+    """
+
+    def __init__(self):
+        self._queue: deque = deque()
+        self._lines: List[str] = []
+        self._quotes = 0
+        self._chars = 0
+
+    def feed(self, line: str) -> Iterator[Union[str, _UnterminatedRecord]]:
+        self._queue.append(line)
+        return self._drain(final=False)
+
+    def close(self) -> Iterator[Union[str, _UnterminatedRecord]]:
+        return self._drain(final=True)
+
+    def _drain(self, final: bool) -> Iterator[Union[str, _UnterminatedRecord]]:
+        while True:
+            while self._queue:
+                line = self._queue.popleft()
+                self._lines.append(line)
+                self._quotes += line.count('"')
+                self._chars += len(line) + 1
+                # An odd number of quotes means we're inside a quoted field
+                if not self._quotes % 2:
+                    yield self._take()
+                elif len(self._lines) >= MAX_RECORD_LINES or self._chars > MAX_RECORD_CHARS:
+                    yield self._reject()
+            if not (final and self._lines):
+                return
+            yield self._reject()
+
+    def _take(self) -> str:
+        text = "\n".join(self._lines)
+        self._lines, self._quotes, self._chars = [], 0, 0
+        return text
+
+    def _reject(self) -> _UnterminatedRecord:
+        rest = self._lines[1:]
+        self._lines, self._quotes, self._chars = [], 0, 0
+        # Re-parse everything after the offending line
+        self._queue.extendleft(reversed(rest))
+        return _UnterminatedRecord("unterminated quoted field")
+
+
+async def iter_csv_records(
+    lines: AsyncIterator[Union[str, _LineTooLong]],
+) -> AsyncIterator[Record]:
+    """
+    Yield (row_number, dict | error) for a CSV stream with a header row.
+
+    Row numbers are 1-based data rows (the header is not counted). Quoted
+    fields spanning several lines are re-joined before parsing, up to
+    MAX_RECORD_LINES / MAX_RECORD_CHARS. Empty cells become None so
+    optional fields validate the same as in JSON.
+    """
+    header: Optional[List[str]] = None
+    splitter = _CsvRecordSplitter()
+    row_no = 0
+
+    def _records(texts: Iterator[Union[str, ValueError]]) -> Iterator[Record]:
+        nonlocal header, row_no
+        for text in texts:
+            if isinstance(text, ValueError):
+                if header is not None:
+                    row_no += 1
+                    yield row_no, text
+                continue
+            if not text.strip():
+                continue
+
+            values = next(csv.reader([text]))
+            if header is None:
+                header = [h.strip().lower() for h in values]
+                continue
+
+            row_no += 1
+            if len(values) > len(header):
+                yield row_no, ValueError(
+                    f"expected at most {len(header)} columns, got {len(values)}"
+                )
+                continue
+
+            yield row_no, {
+                key: (value.strip() or None)
+                for key, value in zip(header, values)
+            }
+
+    async for line in lines:
+        if isinstance(line, _LineTooLong):
+            # Ends any open record; the overlong line itself is one bad row
+            for record in _records(splitter.close()):
+                yield record
+            for record in _records(iter([line])):
+                yield record
+            continue
+        for record in _records(splitter.feed(line)):
+            yield record
+
+    for record in _records(splitter.close()):
+        yield record
+
+
+async def iter_ndjson_records(
+    lines: AsyncIterator[Union[str, _LineTooLong]],
+) -> AsyncIterator[Record]:
+    """
+    Yield (row_number, dict | error) for newline-delimited JSON objects.
+    """
+    row_no = 0
+    async for line in lines:
+        if isinstance(line, _LineTooLong):
+            row_no += 1
+            yield row_no, line
+            continue
+        if not line.strip():
+            continue
+
+        row_no += 1
+        try:
+            obj = json.loads(line)
+        except ValueError as e:
+            yield row_no, ValueError(f"invalid JSON: {e}")
+            continue
+
+        if not isinstance(obj, dict):
+            yield row_no, ValueError("each line must be a JSON object")
+            continue
+
+        yield row_no, obj
+
+
+async def import_leads(
+    db: Session,
+    records: AsyncIterator[Record],
+    *,
+    validate: Callable[[Mapping[str, Any]], Dict[str, Any]],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> LeadImportResult:
+    """
+    Validate streamed lead records and upsert them in chunks.
+
+    - `validate` turns a raw record into a lead dict, raising ValueError
+      (pydantic's ValidationError included) for bad rows.
+    - Invalid rows are reported and skipped; they never abort the import.
+    - At most `chunk_size` rows are held at once. The one thing that grows
+      with the upload is the set of distinct imported phones (one short
+      string per lead, ~100 bytes: ~100 MB for a million-lead file), kept
+      so rows_imported counts a phone repeated across chunks only once.
+    """
+    result = LeadImportResult()
+    batch: List[Dict[str, Any]] = []
+    imported_phones: Set[str] = set()
+
+    async def _flush() -> None:
+        if not batch:
+            return
+        leads_by_phone = await run_in_threadpool(bulk_upsert_leads, db, batch, chunk_size=chunk_size)
+        imported_phones.update(leads_by_phone)
+        result.rows_imported = len(imported_phones)
+        batch.clear()
+
+    async for row_no, record in records:
+        result.rows_received += 1
+
+        if isinstance(record, Exception):
+            result.add_error(row_no, str(record))
+            continue
+
+        try:
+            batch.append(validate(record))
+        except ValueError as e:
+            result.add_error(row_no, _describe_error(e))
+            continue
+
+        if len(batch) >= chunk_size:
+            await _flush()
+
+    await _flush()
+    return result
@@ -0,0 +1,108 @@
+# app/services/lead_service.py
+from typing import Any, Dict, Iterable, List, Mapping
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models.lead import Lead
+
+# Keep IN (...) lists and multi-row INSERTs well below SQLite's bound
+# parameter limit (999 on older builds).
+DEFAULT_CHUNK_SIZE = 500
+
+
+def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def _insert_ignoring_conflicts(db: Session):
+    """
+    Build an INSERT into `leads` that skips rows whose phone already exists.
+
+    SQLite and PostgreSQL both support ON CONFLICT DO NOTHING; other
+    backends get a plain INSERT (we only insert phones we did not find,
+    so a conflict there means a concurrent writer won the race).
+    """
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+        return sqlite_insert(Lead).on_conflict_do_nothing(index_elements=["phone"])
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+        return pg_insert(Lead).on_conflict_do_nothing(index_elements=["phone"])
+
+    return insert(Lead)
+
+
+def _fetch_by_phone(db: Session, phones: List[str], chunk_size: int) -> Dict[str, Lead]:
+    found: Dict[str, Lead] = {}
+    for chunk in _chunks(phones, chunk_size):
+        for lead in db.scalars(select(Lead).where(Lead.phone.in_(chunk))):
+            found[lead.phone] = lead
+    return found
+
+
+def bulk_upsert_leads(
+    db: Session,
+    leads: Iterable[Mapping[str, Any]],
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    default_timezone: str = "UTC",
+) -> Dict[str, Lead]:
+    """
+    Get-or-create many leads by phone in O(n / chunk_size) round trips.
+
+    - `leads` are dicts with name / phone / email / company / timezone.
+    - Duplicate phones in the payload are collapsed (first occurrence wins).
+    - Existing leads are reused as-is, exactly like the per-lead loop did.
+    - Missing leads are bulk-inserted with ON CONFLICT DO NOTHING where
+      the backend supports it, then read back to get their ids.
+
+    Returns a {phone: Lead} mapping covering every phone in the payload.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+
+    # 1) Dedupe the payload, preserving input order
+    unique: Dict[str, Mapping[str, Any]] = {}
+    for row in leads:
+        phone = row.get("phone")
+        if not phone:
+            raise ValueError("phone is required for every lead")
+        unique.setdefault(phone, row)
+
+    if not unique:
+        return {}
+
+    phones = list(unique)
+
+    # 2) One chunked SELECT ... WHERE phone IN (...) for existing leads
+    by_phone = _fetch_by_phone(db, phones, chunk_size)
+
+    # 3) Bulk insert whatever is missing
+    missing = [p for p in phones if p not in by_phone]
+    if missing:
+        stmt = _insert_ignoring_conflicts(db)
+        for chunk in _chunks(missing, chunk_size):
+            db.execute(
+                stmt,
+                [
+                    {
+                        "name": unique[p].get("name"),
+                        "phone": p,
+                        "email": unique[p].get("email"),
+                        "company": unique[p].get("company"),
+                        "timezone": unique[p].get("timezone") or default_timezone,
+                    }
+                    for p in chunk
+                ],
+            )
+        db.commit()
+
+        by_phone.update(_fetch_by_phone(db, missing, chunk_size))
+
+    return by_phone
@@ -0,0 +1,293 @@
+# app/services/llm_batcher.py
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config import get_settings
+from app.services.llm_client import get_async_openai_client
+from app.services.llm_resilience import call_llm_async
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TranscriptItem:
+    transcript: str
+    window_start: str
+    window_end: str
+    timezone: str
+    duration_minutes: int
+
+
+@dataclass
+class BatcherMetrics:
+    items_received: int = 0
+    items_rejected: int = 0
+    items_resolved: int = 0
+    items_missing: int = 0
+    batches_sent: int = 0
+    batch_errors: int = 0
+    last_batch_size: int = 0
+    max_batch_size: int = 0
+    last_batch_ms: float = 0.0
+
+
+def _build_batch_messages(items: List[TranscriptItem]) -> List[dict]:
+    payload = [
+        {
+            "id": i,
+            "transcript": item.transcript,
+            "window_start": item.window_start,
+            "window_end": item.window_end,
+            "timezone": item.timezone,
+            "duration_minutes": item.duration_minutes,
+        }
+        for i, item in enumerate(items)
+    ]
+    user_content = (
+        "You are a scheduling helper.\n"
+        "Each item below is a caller describing when they are free for a meeting, "
+        "with the scheduling window (hard constraints), timezone and meeting duration.\n\n"
+        f"Items:\n{json.dumps(payload, ensure_ascii=False)}\n\n"
+        "For every item, pick one or more candidate start/end times inside its window, "
+        "in this JSON format:\n"
+        '{ "results": [ { "id": <item id>, "slots": [ '
+        '{ "start": "ISO-8601 datetime", "end": "ISO-8601 datetime" } ] } ] }\n'
+        "Return exactly one result per item id. Return ONLY valid JSON."
+    )
+    return [
+        {
+            "role": "system",
+            "content": "You convert informal availability into concrete time windows.",
+        },
+        {"role": "user", "content": user_content},
+    ]
+
+
+def _results_by_id(raw: str) -> Dict[int, list]:
+    start_idx = raw.find("{")
+    end_idx = raw.rfind("}")
+    if start_idx == -1 or end_idx == -1:
+        raise ValueError("No JSON object found in model output")
+    data = json.loads(raw[start_idx : end_idx + 1])
+
+    results: Dict[int, list] = {}
+    for result in data.get("results") or []:
+        try:
+            results[int(result["id"])] = list(result.get("slots") or [])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return results
+
+
+class TranscriptBatcher:
+    """
+    Micro-batches availability transcripts into multi-item LLM requests.
+
+    - parse() enqueues one transcript and waits for its own result.
+    - A worker collects items for up to `max_wait_ms` (or until
+      `max_batch` are queued), sends them as one request and hands each
+      caller the raw slots the model gave for its item id.
+    - Items the model left out, or whose batch failed, resolve to None so
+      every caller applies its own fallback.
+    - At most `max_queue` items wait; beyond that parse() returns None
+      straight away (backpressure), and at most `max_concurrency`
+      batches are in flight.
+
+    `client_getter` defaults to the shared AsyncOpenAI client; tests pass
+    a stub with the same chat.completions.create interface.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_wait_ms: int = 20,
+        max_batch: int = 16,
+        max_queue: int = 500,
+        max_concurrency: int = 4,
+        client_getter: Callable[[], Any] = get_async_openai_client,
+    ):
+        if max_wait_ms <= 0 or max_batch <= 0 or max_queue < max_batch:
+            raise ValueError(
+                "max_wait_ms and max_batch must be positive and max_queue >= max_batch"
+            )
+
+        self._max_wait = max_wait_ms / 1000
+        self._max_batch = max_batch
+        self._max_queue = max_queue
+        self._max_concurrency = max_concurrency
+        self._client_getter = client_getter
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._batch_full: Optional[asyncio.Event] = None
+        self._in_flight: "set[asyncio.Task]" = set()
+
+        self.metrics = BatcherMetrics()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self._max_queue)
+        self._slots = asyncio.Semaphore(self._max_concurrency)
+        self._batch_full = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="llm-transcript-batcher")
+
+    async def stop(self) -> None:
+        """
+        Stop collecting; queued callers get None, in-flight batches finish.
+        """
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_result(None)
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def parse(self, item: TranscriptItem) -> Optional[list]:
+        """
+        Raw slot dicts the model returned for this item, or None.
+        """
+        if not self.running:
+            return None
+
+        future: "asyncio.Future[Optional[list]]" = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((item, future))
+        except asyncio.QueueFull:
+            self.metrics.items_rejected += 1
+            return None
+
+        self.metrics.items_received += 1
+        if self._queue.qsize() >= self._max_batch - 1:
+            self._batch_full.set()
+        return await future
+
+    def snapshot(self) -> Dict[str, Any]:
+        m = self.metrics
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batches_in_flight": len(self._in_flight),
+            "items_received": m.items_received,
+            "items_rejected": m.items_rejected,
+            "items_resolved": m.items_resolved,
+            "items_missing": m.items_missing,
+            "batches_sent": m.batches_sent,
+            "batch_errors": m.batch_errors,
+            "last_batch_size": m.last_batch_size,
+            "max_batch_size": m.max_batch_size,
+            "last_batch_ms": round(m.last_batch_ms, 3),
+        }
+
+    async def _collect(self, batch: list) -> None:
+        batch.append(await self._queue.get())
+        if self._queue.qsize() < self._max_batch - 1:
+            # Waiting on an event (not queue.get) so a timeout never loses an item
+            self._batch_full.clear()
+            try:
+                await asyncio.wait_for(self._batch_full.wait(), self._max_wait)
+            except asyncio.TimeoutError:
+                pass
+        while len(batch) < self._max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+    async def _run(self) -> None:
+        while True:
+            batch: list = []
+            try:
+                await self._collect(batch)
+                # Wait for a free slot before collecting the next batch, so a
+                # slow provider backs up into the bounded queue
+                await self._slots.acquire()
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+                raise
+            task = asyncio.create_task(self._send(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _send(self, batch: list) -> None:
+        try:
+            await self._send_batch(batch)
+        finally:
+            # Cancelled mid-flight (e.g. by loop shutdown): callers get None
+            # and use their per-item fallback instead of waiting forever
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+
+    async def _send_batch(self, batch: list) -> None:
+        items = [item for item, _ in batch]
+        started = time.perf_counter()
+        results: Dict[int, list] = {}
+        try:
+            client = self._client_getter()
+            if client is None:
+                raise RuntimeError("LLM client is not configured")
+            resp = await call_llm_async(
+                "availability",
+                client.chat.completions.create,
+                model=get_settings().openai_model,
+                temperature=0,
+                response_format={"type": "json_object"},
+                messages=_build_batch_messages(items),
+            )
+            results = _results_by_id(resp.choices[0].message.content or "")
+        except Exception:
+            self.metrics.batch_errors += 1
+            logger.warning("LLM transcript batch of %d failed", len(batch), exc_info=True)
+        finally:
+            self._slots.release()
+
+        m = self.metrics
+        m.batches_sent += 1
+        m.last_batch_size = len(batch)
+        m.max_batch_size = max(m.max_batch_size, len(batch))
+        m.last_batch_ms = (time.perf_counter() - started) * 1000
+
+        for i, (_, future) in enumerate(batch):
+            slots = results.get(i)
+            if slots is None:
+                m.items_missing += 1
+            else:
+                m.items_resolved += 1
+            if not future.done():
+                future.set_result(slots)
+
+
+_batcher: Optional[TranscriptBatcher] = None
+
+
+def get_transcript_batcher() -> Optional[TranscriptBatcher]:
+    """
+    The process-wide batcher, or None when batching is disabled or the
+    app lifespan hasn't started it.
+    """
+    return _batcher
+
+
+def set_transcript_batcher(batcher: Optional[TranscriptBatcher]) -> None:
+    global _batcher
+    _batcher = batcher
@@ -0,0 +1,140 @@
+# app/services/llm_client.py
+"""
+Shared OpenAI clients for the NLP services.
+
+Each OpenAI client owns an HTTP connection pool; building one per request
+means a fresh TCP + TLS handshake for every LLM call. Instead the services
+ask this module for a process-wide client, created on first use with
+keep-alive pooling, timeouts and retries from Settings.
+
+- get_openai_client():        sync client (scripts, threadpool code)
+- get_async_openai_client():  async client, one per running event loop
+  (an async pool's connections belong to the loop that opened them)
+
+Both return None when the SDK isn't installed or no API key is set, so
+callers keep their deterministic fallbacks.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from typing import Any, Optional
+
+from app.config import get_settings
+
+_lock = threading.Lock()
+_sync_client: Optional[Any] = None
+# (event loop, client) – rebuilt if called from a different loop
+_async_client: Optional[tuple] = None
+
+
+def _api_key() -> Optional[str]:
+    return get_settings().openai_api_key or os.getenv("OPENAI_API_KEY")
+
+
+def _client_options() -> dict:
+    import httpx
+    import openai
+
+    settings = get_settings()
+    return {
+        "timeout": openai.Timeout(
+            settings.openai_timeout_seconds,
+            connect=settings.openai_connect_timeout_seconds,
+        ),
+        "limits": httpx.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_keepalive_connections,
+            keepalive_expiry=settings.openai_keepalive_expiry_seconds,
+        ),
+    }
+
+
+def get_openai_client():
+    """
+    Process-wide sync OpenAI client, or None if OpenAI isn't available.
+    """
+    global _sync_client
+    if _sync_client is not None:
+        return _sync_client
+
+    api_key = _api_key()
+    if not api_key:
+        return None
+
+    with _lock:
+        if _sync_client is None:
+            try:
+                import openai
+            except Exception:  # pragma: no cover - library not installed
+                return None
+
+            _sync_client = openai.OpenAI(
+                api_key=api_key,
+                max_retries=get_settings().openai_max_retries,
+                http_client=openai.DefaultHttpxClient(**_client_options()),
+            )
+    return _sync_client
+
+
+def get_async_openai_client():
+    """
+    AsyncOpenAI client for the running event loop, or None if OpenAI
+    isn't available. Must be called from inside a coroutine.
+    """
+    global _async_client
+    loop = asyncio.get_running_loop()
+    cached = _async_client
+    if cached is not None and cached[0] is loop:
+        return cached[1]
+
+    api_key = _api_key()
+    if not api_key:
+        return None
+
+    try:
+        import openai
+    except Exception:  # pragma: no cover - library not installed
+        return None
+
+    client = openai.AsyncOpenAI(
+        api_key=api_key,
+        max_retries=get_settings().openai_max_retries,
+        http_client=openai.DefaultAsyncHttpxClient(**_client_options()),
+    )
+    _async_client = (loop, client)
+    if cached is not None:
+        _close_on_loop(*cached)
+    return client
+
+
+def _close_on_loop(loop: asyncio.AbstractEventLoop, client: Any) -> None:
+    """
+    Close a replaced async client. Its pooled connections belong to its
+    own loop, so the close is scheduled there (it runs once that loop
+    next runs). A loop that is already closed can't run it; the sockets
+    are then released when the client is collected.
+    """
+    if loop.is_closed():
+        return
+    close = client.close()
+    try:
+        asyncio.run_coroutine_threadsafe(close, loop)
+    except RuntimeError:  # closed in the meantime
+        close.close()
+
+
+async def close_llm_clients() -> None:
+    """
+    Close pooled connections (app shutdown). Clients are rebuilt on next use.
+    """
+    global _sync_client, _async_client
+    with _lock:
+        sync_client, _sync_client = _sync_client, None
+    cached, _async_client = _async_client, None
+
+    if sync_client is not None:
+        sync_client.close()
+    if cached is not None and cached[0] is asyncio.get_running_loop():
+        await cached[1].close()
@@ -0,0 +1,147 @@
+# app/services/llm_metrics.py
+"""
+Per-call-site instrumentation for OpenAI calls.
+
+For each site ("constraints", "availability", "call_script") we keep:
+
+  - a latency histogram (LATENCY_BUCKETS_MS) with count and sum
+  - prompt / completion token totals from the response `usage`
+  - errors by exception class (including LLMUnavailable while the
+    circuit breaker is open)
+  - why the service fell back to its deterministic answer
+  - cache lookups by status (hit / disk_hit / miss)
+
+call_llm / call_llm_async (llm_resilience) record every provider round
+trip; the services record fallbacks and cache status. Every call and
+fallback is also logged as one JSON line on the "app.llm" logger, and
+snapshot() backs GET /metrics/llm.
+"""
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("app.llm")
+
+# Upper bounds (ms); the last bucket counts everything slower
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+@dataclass
+class SiteStats:
+    calls: int = 0
+    latency_buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+    latency_sum_ms: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    errors: Counter = field(default_factory=Counter)
+    fallbacks: Counter = field(default_factory=Counter)
+    cache: Counter = field(default_factory=Counter)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "latency_ms": {
+                "buckets": {
+                    **{str(b): n for b, n in zip(LATENCY_BUCKETS_MS, self.latency_buckets)},
+                    "inf": self.latency_buckets[-1],
+                },
+                "sum": round(self.latency_sum_ms, 3),
+            },
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "errors": dict(self.errors),
+            "fallbacks": dict(self.fallbacks),
+            "cache": dict(self.cache),
+        }
+
+
+def _usage(response: Any) -> tuple[int, int]:
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return 0, 0
+    return (
+        int(getattr(usage, "prompt_tokens", 0) or 0),
+        int(getattr(usage, "completion_tokens", 0) or 0),
+    )
+
+
+def _log(event: str, **fields: Any) -> None:
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({"event": event, **fields}, separators=(",", ":")))
+
+
+class LLMMetrics:
+    """
+    Thread-safe counters keyed by call site.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sites: Dict[str, SiteStats] = {}
+
+    def _site(self, site: str) -> SiteStats:
+        stats = self._sites.get(site)
+        if stats is None:
+            stats = self._sites[site] = SiteStats()
+        return stats
+
+    def record_call(
+        self,
+        site: str,
+        latency_s: float,
+        *,
+        response: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        latency_ms = latency_s * 1000
+        prompt_tokens, completion_tokens = _usage(response)
+        error_class = type(error).__name__ if error is not None else None
+
+        with self._lock:
+            stats = self._site(site)
+            stats.calls += 1
+            stats.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+            stats.latency_sum_ms += latency_ms
+            stats.prompt_tokens += prompt_tokens
+            stats.completion_tokens += completion_tokens
+            if error_class is not None:
+                stats.errors[error_class] += 1
+
+        _log(
+            "llm_call",
+            site=site,
+            latency_ms=round(latency_ms, 3),
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            error=error_class,
+        )
+
+    def record_fallback(self, site: str, reason: str) -> None:
+        with self._lock:
+            self._site(site).fallbacks[reason] += 1
+        _log("llm_fallback", site=site, reason=reason)
+
+    def record_cache(self, site: str, status: str) -> None:
+        with self._lock:
+            self._site(site).cache[status] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {site: stats.as_dict() for site, stats in self._sites.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._sites.clear()
+
+
+_metrics = LLMMetrics()
+
+
+def get_llm_metrics() -> LLMMetrics:
+    return _metrics
@@ -0,0 +1,311 @@
+# app/services/llm_resilience.py
+"""
+Circuit breakers (and optional hedging) around OpenAI calls.
+
+Every NLP service falls back to a deterministic answer when the LLM fails,
+but without a breaker each call during a provider outage still waits out
+the full request timeout first. Here each call site ("constraints",
+"availability", "call_script") gets a breaker:
+
+  closed     calls go through; `failure_threshold` consecutive failures
+             (errors, or answers slower than `slow_call_seconds`) open it
+  open       calls fail immediately with LLMUnavailable for
+             `cooldown_seconds`, so callers go straight to their fallback
+  half_open  after the cooldown one probe call is let through; success
+             closes the breaker, failure re-opens it
+
+call_llm / call_llm_async also pass a per-attempt `timeout`
+(openai_call_timeout_seconds), and the async variant can hedge: if the
+first request hasn't answered after openai_hedge_after_seconds, an
+identical second one is sent and whichever finishes first wins.
+
+Only the provider round trip is wrapped; a well-formed answer the service
+can't use is not a breaker failure. Each round trip is also recorded in
+llm_metrics, as are the fallbacks it causes ("circuit_open", "llm_error").
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from app.config import get_settings
+from app.services.llm_metrics import get_llm_metrics
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class LLMUnavailable(Exception):
+    """Raised instead of calling the LLM while a site's breaker is open."""
+
+
+@dataclass
+class BreakerMetrics:
+    calls: int = 0
+    successes: int = 0
+    failures: int = 0
+    slow_calls: int = 0
+    short_circuited: int = 0
+    times_opened: int = 0
+    hedges_sent: int = 0
+    hedges_won: int = 0
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker for one LLM call site. Thread-safe: the
+    sync services run in FastAPI's threadpool.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = 5,
+        slow_call_seconds: float = 5.0,
+        cooldown_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if failure_threshold <= 0:
+            raise ValueError("failure_threshold must be positive")
+
+        self.name = name
+        self._failure_threshold = failure_threshold
+        self._slow_call = slow_call_seconds
+        self._cooldown = cooldown_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+        self.metrics = BreakerMetrics()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self) -> None:
+        if self._state == OPEN and self._clock() - self._opened_at >= self._cooldown:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._probe_in_flight = False
+        self.metrics.times_opened += 1
+
+    def allow(self) -> bool:
+        """
+        True if a call may go to the LLM now (closed, or the half-open probe).
+        """
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.metrics.short_circuited += 1
+            return False
+
+    def release(self) -> None:
+        """
+        Forget a call that ended without an outcome (cancelled by its caller),
+        so a half-open breaker can send another probe.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self, elapsed: float) -> None:
+        with self._lock:
+            self.metrics.calls += 1
+            if elapsed > self._slow_call:
+                # A latency spike counts against the provider like an error
+                self.metrics.slow_calls += 1
+                self._record_failure_locked()
+                return
+            self.metrics.successes += 1
+            self._consecutive_failures = 0
+            self._state = CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.metrics.calls += 1
+            self.metrics.failures += 1
+            self._record_failure_locked()
+
+    def _record_failure_locked(self) -> None:
+        self._consecutive_failures += 1
+        if self._state == HALF_OPEN or self._consecutive_failures >= self._failure_threshold:
+            self._open()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+            self.metrics = BreakerMetrics()
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            m = self.metrics
+            return {
+                "state": state,
+                "consecutive_failures": self._consecutive_failures,
+                "calls": m.calls,
+                "successes": m.successes,
+                "failures": m.failures,
+                "slow_calls": m.slow_calls,
+                "short_circuited": m.short_circuited,
+                "times_opened": m.times_opened,
+                "hedges_sent": m.hedges_sent,
+                "hedges_won": m.hedges_won,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(site: str) -> CircuitBreaker:
+    breaker = _breakers.get(site)
+    if breaker is not None:
+        return breaker
+    with _breakers_lock:
+        breaker = _breakers.get(site)
+        if breaker is None:
+            settings = get_settings()
+            breaker = CircuitBreaker(
+                site,
+                failure_threshold=settings.openai_breaker_failure_threshold,
+                slow_call_seconds=settings.openai_breaker_slow_call_seconds,
+                cooldown_seconds=settings.openai_breaker_cooldown_seconds,
+            )
+            _breakers[site] = breaker
+    return breaker
+
+
+def set_breaker(site: str, breaker: Optional[CircuitBreaker]) -> None:
+    with _breakers_lock:
+        if breaker is None:
+            _breakers.pop(site, None)
+        else:
+            _breakers[site] = breaker
+
+
+def breaker_snapshot() -> Dict[str, Dict[str, Any]]:
+    return {site: breaker.snapshot() for site, breaker in list(_breakers.items())}
+
+
+def _with_timeout(kwargs: dict) -> dict:
+    kwargs.setdefault("timeout", get_settings().openai_call_timeout_seconds)
+    return kwargs
+
+
+def call_llm(site: str, create: Callable[..., T], **kwargs: Any) -> T:
+    """
+    create(**kwargs) through `site`'s breaker, e.g.
+
+        resp = call_llm("constraints", client.chat.completions.create, model=..., messages=...)
+
+    Raises LLMUnavailable while the breaker is open; other errors are
+    recorded and re-raised, so callers keep their existing fallbacks.
+    """
+    breaker = get_breaker(site)
+    metrics = get_llm_metrics()
+    if not breaker.allow():
+        metrics.record_fallback(site, "circuit_open")
+        raise LLMUnavailable(f"LLM circuit for {site!r} is open")
+
+    started = time.perf_counter()
+    try:
+        result = create(**_with_timeout(kwargs))
+    except Exception as exc:
+        breaker.record_failure()
+        metrics.record_call(site, time.perf_counter() - started, error=exc)
+        metrics.record_fallback(site, "llm_error")
+        raise
+    elapsed = time.perf_counter() - started
+    breaker.record_success(elapsed)
+    metrics.record_call(site, elapsed, response=result)
+    return result
+
+
+async def _hedged(
+    breaker: CircuitBreaker,
+    create: Callable[..., Awaitable[T]],
+    kwargs: dict,
+    hedge_after: float,
+) -> T:
+    first = asyncio.ensure_future(create(**kwargs))
+    pending = {first}
+    error: Optional[BaseException] = None
+    try:
+        # Inside the try, so a cancelled caller doesn't orphan `first`
+        done, _ = await asyncio.wait(pending, timeout=hedge_after)
+        if done:
+            return first.result()
+
+        breaker.metrics.hedges_sent += 1
+        second = asyncio.ensure_future(create(**kwargs))
+        pending = {first, second}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is second:
+                        breaker.metrics.hedges_won += 1
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def call_llm_async(site: str, create: Callable[..., Awaitable[T]], **kwargs: Any) -> T:
+    """
+    Async twin of call_llm. With openai_hedge_after_seconds > 0, a request
+    still unanswered after that long is duplicated and the first success
+    wins (the loser is cancelled); the breaker sees one call either way.
+    """
+    breaker = get_breaker(site)
+    metrics = get_llm_metrics()
+    if not breaker.allow():
+        metrics.record_fallback(site, "circuit_open")
+        raise LLMUnavailable(f"LLM circuit for {site!r} is open")
+
+    hedge_after = get_settings().openai_hedge_after_seconds
+    started = time.perf_counter()
+    try:
+        if hedge_after > 0:
+            result = await _hedged(breaker, create, _with_timeout(kwargs), hedge_after)
+        else:
+            result = await create(**_with_timeout(kwargs))
+    except asyncio.CancelledError:
+        # The caller gave up (e.g. a latency budget); says nothing about the provider
+        breaker.release()
+        raise
+    except Exception as exc:
+        breaker.record_failure()
+        metrics.record_call(site, time.perf_counter() - started, error=exc)
+        metrics.record_fallback(site, "llm_error")
+        raise
+    elapsed = time.perf_counter() - started
+    breaker.record_success(elapsed)
+    metrics.record_call(site, elapsed, response=result)
+    return result
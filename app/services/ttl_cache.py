@@ -0,0 +1,118 @@
+# app/services/ttl_cache.py
+"""
+Bounded, thread-safe TTL + LRU map shared by the in-process caches
+(call contexts, call scripts, webhook replays, parsed constraints).
+
+Every cache carries a name; /metrics reports entries, hits / misses and
+evictions per name (app_metrics.render_prometheus).
+"""
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    Entries expire `ttl_seconds` after put() (or at an explicit
+    `expires_at` on the cache's clock); past `max_entries` the least
+    recently used entry goes first.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        ttl_seconds: float,
+        max_entries: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+        register_cache(self)
+
+    def get(self, key: Hashable) -> Optional[V]:
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: V, *, expires_at: Optional[float] = None) -> None:
+        if expires_at is None:
+            expires_at = self.clock() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+
+    def evict(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.expired = self.evicted = 0
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evicted": self.evicted,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Every live cache (weak, so caches built by tests or scripts don't linger)
+_registry: "weakref.WeakSet[TTLCache]" = weakref.WeakSet()
+_registry_lock = threading.Lock()
+
+
+def register_cache(cache: TTLCache) -> None:
+    with _registry_lock:
+        _registry.add(cache)
+
+
+def cache_snapshots() -> Dict[str, Dict[str, int]]:
+    """
+    Stats of every live cache, summed per name.
+    """
+    with _registry_lock:
+        caches = list(_registry)
+    totals: Dict[str, Dict[str, int]] = {}
+    for cache in caches:
+        total = totals.setdefault(cache.name, {})
+        for stat, value in cache.snapshot().items():
+            total[stat] = total.get(stat, 0) + value
+    return dict(sorted(totals.items()))
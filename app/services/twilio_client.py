@@ -1,9 +1,8 @@
 # app/services/twilio_client.py
 from typing import Optional
 
-from twilio.rest import Client as TwilioSDKClient
-
 from app.config import get_settings
+from app.services.app_metrics import TWILIO_LATENCY
 
 
 class TwilioClient:
@@ -22,6 +21,10 @@ class TwilioClient:
         from_number: str,
         voice_url: str,
     ):
+        # The SDK (and requests under it) costs ~100ms to import; only
+        # pay for it when a call is actually placed
+        from twilio.rest import Client as TwilioSDKClient
+
         self._client = TwilioSDKClient(account_sid, auth_token)
         self._from_number = from_number
         self._voice_url = voice_url
@@ -30,11 +33,12 @@ class TwilioClient:
         """
         Create an outbound call via Twilio and return the Call SID.
         """
-        call = self._client.calls.create(
-            to=to_number,
-            from_=self._from_number,
-            url=self._voice_url,
-        )
+        with TWILIO_LATENCY.time(("calls.create",)):
+            call = self._client.calls.create(
+                to=to_number,
+                from_=self._from_number,
+                url=self._voice_url,
+            )
         return call.sid
 
 
@@ -0,0 +1,180 @@
+# app/services/twilio_signature.py
+"""
+X-Twilio-Signature validation for the /twilio/* webhooks.
+
+Twilio signs each webhook with HMAC-SHA1 over the full request URL followed
+by every form parameter as name+value, sorted by name (then value). This
+module computes the same signature as twilio.request_validator, but:
+
+- the HMAC key schedule is built once per secret; each request only
+  .copy()s the keyed object instead of re-deriving the pads,
+- the body is read once, parsed straight into a list of pairs and sorted
+  in place, then handed to the route unchanged (FastAPI parses it as
+  usual, no second buffered copy is made here),
+- it is a plain ASGI middleware, so it adds no per-request task or
+  stream wrapping the way BaseHTTPMiddleware does.
+
+Validation is off while TWILIO_WEBHOOK_SECRET is unset (local dev, tests).
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+from typing import Iterable, List, Optional, Tuple
+from urllib.parse import unquote_plus
+
+from app.config import get_settings
+
+SIGNATURE_HEADER = b"x-twilio-signature"
+PROTECTED_PREFIX = "/twilio/"
+
+_FORM_CONTENT_TYPE = b"application/x-www-form-urlencoded"
+
+
+class TwilioSignatureValidator:
+    """
+    Computes / checks Twilio request signatures for one secret.
+    """
+
+    def __init__(self, secret: str):
+        self._mac = hmac.new(secret.encode("utf-8"), digestmod=hashlib.sha1)
+
+    def compute(self, url: str, params: Iterable[Tuple[str, str]]) -> bytes:
+        """
+        Base64 signature for `url` + canonicalised `params`.
+        """
+        pairs: List[Tuple[str, str]] = list(set(params))
+        pairs.sort()
+        mac = self._mac.copy()
+        mac.update(url.encode("utf-8"))
+        mac.update("".join([name + value for name, value in pairs]).encode("utf-8"))
+        return base64.b64encode(mac.digest())
+
+    def validate(
+        self,
+        url: str,
+        params: Iterable[Tuple[str, str]],
+        signature: Optional[bytes],
+    ) -> bool:
+        if not signature:
+            return False
+        return hmac.compare_digest(self.compute(url, params), signature)
+
+
+def parse_form_pairs(body: bytes) -> List[Tuple[str, str]]:
+    """
+    Decode an urlencoded body into (name, value) pairs, keeping blanks
+    (Twilio signs empty parameters too).
+
+    Same result as urllib's parse_qsl, but fields without escapes (most
+    of a Twilio callback) skip unquoting entirely.
+    """
+    pairs: List[Tuple[str, str]] = []
+    for field in body.decode("utf-8", "replace").split("&"):
+        if not field:
+            continue
+        name, _, value = field.partition("=")
+        if "%" in name or "+" in name:
+            name = unquote_plus(name)
+        if "%" in value or "+" in value:
+            value = unquote_plus(value)
+        pairs.append((name, value))
+    return pairs
+
+
+def _request_url(scope, headers: dict, base_url: Optional[str]) -> str:
+    path = scope.get("root_path", "") + scope["path"]
+    if base_url:
+        url = base_url.rstrip("/") + path
+    else:
+        host = headers.get(b"host", b"").decode("latin-1")
+        url = f"{scope.get('scheme', 'http')}://{host}{path}"
+    query = scope.get("query_string") or b""
+    if query:
+        url += "?" + query.decode("latin-1")
+    return url
+
+
+async def _forbidden(send) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 403,
+            "headers": [(b"content-type", b"text/plain; charset=utf-8")],
+        }
+    )
+    await send({"type": "http.response.body", "body": b"Invalid Twilio signature"})
+
+
+class TwilioSignatureMiddleware:
+    """
+    ASGI middleware rejecting unsigned / mis-signed POSTs to /twilio/*
+    with 403.
+
+    Behind a proxy that rewrites the scheme or host, set
+    TWILIO_WEBHOOK_BASE_URL to the public origin Twilio calls
+    (e.g. "https://api.example.com") so the signed URL can be rebuilt.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._secret: Optional[str] = None
+        self._validator: Optional[TwilioSignatureValidator] = None
+
+    def _get_validator(self) -> Optional[TwilioSignatureValidator]:
+        secret = get_settings().TWILIO_WEBHOOK_SECRET
+        if not secret:
+            return None
+        if secret != self._secret:
+            self._validator = TwilioSignatureValidator(secret)
+            self._secret = secret
+        return self._validator
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not scope["path"].startswith(PROTECTED_PREFIX)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        validator = self._get_validator()
+        if validator is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+
+        # Read the body once; usually a single chunk, so no join is needed
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] != "http.request":
+                # Client went away before sending the body
+                return
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        body = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+
+        content_type = headers.get(b"content-type", b"")
+        params = (
+            parse_form_pairs(body) if content_type.startswith(_FORM_CONTENT_TYPE) else ()
+        )
+        url = _request_url(scope, headers, get_settings().TWILIO_WEBHOOK_BASE_URL)
+        if not validator.validate(url, params, headers.get(SIGNATURE_HEADER)):
+            await _forbidden(send)
+            return
+
+        replayed = False
+
+        async def replay_receive():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(scope, replay_receive, send)
@@ -0,0 +1,136 @@
+# app/services/twiml_templates.py
+"""
+Pre-rendered TwiML for the voice webhooks.
+
+Building a VoiceResponse tree and serialising it costs far more than the
+webhooks' actual logic, and almost every response is either fully static
+or static apart from one sentence fragment. We render each response once
+with the Twilio SDK (so the XML is exactly what the SDK would produce),
+keep the bytes, and for dynamic responses split the rendered document
+around a placeholder so filling it is an escape + two concatenations.
+
+warm_twiml_templates() is called from the app lifespan; anything not yet
+warmed is rendered on first use.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Callable, Dict, Tuple
+from xml.sax.saxutils import escape
+
+ANSWER = "answer"
+GATHER_UNKNOWN_CALL = "gather_unknown_call"
+GATHER_NO_MEETING = "gather_no_meeting"
+GATHER_MISSING_CONFIG = "gather_missing_config"
+GATHER_CONFIRMATION = "gather_confirmation"
+ANSWER_WITH_SCRIPT = "answer_with_script"
+
+# Marker substituted at render time; contains nothing XML would escape
+_SLOT = "@@ALTA_SLOT@@"
+
+ANSWER_SCRIPT = (
+    "Hi, this is Alta, calling to schedule your meeting. "
+    "Please say one time that works for you in the requested window, "
+    "or press 1 for the earliest available time, "
+    "2 for a later time in the window, and then wait."
+)
+
+
+def _voice_response():
+    from twilio.twiml.voice_response import VoiceResponse
+
+    return VoiceResponse()
+
+
+def _render_answer(script: str) -> str:
+    vr = _voice_response()
+    gather = vr.gather(
+        input="speech dtmf",
+        action="/twilio/voice/gather",
+        method="POST",
+        timeout=6,
+        num_digits=1,
+    )
+    gather.say(script)
+    vr.say(
+        "If I did not get your availability, we will follow up by message. Goodbye."
+    )
+    return str(vr)
+
+
+def _render_say(text: str) -> str:
+    vr = _voice_response()
+    vr.say(text)
+    return str(vr)
+
+
+_STATIC_RENDERERS: Dict[str, Callable[[], str]] = {
+    ANSWER: lambda: _render_answer(ANSWER_SCRIPT),
+    GATHER_UNKNOWN_CALL: lambda: _render_say(
+        "Thanks. I could not match this call, but we will follow up manually. Goodbye."
+    ),
+    GATHER_NO_MEETING: lambda: _render_say(
+        "Thanks. I could not find a matching meeting for this call, "
+        "but we will follow up. Goodbye."
+    ),
+    GATHER_MISSING_CONFIG: lambda: _render_say(
+        "Thanks. The meeting request configuration is missing, "
+        "so we will follow up later. Goodbye."
+    ),
+}
+
+_TEMPLATE_RENDERERS: Dict[str, Callable[[], str]] = {
+    GATHER_CONFIRMATION: lambda: _render_say(
+        f"Great. I have recorded that you are available on {_SLOT}. "
+        "We will confirm the final meeting time shortly. Goodbye."
+    ),
+    # Same shape as ANSWER, for per-call scripts
+    ANSWER_WITH_SCRIPT: lambda: _render_answer(_SLOT),
+}
+
+_static: Dict[str, bytes] = {}
+_templates: Dict[str, Tuple[bytes, bytes]] = {}
+_lock = threading.Lock()
+
+
+def _split(rendered: str) -> Tuple[bytes, bytes]:
+    prefix, sep, suffix = rendered.partition(_SLOT)
+    if not sep:
+        raise ValueError("TwiML template is missing its placeholder")
+    return prefix.encode("utf-8"), suffix.encode("utf-8")
+
+
+def warm_twiml_templates() -> None:
+    """
+    Render every known response up front (idempotent).
+    """
+    with _lock:
+        for name, render in _STATIC_RENDERERS.items():
+            if name not in _static:
+                _static[name] = render().encode("utf-8")
+        for name, render in _TEMPLATE_RENDERERS.items():
+            if name not in _templates:
+                _templates[name] = _split(render())
+
+
+def static_twiml(name: str) -> bytes:
+    """
+    Pre-rendered bytes for a fully static response.
+    """
+    body = _static.get(name)
+    if body is None:
+        warm_twiml_templates()
+        body = _static[name]
+    return body
+
+
+def render_twiml(name: str, value: str) -> bytes:
+    """
+    Fill a pre-rendered template's single slot with `value` (XML-escaped).
+    """
+    parts = _templates.get(name)
+    if parts is None:
+        warm_twiml_templates()
+        parts = _templates[name]
+    prefix, suffix = parts
+    return prefix + escape(value).encode("utf-8") + suffix
@@ -0,0 +1,248 @@
+# app/services/webhook_idempotency.py
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi.responses import Response
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.models.webhook_response import WebhookResponse
+from app.services.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+CachedResponse = Tuple[bytes, str]  # (body, media_type)
+
+
+def webhook_key(
+    call_sid: str,
+    endpoint: str,
+    params: Iterable[Tuple[str, str]],
+) -> str:
+    """
+    sha256 over (CallSid, endpoint, sorted form params).
+
+    Twilio retries resend the exact same form, so any retry maps to the
+    same key while a genuinely new gather on the same call does not.
+    """
+    h = hashlib.sha256()
+    h.update(call_sid.encode("utf-8"))
+    h.update(b"\0")
+    h.update(endpoint.encode("utf-8"))
+    for name, value in sorted(params):
+        h.update(b"\0")
+        h.update(name.encode("utf-8"))
+        h.update(b"=")
+        h.update(str(value).encode("utf-8"))
+    return h.hexdigest()
+
+
+class WebhookIdempotency:
+    """
+    Replays the first response for duplicate webhook deliveries.
+
+    Lookup order for a key:
+      1. bounded in-memory TTL cache
+      2. a request with the same key still in flight in this process
+         (Twilio retries on timeout, so the original may not be done yet)
+      3. the shared webhook_responses table, if enabled
+    Otherwise the handler runs once and its 2xx response is stored.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = 600,
+        max_entries: int = 20_000,
+        session_factory: Optional[Callable[[], Session]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._ttl = ttl_seconds
+        self._session_factory = session_factory
+
+        self._local: TTLCache[CachedResponse] = TTLCache(
+            "webhook_idempotency", ttl_seconds=ttl_seconds, max_entries=max_entries, clock=clock
+        )
+        self._in_flight: Dict[str, "asyncio.Future[CachedResponse]"] = {}
+
+        # Requests replayed (from any tier) / handled
+        self.hits = 0
+        self.misses = 0
+
+    # ---- shared tier ----
+
+    def _get_shared(self, key: str) -> Optional[CachedResponse]:
+        cutoff = datetime.utcnow() - timedelta(seconds=self._ttl)
+        db = self._session_factory()
+        try:
+            row = db.execute(
+                select(WebhookResponse.body, WebhookResponse.media_type).where(
+                    WebhookResponse.key == key,
+                    WebhookResponse.created_at > cutoff,
+                )
+            ).first()
+            return (bytes(row[0]), row[1]) if row else None
+        finally:
+            db.close()
+
+    def _put_shared(
+        self,
+        key: str,
+        endpoint: str,
+        call_sid: str,
+        cached: CachedResponse,
+    ) -> None:
+        db = self._session_factory()
+        try:
+            db.add(
+                WebhookResponse(
+                    key=key,
+                    endpoint=endpoint,
+                    provider_call_id=call_sid,
+                    body=cached[0],
+                    media_type=cached[1],
+                )
+            )
+            db.commit()
+        except IntegrityError:
+            # Another worker stored it first; theirs is as good as ours
+            db.rollback()
+        finally:
+            db.close()
+
+    # ---- public API ----
+
+    async def run(
+        self,
+        *,
+        key: str,
+        endpoint: str,
+        call_sid: str,
+        handler: Callable[[], Awaitable[Response]],
+    ) -> Response:
+        cached = self._local.get(key)
+        if cached is not None:
+            self.hits += 1
+            return Response(content=cached[0], media_type=cached[1])
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            try:
+                body, media_type = await asyncio.shield(in_flight)
+            except asyncio.CancelledError:
+                if not in_flight.cancelled():
+                    raise  # we were cancelled ourselves
+                # The original produced nothing cacheable; run it ourselves
+            else:
+                self.hits += 1
+                return Response(content=body, media_type=media_type)
+
+        future: "asyncio.Future[CachedResponse]" = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._in_flight[key] = future
+        try:
+            if self._session_factory is not None:
+                cached = await run_in_threadpool(self._get_shared, key)
+                if cached is not None:
+                    self.hits += 1
+                    self._local.put(key, cached)
+                    future.set_result(cached)
+                    return Response(content=cached[0], media_type=cached[1])
+
+            self.misses += 1
+            response = await handler()
+            if not 200 <= response.status_code < 300:
+                return response
+
+            cached = (bytes(response.body), response.media_type or "application/xml")
+            self._local.put(key, cached)
+            if self._session_factory is not None:
+                try:
+                    await run_in_threadpool(
+                        self._put_shared, key, endpoint, call_sid, cached
+                    )
+                except Exception:
+                    # The response is still good; only cross-worker replay is lost
+                    logger.exception("Failed to store webhook response for %s", endpoint)
+
+            future.set_result(cached)
+            return response
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody may be awaiting it; don't warn about an unretrieved error
+            future.exception()
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            self._in_flight.pop(key, None)
+
+    def clear(self) -> None:
+        self._local.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def purge_expired_webhook_responses(db: Session, ttl_seconds: Optional[int] = None) -> int:
+    """
+    Delete shared idempotency rows older than the TTL. Returns rows removed.
+    """
+    ttl = ttl_seconds or get_settings().WEBHOOK_IDEMPOTENCY_TTL_SECONDS
+    cutoff = datetime.utcnow() - timedelta(seconds=ttl)
+    result = db.execute(delete(WebhookResponse).where(WebhookResponse.created_at <= cutoff))
+    db.commit()
+    return result.rowcount
+
+
+async def run_purge_periodically(
+    session_factory: Callable[[], Session],
+    interval_seconds: float,
+) -> None:
+    """
+    Background task (started by the app lifespan when the shared table is
+    on): purge expired rows every `interval_seconds` until cancelled.
+    """
+
+    def _purge_once() -> int:
+        db = session_factory()
+        try:
+            return purge_expired_webhook_responses(db)
+        finally:
+            db.close()
+
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(_purge_once)
+        except Exception:
+            logger.exception("Purging webhook_responses failed; retrying next interval")
+
+
+_idempotency: Optional[WebhookIdempotency] = None
+
+
+def get_webhook_idempotency() -> WebhookIdempotency:
+    global _idempotency
+    if _idempotency is None:
+        settings = get_settings()
+        session_factory = None
+        if settings.WEBHOOK_IDEMPOTENCY_SHARED:
+            from app.db.session import SessionLocal
+
+            session_factory = SessionLocal
+        _idempotency = WebhookIdempotency(
+            ttl_seconds=settings.WEBHOOK_IDEMPOTENCY_TTL_SECONDS,
+            max_entries=settings.WEBHOOK_IDEMPOTENCY_MAX_ENTRIES,
+            session_factory=session_factory,
+        )
+    return _idempotency
@@ -0,0 +1,46 @@
+# scripts/bench_constraints_heuristic.py
+"""
+Throughput of the offline constraints parser.
+
+When OpenAI is degraded every /constraints/parse request goes through
+_heuristic_parse, so this measures both the single-pass scanner alone and
+the full parse (scan + window + pydantic models).
+
+    python -m scripts.bench_constraints_heuristic
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+
+from app.services.constraints_nlp_service import _heuristic_parse, _scan_instruction
+
+INSTRUCTIONS = [
+    "Try to book in the next two weeks, preferably Tue–Thu mornings",
+    "Sometime this month, ideally a Saturday afternoon",
+    "Within 10 days, Mondays or Fri evenings",
+    "Can we do this Friday? Mornings are best, otherwise after hours",
+    "monday to wednesday over the next couple of weeks, no evenings please",
+    "Anytime in the coming month. " * 8,  # a long, rambling one
+]
+N = 20_000
+
+
+def _rate(fn) -> float:
+    started = time.perf_counter()
+    for i in range(N):
+        fn(INSTRUCTIONS[i % len(INSTRUCTIONS)])
+    return N / (time.perf_counter() - started)
+
+
+def main() -> None:
+    now = datetime(2025, 1, 1, 10, 0, tzinfo=timezone.utc)
+    scan_rate = _rate(lambda text: _scan_instruction(text.lower()))
+    parse_rate = _rate(lambda text: _heuristic_parse(text, now, "Asia/Jerusalem"))
+    print(f"_scan_instruction: {scan_rate:,.0f} instructions/s ({1e6 / scan_rate:.1f} us each)")
+    print(f"_heuristic_parse:  {parse_rate:,.0f} instructions/s ({1e6 / parse_rate:.1f} us each)")
+
+
+if __name__ == "__main__":
+    main()
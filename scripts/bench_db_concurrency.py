@@ -0,0 +1,113 @@
+# scripts/bench_db_concurrency.py
+"""
+Concurrent webhook-style DB load against a SQLite file: library-default
+engine (DELETE journal, default pool) vs. build_engine() with the pool
+and pragma settings from Settings (WAL, synchronous=NORMAL, busy_timeout,
+mmap).
+
+Each worker thread mimics the webhooks: 1 in 4 operations is a status
+callback (UPDATE calls + INSERT call_events in one transaction), the rest
+are voice-webhook reads of a call row.
+
+    python -m scripts.bench_db_concurrency [threads] [seconds]
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.config import get_settings
+from app.db.session import build_engine
+
+CALLS = 1_000
+
+
+def _setup(engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE calls (id INTEGER PRIMARY KEY, status TEXT, updated_at REAL)"))
+        conn.execute(
+            text("CREATE TABLE call_events (id INTEGER PRIMARY KEY, call_id INTEGER, status TEXT, at REAL)")
+        )
+        conn.execute(
+            text("INSERT INTO calls (id, status, updated_at) VALUES (:id, 'queued', 0)"),
+            [{"id": i} for i in range(1, CALLS + 1)],
+        )
+
+
+def _worker(engine, stop: threading.Event, counts: dict, lock: threading.Lock) -> None:
+    rng = random.Random()
+    done = errors = 0
+    while not stop.is_set():
+        call_id = rng.randint(1, CALLS)
+        try:
+            if rng.random() < 0.25:
+                with engine.begin() as conn:
+                    now = time.time()
+                    conn.execute(
+                        text("UPDATE calls SET status = 'ringing', updated_at = :now WHERE id = :id"),
+                        {"id": call_id, "now": now},
+                    )
+                    conn.execute(
+                        text("INSERT INTO call_events (call_id, status, at) VALUES (:id, 'ringing', :now)"),
+                        {"id": call_id, "now": now},
+                    )
+            else:
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT status FROM calls WHERE id = :id"), {"id": call_id}).one()
+            done += 1
+        except OperationalError:
+            # "database is locked"
+            errors += 1
+    with lock:
+        counts["ops"] += done
+        counts["errors"] += errors
+
+
+def _run(label: str, engine, threads: int, seconds: float) -> None:
+    _setup(engine)
+    stop = threading.Event()
+    lock = threading.Lock()
+    counts = {"ops": 0, "errors": 0}
+    workers = [
+        threading.Thread(target=_worker, args=(engine, stop, counts, lock)) for _ in range(threads)
+    ]
+    for w in workers:
+        w.start()
+    time.sleep(seconds)
+    stop.set()
+    for w in workers:
+        w.join()
+    engine.dispose()
+    print(
+        f"{label:<28} {counts['ops'] / seconds:>9.0f} ops/s   "
+        f"{counts['errors']:>6} locked errors"
+    )
+
+
+def main() -> None:
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{threads} threads, {seconds:.0f}s each")
+        before_url = f"sqlite:///{os.path.join(tmp, 'before.db')}"
+        _run(
+            "defaults (DELETE journal)",
+            create_engine(before_url, connect_args={"check_same_thread": False}),
+            threads,
+            seconds,
+        )
+        after_url = f"sqlite:///{os.path.join(tmp, 'after.db')}"
+        _run("build_engine (WAL, pool)", build_engine(after_url, get_settings()), threads, seconds)
+
+
+if __name__ == "__main__":
+    main()
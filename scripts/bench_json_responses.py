@@ -0,0 +1,96 @@
+# scripts/bench_json_responses.py
+"""
+Micro-benchmark for JSON response rendering of a 1000-slot meeting request.
+
+Compares what GET /meeting-requests/{id} used to do (per-slot .isoformat(),
+then jsonable_encoder + JSONResponse), FastAPI's response_model path
+(validate, then dump to JSON via pydantic) and FastJSONResponse with
+orjson and with its stdlib fallback.
+
+    python -m scripts.bench_json_responses
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse
+
+from app.schemas.meeting_requests import MeetingRequestWithSlots
+from app.services import json_response
+from app.services.json_response import FastJSONResponse
+
+SLOTS = 1000
+N = 200
+
+_START = datetime(2025, 1, 1, 9, 0)
+_TIMES = [(_START + timedelta(minutes=30 * i), _START + timedelta(minutes=30 * (i + 1))) for i in range(SLOTS)]
+_MEETING_REQUEST = {
+    "id": 1,
+    "owner_id": "am-bench",
+    "title": "Bench",
+    "duration_minutes": 30,
+    "max_bookings": 0,
+    "status": "ACTIVE",
+    "hard_constraints": {"window_start": "2025-01-01T09:00:00", "window_end": "2025-01-22T09:00:00", "timezone": "UTC"},
+}
+
+
+def _legacy() -> bytes:
+    content = {
+        "meeting_request": dict(_MEETING_REQUEST),
+        "slots": [
+            {"id": i, "start_time": s.isoformat(), "end_time": e.isoformat(), "state": "AVAILABLE"}
+            for i, (s, e) in enumerate(_TIMES)
+        ],
+    }
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def _content() -> dict:
+    return {
+        "meeting_request": dict(_MEETING_REQUEST),
+        "slots": [
+            {"id": i, "start_time": s, "end_time": e, "state": "AVAILABLE"}
+            for i, (s, e) in enumerate(_TIMES)
+        ],
+    }
+
+
+_adapter = TypeAdapter(MeetingRequestWithSlots)
+
+
+def _response_model() -> bytes:
+    return _adapter.dump_json(_adapter.validate_python(_content()))
+
+
+def _fast() -> bytes:
+    return FastJSONResponse(_content()).body
+
+
+def _per_call_ms(fn, n: int = N) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - started) / n * 1e3
+
+
+def main() -> None:
+    print(f"{SLOTS} slots, {len(_fast())} bytes")
+    print(f"isoformat + jsonable_encoder:  {_per_call_ms(_legacy):.3f} ms")
+    print(f"response_model validate+dump:  {_per_call_ms(_response_model):.3f} ms")
+    if json_response.orjson is not None:
+        print(f"FastJSONResponse (orjson):     {_per_call_ms(_fast):.3f} ms")
+    orjson, json_response.orjson = json_response.orjson, None
+    try:
+        print(f"FastJSONResponse (stdlib):     {_per_call_ms(_fast):.3f} ms")
+    finally:
+        json_response.orjson = orjson
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# scripts/bench_twilio_signature.py
+"""
+Micro-benchmark for X-Twilio-Signature validation.
+
+Compares our validator with twilio.request_validator on a typical status
+callback, and times the whole middleware (body read, parse, validate,
+replay) against a no-op ASGI app.
+
+    python -m scripts.bench_twilio_signature
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from urllib.parse import urlencode
+
+from twilio.request_validator import RequestValidator
+
+from app.config import get_settings
+from app.services.twilio_signature import (
+    TwilioSignatureMiddleware,
+    TwilioSignatureValidator,
+)
+
+SECRET = "bench-secret"
+URL = "https://api.example.com/twilio/status"
+PARAMS = {
+    "AccountSid": "AC" + "0" * 32,
+    "ApiVersion": "2010-04-01",
+    "CallSid": "CA" + "1" * 32,
+    "CallStatus": "completed",
+    "CallDuration": "42",
+    "Called": "+15551234567",
+    "Caller": "+15557654321",
+    "Direction": "outbound-api",
+    "From": "+15557654321",
+    "SequenceNumber": "3",
+    "Timestamp": "Wed, 01 Jan 2025 09:02:10 +0000",
+    "To": "+15551234567",
+}
+N = 50_000
+
+
+def _per_call_us(fn, n: int = N) -> float:
+    started = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - started) / n * 1e6
+
+
+async def _middleware_us(n: int = N) -> float:
+    async def endpoint(scope, receive, send):
+        await receive()
+
+    settings = get_settings()
+    settings.TWILIO_WEBHOOK_SECRET = SECRET
+    settings.TWILIO_WEBHOOK_BASE_URL = "https://api.example.com"
+
+    middleware = TwilioSignatureMiddleware(endpoint)
+    body = urlencode(PARAMS).encode()
+    signature = RequestValidator(SECRET).compute_signature(URL, PARAMS).encode()
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/twilio/status",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"api.example.com"),
+            (b"content-type", b"application/x-www-form-urlencoded"),
+            (b"x-twilio-signature", signature),
+        ],
+    }
+    message = {"type": "http.request", "body": body, "more_body": False}
+
+    async def receive():
+        return message
+
+    async def send(_):
+        raise AssertionError("signature rejected")
+
+    started = time.perf_counter()
+    for _ in range(n):
+        await middleware(scope, receive, send)
+    return (time.perf_counter() - started) / n * 1e6
+
+
+def main() -> None:
+    ours = TwilioSignatureValidator(SECRET)
+    sdk = RequestValidator(SECRET)
+    pairs = list(PARAMS.items())
+
+    print(f"twilio SDK compute_signature:   {_per_call_us(lambda: sdk.compute_signature(URL, PARAMS)):.2f} us")
+    print(f"TwilioSignatureValidator:       {_per_call_us(lambda: ours.compute(URL, pairs)):.2f} us")
+    print(f"middleware end-to-end (no app): {asyncio.run(_middleware_us()):.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+# scripts/init_db.py
+"""
+Create any missing tables in DATABASE_URL.
+
+The app only does this on startup in dev (DB_CREATE_SCHEMA_ON_STARTUP);
+run this once per deploy instead:
+
+    python -m scripts.init_db
+"""
+
+from __future__ import annotations
+
+from app.db.session import engine
+from app.models import Base
+
+
+def main() -> None:
+    Base.metadata.create_all(bind=engine)
+    print(f"[init_db] Schema ready at {engine.url.render_as_string(hide_password=True)}")
+
+
+if __name__ == "__main__":
+    main()
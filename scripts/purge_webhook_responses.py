@@ -0,0 +1,28 @@
+# scripts/purge_webhook_responses.py
+"""
+Delete expired rows from the shared webhook_responses idempotency table.
+
+Only needed with WEBHOOK_IDEMPOTENCY_SHARED on. The app also does this
+every WEBHOOK_IDEMPOTENCY_PURGE_INTERVAL_SECONDS; set that to 0 and run
+this from cron instead if you prefer:
+
+    python -m scripts.purge_webhook_responses
+"""
+
+from __future__ import annotations
+
+from app.db.session import SessionLocal
+from app.services.webhook_idempotency import purge_expired_webhook_responses
+
+
+def main() -> None:
+    db = SessionLocal()
+    try:
+        removed = purge_expired_webhook_responses(db)
+        print(f"[purge_webhook_responses] Removed {removed} expired responses")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
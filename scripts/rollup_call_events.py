@@ -0,0 +1,27 @@
+# scripts/rollup_call_events.py
+"""
+Fold new call_events into the per-call and per-campaign rollup tables.
+
+Safe to run as often as you like (e.g. from cron every minute, with
+CALL_EVENTS_ROLLUP_INTERVAL_SECONDS=0 so the app doesn't also do it):
+the rollup is incremental, only reads events it has not processed yet,
+and concurrent runs are serialised by a lock.
+"""
+
+from __future__ import annotations
+
+from app.db.session import SessionLocal
+from app.services.call_analytics_service import rollup_call_events
+
+
+def main() -> None:
+    db = SessionLocal()
+    try:
+        processed = rollup_call_events(db)
+        print(f"[rollup_call_events] Processed {processed} call events")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
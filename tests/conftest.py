@@ -0,0 +1,6 @@
+# tests/conftest.py
+from app.config import get_settings
+
+# Fail any request that runs more SQL than its route's @query_budget
+# (app/db/query_stats.py), so query-count regressions break the suite
+get_settings().SQL_QUERY_BUDGET_STRICT = True
@@ -0,0 +1,133 @@
+# tests/test_app_metrics.py
+import threading
+
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.main import app
+from app.services.app_metrics import (
+    DB_POOL_CHECKOUT,
+    Counter,
+    Histogram,
+    instrument_engine_pool,
+    reset_app_metrics,
+    route_template,
+)
+from app.services.ttl_cache import TTLCache
+
+
+def test_sharded_counters_sum_across_threads():
+    counter = Counter("c_total", "test", ("route",))
+    histogram = Histogram("h_seconds", "test", buckets=(0.1, 1.0))
+
+    def work():
+        for _ in range(1000):
+            counter.inc(("/a",))
+            histogram.observe(0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert counter.values() == {("/a",): 4000}
+    # [<=0.1, <=1.0, +Inf, sum]
+    assert histogram.values()[()] == [0, 4000, 0, 2000.0]
+
+
+def test_metrics_endpoint_exports_route_metrics():
+    reset_app_metrics()
+    client = TestClient(app)
+    for _ in range(3):
+        assert client.get("/health").status_code == 200
+    client.get("/no-such-route")
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = resp.text
+
+    assert 'http_requests_total{method="GET",route="/health",status="200"} 3' in body
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/health"} 3' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/health",le="+Inf"} 3' in body
+    # /health checks the database through the pool
+    assert "db_pool_checkout_seconds_count" in body
+    assert "http_requests_in_flight 1" in body
+    assert "# TYPE openai_request_duration_seconds histogram" in body
+
+
+def test_routes_from_included_routers_keep_their_prefix():
+    reset_app_metrics()
+    client = TestClient(app)
+    client.get("/meeting-requests/999999")
+
+    body = client.get("/metrics").text
+    assert 'route="/meeting-requests/{meeting_request_id}"' in body
+
+
+def test_route_template_of_nested_routers():
+    # Pins the FastAPI behaviour route_template relies on: for a router
+    # included in a prefixed router, scope["route"] lacks the outer prefix
+    # and only the (private) effective route context has the full template
+    inner = APIRouter(prefix="/things")
+    outer = APIRouter(prefix="/v1")
+    seen = {}
+
+    @inner.get("/{thing_id}")
+    def read_thing(thing_id: int, request: Request):
+        seen["scope"] = request.scope
+        return {}
+
+    outer.include_router(inner)
+    nested = FastAPI()
+    nested.include_router(outer)
+    assert TestClient(nested).get("/v1/things/1").status_code == 200
+
+    scope = seen["scope"]
+    assert scope["fastapi"]["effective_route_context"].path == "/v1/things/{thing_id}"
+    assert scope["route"].path == "/things/{thing_id}"
+    assert route_template(scope) == "/v1/things/{thing_id}"
+
+    # Without the context (older FastAPI) it falls back to the route
+    fallback = {"route": scope["route"], "root_path": "/api"}
+    assert route_template(fallback) == "/api/things/{thing_id}"
+
+
+def test_pool_checkouts_stay_timed_after_dispose(tmp_path):
+    e = create_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    instrument_engine_pool(e)
+
+    def checkouts() -> int:
+        return sum(sum(entry[:-1]) for entry in DB_POOL_CHECKOUT.values().values())
+
+    before = checkouts()
+    with e.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    e.dispose()
+    with e.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    assert checkouts() == before + 2
+    e.dispose()
+
+
+def test_metrics_export_ttl_cache_stats():
+    now = [0.0]
+    cache = TTLCache("metrics_test", ttl_seconds=10, max_entries=1, clock=lambda: now[0])
+    cache.put("a", 1)
+    cache.put("b", 2)  # over capacity: "a" goes
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    now[0] = 11.0
+    assert cache.get("b") is None  # expired
+
+    body = TestClient(app).get("/metrics").text
+
+    assert 'cache_entries{cache="metrics_test"} 0' in body
+    assert 'cache_lookups_total{cache="metrics_test",result="hit"} 1' in body
+    assert 'cache_lookups_total{cache="metrics_test",result="miss"} 2' in body
+    assert 'cache_evictions_total{cache="metrics_test",reason="capacity"} 1' in body
+    assert 'cache_evictions_total{cache="metrics_test",reason="expired"} 1' in body
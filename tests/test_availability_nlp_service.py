@@ -1,7 +1,9 @@
 # tests/test_availability_nlp_service.py
 from datetime import datetime, timedelta, timezone
 
+from app.config import get_settings
 from app.schemas.constraints import HardConstraints
+from app.services.availability_grammar import CONFIDENT, UNSURE, parse_spoken_availability
 from app.services.availability_nlp_service import parse_availability_from_speech
 
 
@@ -23,3 +25,55 @@ def test_parse_availability_from_speech_uses_fallback_without_openai():
     # fallback puts "morning" at the first slot
     assert start == hc.window_start
     assert end == hc.window_start + timedelta(minutes=60)
+
+
+def test_grammar_parses_common_spoken_forms():
+    # Mon 6 Jan → Fri 17 Jan 2025, lead in New York (UTC-5)
+    hc = HardConstraints(
+        window_start=datetime(2025, 1, 6, 0, 0, tzinfo=timezone.utc),
+        window_end=datetime(2025, 1, 17, 23, 0, tzinfo=timezone.utc),
+        timezone="America/New_York",
+    )
+    now = datetime(2025, 1, 6, 14, 0, tzinfo=timezone.utc)  # Monday 09:00 local
+
+    def parse(text):
+        return parse_spoken_availability(text, hc, 30, now=now)
+
+    def utc(day, hour, minute=0):
+        return datetime(2025, 1, day, hour + 5, minute, tzinfo=timezone.utc)
+
+    result = parse("Tuesday after 2")
+    assert result.confidence == CONFIDENT
+    assert result.windows == [(utc(7, 14), utc(7, 18))]
+
+    assert parse("tomorrow morning").windows == [(utc(7, 8), utc(7, 12))]
+    assert parse("any time Thursday between 10 and 12").windows == [(utc(9, 10), utc(9, 12))]
+    assert parse("Monday at 3:30 pm or Wednesday afternoon").windows == [
+        (utc(6, 15, 30), utc(6, 16)),
+        (utc(8, 12), utc(8, 18)),
+    ]
+    # Plural days cover every matching day in the window
+    assert len(parse("Tuesdays before noon").windows) == 2
+
+    # Negations and unrecognised speech are left to the LLM
+    assert parse("I can't do Tuesday").confidence == UNSURE
+    assert parse("let me check with my assistant").windows == []
+
+    # Contrasts too: the time given is the one that doesn't work
+    for text in (
+        "I have a meeting at 2 but otherwise Tuesday is fine",
+        "Tuesday works except at 2",
+        "busy at 2 Tuesday",
+    ):
+        assert parse(text).confidence < get_settings().AVAILABILITY_GRAMMAR_MIN_CONFIDENCE
+
+    # A bare hour joined to another by "to" / "-" is a span
+    for text in ("friday 9 to 11", "friday 9-11"):
+        result = parse(text)
+        assert result.confidence == CONFIDENT
+        assert result.windows == [(utc(10, 9), utc(10, 11))]
+    assert parse("Friday 2 to 4").windows == [(utc(10, 14), utc(10, 16))]
+
+    # Counts of days / weeks are not hours; without a time it's only partial
+    for text in ("Tuesday in about 2 weeks", "Friday, after 3 days of travel"):
+        assert parse(text).confidence < get_settings().AVAILABILITY_GRAMMAR_MIN_CONFIDENCE
@@ -0,0 +1,180 @@
+# tests/test_call_analytics_service.py
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.db.session import SessionLocal, engine
+from app.models import Base, Call, CallEvent, CallTiming, CampaignCallStats, MeetingRequest
+from app.services.call_analytics_service import rollup_call_events
+
+client = TestClient(app)
+
+
+def _clean_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def _post_status(sid: str, status: str, ts: str, **extra):
+    resp = client.post(
+        "/twilio/status",
+        data={"CallSid": sid, "CallStatus": status, "Timestamp": ts, **extra},
+    )
+    assert resp.status_code == 200
+
+
+def _rollup() -> int:
+    db = SessionLocal()
+    try:
+        return rollup_call_events(db)
+    finally:
+        db.close()
+
+
+def test_status_webhook_logs_events_and_rollup_is_incremental():
+    _clean_db()
+    db = SessionLocal()
+    try:
+        mr = MeetingRequest(owner_id="am-1", title="Analytics", duration_minutes=30)
+        db.add(mr)
+        db.commit()
+        db.add_all(
+            [
+                Call(provider_call_id="CA_ANSWERED", meeting_request_id=mr.id),
+                Call(provider_call_id="CA_NO_ANSWER", meeting_request_id=mr.id),
+            ]
+        )
+        db.commit()
+        mr_id = mr.id
+    finally:
+        db.close()
+
+    _post_status("CA_ANSWERED", "initiated", "Wed, 01 Jan 2025 09:00:00 +0000")
+    _post_status("CA_ANSWERED", "ringing", "Wed, 01 Jan 2025 09:00:02 +0000")
+    _post_status("CA_ANSWERED", "in-progress", "Wed, 01 Jan 2025 09:00:10 +0000")
+    _post_status("CA_NO_ANSWER", "ringing", "Wed, 01 Jan 2025 09:01:00 +0000")
+
+    # The stats route only reads; nothing is folded until the rollup runs
+    assert client.get(f"/campaigns/{mr_id}/call-stats").json()["calls_total"] == 0
+
+    # First rollup sees the calls mid-flight
+    assert _rollup() == 4
+    resp = client.get(f"/campaigns/{mr_id}/call-stats")
+    assert resp.status_code == 200, resp.text
+    stats = resp.json()
+    assert stats["calls_total"] == 2
+    assert stats["calls_answered"] == 1
+    assert stats["calls_ended"] == 0
+
+    _post_status(
+        "CA_ANSWERED", "completed", "Wed, 01 Jan 2025 09:02:10 +0000", CallDuration="120"
+    )
+    _post_status("CA_NO_ANSWER", "no-answer", "Wed, 01 Jan 2025 09:01:30 +0000")
+
+    _rollup()
+    stats = client.get(f"/campaigns/{mr_id}/call-stats").json()
+    assert stats["calls_total"] == 2
+    assert stats["calls_answered"] == 1
+    assert stats["calls_ended"] == 2
+    assert stats["answer_rate"] == 0.5
+    assert stats["avg_talk_seconds"] == 120
+    # ring: 8s (answered) + 30s (no-answer) over 2 calls
+    assert stats["avg_ring_seconds"] == 19
+
+    db = SessionLocal()
+    try:
+        # Every callback is kept, in order, with its call resolved
+        events = db.query(CallEvent).order_by(CallEvent.id).all()
+        assert [e.status for e in events if e.provider_call_id == "CA_ANSWERED"] == [
+            "initiated",
+            "ringing",
+            "in-progress",
+            "completed",
+        ]
+        assert all(e.call_id is not None for e in events)
+
+        timing = (
+            db.query(CallTiming)
+            .join(Call, Call.id == CallTiming.call_id)
+            .filter(Call.provider_call_id == "CA_ANSWERED")
+            .one()
+        )
+        assert timing.ringing_at == datetime(2025, 1, 1, 9, 0, 2)
+        assert timing.answered_at == datetime(2025, 1, 1, 9, 0, 10)
+        assert timing.final_status == "completed"
+        assert timing.ring_seconds == 8
+        assert timing.talk_seconds == 120
+        assert timing.last_event_id == max(
+            e.id for e in events if e.provider_call_id == "CA_ANSWERED"
+        )
+
+        # Nothing new to fold in
+        assert rollup_call_events(db) == 0
+    finally:
+        db.close()
+
+
+def _seed_calls(*sids: str) -> int:
+    _clean_db()
+    db = SessionLocal()
+    try:
+        mr = MeetingRequest(owner_id="am-1", title="Rollup", duration_minutes=30)
+        db.add(mr)
+        db.commit()
+        db.add_all([Call(provider_call_id=sid, meeting_request_id=mr.id) for sid in sids])
+        db.commit()
+        return mr.id
+    finally:
+        db.close()
+
+
+def test_rollup_picks_up_events_committed_out_of_id_order():
+    mr_id = _seed_calls("CA_FAST", "CA_SLOW")
+    db = SessionLocal()
+    try:
+        fast, slow = (db.query(Call).filter_by(provider_call_id=sid).one() for sid in ("CA_FAST", "CA_SLOW"))
+        ts = datetime(2025, 1, 1, 9, 0)
+        db.add_all([
+            CallEvent(id=1, call_id=fast.id, provider_call_id="CA_FAST", status="ringing", ts=ts),
+            CallEvent(id=4, call_id=fast.id, provider_call_id="CA_FAST", status="in-progress", ts=ts),
+        ])
+        db.commit()
+        assert rollup_call_events(db) == 2
+
+        # id 2 was allocated earlier but its transaction committed last
+        db.add(CallEvent(id=2, call_id=slow.id, provider_call_id="CA_SLOW", status="ringing", ts=ts))
+        db.commit()
+        assert rollup_call_events(db) == 1
+        assert rollup_call_events(db) == 0
+
+        # Same for a late event of a call whose higher ids are already folded
+        db.add(CallEvent(
+            id=3, call_id=fast.id, provider_call_id="CA_FAST", status="initiated",
+            ts=datetime(2025, 1, 1, 8, 59, 50),
+        ))
+        db.commit()
+        assert rollup_call_events(db) == 1
+        assert rollup_call_events(db) == 0
+
+        assert db.get(CampaignCallStats, mr_id).calls_total == 2
+        timing = db.get(CallTiming, fast.id)
+        assert timing.started_at == datetime(2025, 1, 1, 8, 59, 50)
+    finally:
+        db.close()
+
+
+def test_concurrent_rollups_fold_each_event_once():
+    mr_id = _seed_calls(*(f"CA_CONC_{i}" for i in range(20)))
+    for i in range(20):
+        _post_status(f"CA_CONC_{i}", "ringing", "Wed, 01 Jan 2025 09:00:00 +0000")
+        _post_status(f"CA_CONC_{i}", "in-progress", "Wed, 01 Jan 2025 09:00:05 +0000")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        processed = list(pool.map(lambda _: _rollup(), range(4)))
+
+    assert sum(processed) == 40
+    stats = client.get(f"/campaigns/{mr_id}/call-stats").json()
+    assert stats["calls_total"] == 20
+    assert stats["calls_answered"] == 20
@@ -0,0 +1,126 @@
+# tests/test_call_context_cache.py
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.main import app
+from app.db.session import SessionLocal, engine, get_async_engine
+from app.models import Base, Lead, MeetingRequest, ParticipantAvailability
+from app.schemas.constraints import HardConstraints
+from app.services.call_context_cache import (
+    CallContext,
+    CallContextCache,
+    get_call_context_cache,
+)
+from app.services.call_service import initiate_outbound_call
+
+client = TestClient(app)
+
+
+class FakeTwilioClient:
+    def create_outbound_call(self, to_number: str) -> str:
+        return "CA_CTX_CACHE"
+
+
+def _ctx(call_id: int = 1) -> CallContext:
+    hc = HardConstraints(
+        window_start=datetime(2025, 1, 1, 9, 0, tzinfo=timezone.utc),
+        window_end=datetime(2025, 1, 1, 17, 0, tzinfo=timezone.utc),
+    )
+    return CallContext(
+        call_id=call_id,
+        lead_id=1,
+        meeting_request_id=1,
+        duration_minutes=30,
+        hard_constraints=hc,
+        timezone=hc.timezone,
+    )
+
+
+def test_cache_ttl_lru_and_evict():
+    now = [0.0]
+    cache = CallContextCache(ttl_seconds=10, max_entries=2, clock=lambda: now[0])
+
+    cache.put("CA_1", _ctx(1))
+    cache.put("CA_2", _ctx(2))
+    assert cache.get("CA_1").call_id == 1  # CA_1 is now most recent
+
+    cache.put("CA_3", _ctx(3))  # evicts least recently used (CA_2)
+    assert cache.get("CA_2") is None
+    assert cache.get("CA_3").call_id == 3
+
+    cache.evict("CA_3")
+    assert cache.get("CA_3") is None
+
+    now[0] = 11.0
+    assert cache.get("CA_1") is None  # expired
+
+
+def test_gather_uses_warm_context_without_reads_and_terminal_status_evicts():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    cache = get_call_context_cache()
+    cache.clear()
+
+    db = SessionLocal()
+    try:
+        lead = Lead(name="Ctx Lead", phone="+111111111", timezone="UTC")
+        hc = HardConstraints(
+            window_start=datetime(2025, 1, 1, 9, 0, tzinfo=timezone.utc),
+            window_end=datetime(2025, 1, 1, 17, 0, tzinfo=timezone.utc),
+            timezone="UTC",
+        )
+        mr = MeetingRequest(
+            owner_id="am-ctx",
+            title="Ctx",
+            duration_minutes=30,
+            hard_constraints=hc.model_dump(mode="json"),
+        )
+        db.add_all([lead, mr])
+        db.commit()
+
+        initiate_outbound_call(
+            db=db, lead=lead, twilio_client=FakeTwilioClient(), meeting_request=mr
+        )
+        lead_id, mr_id = lead.id, mr.id
+    finally:
+        db.close()
+
+    assert cache.get("CA_CTX_CACHE") is not None
+
+    selects: list[str] = []
+
+    def _track(conn, cursor, statement, params, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    # The gather webhook runs on the async engine
+    engines = (engine, get_async_engine().sync_engine)
+    for e in engines:
+        event.listen(e, "before_cursor_execute", _track)
+    try:
+        resp = client.post(
+            "/twilio/voice/gather", data={"CallSid": "CA_CTX_CACHE", "Digits": "2"}
+        )
+    finally:
+        for e in engines:
+            event.remove(e, "before_cursor_execute", _track)
+
+    assert resp.status_code == 200
+    assert "09:30" in resp.text
+    assert selects == []
+
+    db = SessionLocal()
+    try:
+        rows = db.query(ParticipantAvailability).filter_by(
+            meeting_request_id=mr_id, lead_id=lead_id
+        ).all()
+        assert len(rows) == 1
+        assert rows[0].start_time == datetime(2025, 1, 1, 9, 30)
+        assert rows[0].end_time - rows[0].start_time == timedelta(minutes=30)
+    finally:
+        db.close()
+
+    client.post("/twilio/status", data={"CallSid": "CA_CTX_CACHE", "CallStatus": "completed"})
+    assert cache.get("CA_CTX_CACHE") is None
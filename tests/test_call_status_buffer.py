@@ -0,0 +1,194 @@
+# tests/test_call_status_buffer.py
+import asyncio
+import logging
+
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.main import app
+from app.db.session import SessionLocal, engine
+from app.models import Base, Call
+from app.services import call_status_buffer
+from app.services.call_status_buffer import (
+    CallStatusBuffer,
+    StatusEvent,
+    get_call_status_buffer,
+)
+
+
+def _clean_db_with_calls(*sids: str):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        for sid in sids:
+            db.add(Call(provider_call_id=sid, status="initiated", direction="outbound"))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _status_of(sid: str) -> str:
+    db = SessionLocal()
+    try:
+        return db.query(Call).filter_by(provider_call_id=sid).one().status
+    finally:
+        db.close()
+
+
+def test_buffer_coalesces_by_precedence_and_guards_stored_status():
+    _clean_db_with_calls("CA_BUF_1", "CA_BUF_2")
+
+    async def scenario():
+        # Long interval so only explicit flushes write
+        buffer = CallStatusBuffer(SessionLocal, flush_interval_ms=60_000, max_batch=100)
+        await buffer.start()
+
+        assert buffer.submit(StatusEvent("CA_BUF_1", "ringing"))
+        assert buffer.submit(StatusEvent("CA_BUF_1", "completed"))
+        assert buffer.submit(StatusEvent("CA_BUF_1", "ringing"))  # late, out of order
+        assert buffer.submit(
+            StatusEvent("CA_BUF_2", "failed", error_code="13224", error_message="bad")
+        )
+        assert buffer.pending_count == 2
+
+        assert await buffer.flush() == 2
+        assert _status_of("CA_BUF_1") == "completed"
+        assert _status_of("CA_BUF_2") == "failed"
+
+        # A stale event in a later flush must not regress the stored status
+        buffer.submit(StatusEvent("CA_BUF_1", "in-progress"))
+        await buffer.stop()
+
+        snap = buffer.snapshot()
+        assert snap["events_received"] == 5
+        assert snap["events_coalesced"] == 2
+        assert snap["flushes"] == 2
+        assert snap["max_flush_size"] == 2
+        assert snap["pending"] == 0
+
+    asyncio.run(scenario())
+
+    assert _status_of("CA_BUF_1") == "completed"
+    db = SessionLocal()
+    try:
+        call = db.query(Call).filter_by(provider_call_id="CA_BUF_2").one()
+        assert call.error_code == "13224"
+        assert call.error_message == "bad"
+    finally:
+        db.close()
+
+
+def test_buffer_rejects_when_full():
+    async def scenario():
+        buffer = CallStatusBuffer(
+            SessionLocal, flush_interval_ms=60_000, max_batch=2, max_pending=2
+        )
+        assert not buffer.submit(StatusEvent("CA_X", "ringing"))  # not started
+
+        await buffer.start()
+        # No awaits below, so the background loop can't drain in between
+        assert buffer.submit(StatusEvent("CA_A", "ringing"))
+        assert buffer.submit(StatusEvent("CA_B", "ringing"))
+        assert not buffer.submit(StatusEvent("CA_C", "ringing"))
+        # Updates for calls already pending are always accepted
+        assert buffer.submit(StatusEvent("CA_A", "completed"))
+        assert buffer.snapshot()["events_rejected"] == 1
+        await buffer.stop()
+
+    _clean_db_with_calls()
+    asyncio.run(scenario())
+
+
+def test_status_webhook_is_buffered_and_drained_on_shutdown():
+    _clean_db_with_calls("CA_BUF_LIFESPAN")
+
+    with TestClient(app) as lifespan_client:
+        buffer = get_call_status_buffer()
+        assert buffer is not None and buffer.running
+
+        for status in ("ringing", "in-progress", "completed"):
+            resp = lifespan_client.post(
+                "/twilio/status",
+                data={"CallSid": "CA_BUF_LIFESPAN", "CallStatus": status},
+            )
+            assert resp.status_code == 200
+            assert "<Response" in resp.text
+
+        health = lifespan_client.get("/health").json()["call_status_buffer"]
+        assert health["events_received"] == 3
+        metrics = lifespan_client.get("/metrics").text
+        assert 'call_status_buffer_events_total{outcome="received"} 3' in metrics
+        assert "# TYPE call_status_buffer_pending gauge" in metrics
+
+    # Leaving the context runs the lifespan shutdown, which drains the buffer
+    assert get_call_status_buffer() is None
+    assert _status_of("CA_BUF_LIFESPAN") == "completed"
+
+
+def _failing_writes(monkeypatch, error_for):
+    write = call_status_buffer.write_status_events
+
+    def flaky_write(db, events, raw_events=None):
+        for e in events:
+            error = error_for(e.provider_call_id)
+            if error is not None:
+                raise error
+        write(db, events, raw_events)
+
+    monkeypatch.setattr(call_status_buffer, "write_status_events", flaky_write)
+
+
+def test_poison_row_is_dropped_after_max_attempts(monkeypatch):
+    _clean_db_with_calls("CA_OK", "CA_POISON")
+    _failing_writes(
+        monkeypatch,
+        lambda sid: IntegrityError("UPDATE calls", {}, Exception("check failed"))
+        if sid == "CA_POISON" else None,
+    )
+
+    async def scenario():
+        buffer = CallStatusBuffer(
+            SessionLocal, flush_interval_ms=60_000, max_batch=100, max_flush_attempts=2
+        )
+        await buffer.start()
+        buffer.submit(StatusEvent("CA_OK", "completed"))
+        buffer.submit(StatusEvent("CA_POISON", "completed"))
+
+        assert await buffer.flush() == 0
+        assert await buffer.flush() == 0
+        assert buffer.pending_count == 2
+        # Third flush goes call by call: the good row lands, the bad one is dropped
+        assert await buffer.flush() == 1
+        assert buffer.pending_count == 0
+        await buffer.stop()
+        return buffer.snapshot()
+
+    snap = asyncio.run(scenario())
+    assert _status_of("CA_OK") == "completed"
+    assert _status_of("CA_POISON") == "initiated"
+    assert snap["events_dropped"] == 1
+    assert snap["flush_errors"] == 2
+
+
+def test_stop_logs_events_it_cannot_write(monkeypatch, caplog):
+    _clean_db_with_calls("CA_DB_DOWN")
+    _failing_writes(
+        monkeypatch, lambda sid: OperationalError("UPDATE calls", {}, Exception("db down"))
+    )
+
+    async def scenario():
+        buffer = CallStatusBuffer(SessionLocal, flush_interval_ms=60_000, max_batch=100)
+        await buffer.start()
+        buffer.submit(StatusEvent("CA_DB_DOWN", "ringing"))
+        buffer.submit(StatusEvent("CA_DB_DOWN", "completed"))
+        await buffer.stop()
+        return buffer.snapshot()
+
+    with caplog.at_level(logging.ERROR, logger=call_status_buffer.__name__):
+        snap = asyncio.run(scenario())
+
+    # An outage is retried rather than dropped row by row, until shutdown
+    assert "Dropping 1 call status updates (2 callbacks)" in caplog.text
+    assert snap["events_dropped"] == 2
+    assert snap["pending"] == 0
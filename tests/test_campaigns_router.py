@@ -1,4 +1,5 @@
 # tests/test_campaigns_router.py
+import asyncio
 from datetime import datetime, timedelta, timezone
 
 from fastapi.testclient import TestClient
@@ -6,6 +7,8 @@ from fastapi.testclient import TestClient
 from app.main import app
 from app.db.session import engine, SessionLocal
 from app.models import Base, Lead, Call, MeetingRequest
+from app.services import call_script_service, lead_import_service, script_service
+from app.services.call_script_cache import get_call_script_cache
 from app.services.twilio_client import get_twilio_client
 
 
@@ -73,3 +76,193 @@ def test_campaign_simple_creates_meeting_request_leads_calls():
             assert c.meeting_request_id == mr.id
     finally:
         db.close()
+
+
+def test_campaign_pregenerates_scripts_for_voice_answer(monkeypatch):
+    _clean_db()
+    get_call_script_cache().clear()
+
+    now = datetime(2025, 1, 1, 9, 0, tzinfo=timezone.utc)
+    resp = client.post(
+        "/campaigns/simple",
+        json={
+            "owner_id": "am-script",
+            "title": "Quarterly review",
+            "duration_minutes": 30,
+            "window_start": now.isoformat(),
+            "window_end": (now + timedelta(hours=2)).isoformat(),
+            "leads": [{"name": "Dana", "phone": "+13333333333", "company": "Acme"}],
+        },
+    )
+    assert resp.status_code == 200, resp.text
+
+    # Answering must not generate anything
+    def fail(*args, **kwargs):
+        raise AssertionError("script generated on the answer path")
+
+    monkeypatch.setattr(script_service, "generate_call_script", fail)
+    monkeypatch.setattr(call_script_service, "generate_call_script", fail)
+
+    answer = client.post("/twilio/voice", data={"CallSid": "CA_FAKE_3333"})
+    assert answer.status_code == 200
+    assert "Hi Dana" in answer.text
+    assert "Acme" in answer.text
+    assert "Quarterly review" in answer.text
+    assert get_call_script_cache().hits == 1
+
+
+def _create_meeting_request() -> int:
+    now = datetime(2025, 1, 1, 9, 0, tzinfo=timezone.utc)
+    resp = client.post(
+        "/meeting-requests/simple",
+        json={
+            "owner_id": "am-import",
+            "title": "Import campaign",
+            "duration_minutes": 30,
+            "window_start": now.isoformat(),
+            "window_end": (now + timedelta(hours=1)).isoformat(),
+        },
+    )
+    assert resp.status_code == 200, resp.text
+    return resp.json()["meeting_request"]["id"]
+
+
+def test_import_leads_csv_reports_bad_rows_without_aborting():
+    _clean_db()
+    mr_id = _create_meeting_request()
+
+    body = (
+        "name,phone,email,company,timezone\r\n"
+        "Lead A,+11111111111,a@example.com,ACo,Asia/Jerusalem\r\n"
+        "Lead B,,b@example.com,,\r\n"  # missing phone -> row error
+        '"Lead, C",+33333333333,,"Multi\nline Co",\r\n'
+        "Lead A again,+11111111111,,,\r\n"
+    )
+
+    resp = client.post(
+        f"/campaigns/{mr_id}/leads:import",
+        content=body.encode("utf-8"),
+        headers={"Content-Type": "text/csv"},
+    )
+    assert resp.status_code == 200, resp.text
+
+    data = resp.json()
+    assert data["rows_received"] == 4
+    # "Lead A again" reuses Lead A's phone: 2 distinct leads
+    assert data["rows_imported"] == 2
+    assert data["rows_failed"] == 1
+    assert data["errors"][0]["row"] == 2
+    assert "phone" in data["errors"][0]["error"]
+    assert data["errors_truncated"] is False
+
+    db = SessionLocal()
+    try:
+        leads = {lead.phone: lead for lead in db.query(Lead).all()}
+        assert set(leads) == {"+11111111111", "+33333333333"}
+        assert leads["+11111111111"].name == "Lead A"
+        assert leads["+33333333333"].name == "Lead, C"
+        assert leads["+33333333333"].company == "Multi\nline Co"
+        assert leads["+33333333333"].email is None
+    finally:
+        db.close()
+
+
+def test_import_leads_csv_stray_quote_costs_one_row(monkeypatch):
+    _clean_db()
+    mr_id = _create_meeting_request()
+    monkeypatch.setattr(lead_import_service, "MAX_RECORD_LINES", 3)
+
+    rows = [f"Lead {i},+1000000000{i},,,\r\n" for i in range(6)]
+    rows[1] = 'Lead "1,+10000000001,,,\r\n'  # quote never closed
+    body = "name,phone,email,company,timezone\r\n" + "".join(rows)
+
+    resp = client.post(
+        f"/campaigns/{mr_id}/leads:import",
+        content=body.encode("utf-8"),
+        headers={"Content-Type": "text/csv"},
+    )
+    assert resp.status_code == 200, resp.text
+
+    data = resp.json()
+    assert data["rows_received"] == 6
+    assert data["rows_imported"] == 5
+    assert data["errors"] == [{"row": 2, "error": "unterminated quoted field"}]
+
+
+def test_import_leads_overlong_lines_cost_one_row(monkeypatch):
+    _clean_db()
+    mr_id = _create_meeting_request()
+    monkeypatch.setattr(lead_import_service, "MAX_RECORD_CHARS", 100)
+
+    csv_body = (
+        "name,phone,email,company,timezone\r\n"
+        "Lead A,+11111111111,,,\r\n"
+        + "x" * 1000 + "\r\n"
+        + "Lead B,+22222222222,,,\r\n"
+    )
+    ndjson_body = (
+        '{"name": "Lead C", "phone": "+33333333333"}\n'
+        + '{"name": "' + "x" * 1000 + '"}\n'
+        + '{"name": "Lead D", "phone": "+44444444444"}'
+    )
+    for content_type, body in (("text/csv", csv_body), ("application/x-ndjson", ndjson_body)):
+        resp = client.post(
+            f"/campaigns/{mr_id}/leads:import",
+            content=body.encode("utf-8"),
+            headers={"Content-Type": content_type},
+        )
+        assert resp.status_code == 200, resp.text
+        data = resp.json()
+        assert data["rows_received"] == 3
+        assert data["rows_imported"] == 2
+        assert data["errors"] == [{"row": 2, "error": "line longer than 100 characters"}]
+
+    # Streamed in small chunks, an unterminated overlong tail is never held whole
+    async def chunks():
+        yield b"ok\n"
+        for _ in range(50):
+            yield b"y" * 40
+
+    async def collect():
+        return [line async for line in lead_import_service.iter_text_lines(chunks())]
+
+    lines = asyncio.run(collect())
+    assert lines[0] == "ok"
+    assert [str(e) for e in lines[1:]] == ["line longer than 100 characters"]
+
+
+def test_import_leads_ndjson_and_unknown_meeting_request():
+    _clean_db()
+    mr_id = _create_meeting_request()
+
+    body = (
+        '{"name": "Lead A", "phone": "+11111111111"}\n'
+        "not json\n"
+        "\n"
+        '{"name": "Lead B", "phone": "+22222222222", "timezone": "Europe/London"}'
+    )
+
+    resp = client.post(
+        f"/campaigns/{mr_id}/leads:import",
+        content=body.encode("utf-8"),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["rows_received"] == 3
+    assert data["rows_imported"] == 2
+    assert [e["row"] for e in data["errors"]] == [2]
+
+    resp404 = client.post(
+        "/campaigns/999999/leads:import",
+        content=body.encode("utf-8"),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert resp404.status_code == 404
+
+    resp415 = client.post(
+        f"/campaigns/{mr_id}/leads:import",
+        content=b"{}",
+        headers={"Content-Type": "application/json"},
+    )
+    assert resp415.status_code == 415
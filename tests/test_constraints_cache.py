@@ -0,0 +1,135 @@
+# tests/test_constraints_cache.py
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import constraints_nlp_service as nlp
+from app.services.constraints_cache import (
+    ConstraintsCache,
+    constraints_cache_key,
+    set_constraints_cache,
+)
+
+
+class _FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        # The model answers relative to the `now` in the prompt
+        now_line = next(
+            line for line in kwargs["messages"][1]["content"].splitlines()
+            if line.startswith("Now (UTC): ")
+        )
+        now = datetime.fromisoformat(now_line[len("Now (UTC): "):])
+        content = json.dumps(
+            {
+                "hard_constraints": {
+                    "window_start": now.isoformat(),
+                    "window_end": (now + timedelta(days=14)).isoformat(),
+                    "timezone": "Asia/Jerusalem",
+                },
+                "soft_constraints": {
+                    "preferred_days_of_week": ["TUE", "WED", "THU"],
+                    "preferred_time_of_day": ["MORNING"],
+                },
+            }
+        )
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+        )
+
+
+def test_repeated_phrasing_hits_cache_and_reanchors(monkeypatch, tmp_path):
+    completions = _FakeCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(nlp, "get_openai_client", lambda: client)
+
+    path = str(tmp_path / "constraints.sqlite3")
+    set_constraints_cache(ConstraintsCache(path=path))
+    try:
+        morning = datetime(2025, 1, 1, 9, 0, tzinfo=timezone.utc)
+        afternoon = datetime(2025, 1, 1, 15, 30, tzinfo=timezone.utc)
+
+        first = nlp.parse_natural_language_constraints(
+            "Next two weeks, Tue–Thu mornings", morning, "Asia/Jerusalem"
+        )
+        # Same phrasing modulo case/whitespace/dash, later the same day
+        second = nlp.parse_natural_language_constraints(
+            "  next two weeks,   tue-thu MORNINGS ", afternoon, "Asia/Jerusalem"
+        )
+        assert completions.calls == 1
+        assert second.hard_constraints.window_start == afternoon
+        assert second.hard_constraints.window_end == afternoon + timedelta(days=14)
+        assert second.soft_constraints == first.soft_constraints
+
+        # A fresh process (empty memory tier) still hits the SQLite tier
+        fresh = ConstraintsCache(path=path)
+        set_constraints_cache(fresh)
+        nlp.parse_natural_language_constraints(
+            "Next two weeks, Tue–Thu mornings", afternoon, "Asia/Jerusalem"
+        )
+        assert completions.calls == 1
+        assert fresh.disk_hits == 1
+
+        # A different timezone or day is a different question
+        nlp.parse_natural_language_constraints(
+            "Next two weeks, Tue–Thu mornings", afternoon, "UTC"
+        )
+        nlp.parse_natural_language_constraints(
+            "Next two weeks, Tue–Thu mornings",
+            morning + timedelta(days=1),
+            "Asia/Jerusalem",
+        )
+        assert completions.calls == 3
+    finally:
+        set_constraints_cache(None)
+
+
+def test_expired_entries_are_not_served(tmp_path):
+    now_ts = [1000.0]
+    cache = ConstraintsCache(
+        path=str(tmp_path / "c.sqlite3"), ttl_seconds=60, clock=lambda: now_ts[0]
+    )
+    now = datetime(2025, 1, 1, 9, 0, tzinfo=timezone.utc)
+    parsed = nlp._heuristic_parse("next two weeks", now, "UTC")
+    cache.put("k", parsed, now)
+    assert cache.get("k", now) == parsed
+
+    now_ts[0] += 61
+    assert cache.get("k", now) is None
+    assert cache.purge_expired() == 1
+
+
+def test_key_buckets_on_the_leads_local_date():
+    def key(now, tz="America/New_York"):
+        return constraints_cache_key("tomorrow morning", tz, "m", "v1", now)
+
+    # 23:30 and 00:30 New York time: same UTC date, different local days
+    late = datetime(2025, 1, 7, 4, 30, tzinfo=timezone.utc)
+    after_midnight = datetime(2025, 1, 7, 5, 30, tzinfo=timezone.utc)
+    assert key(late) != key(after_midnight)
+    # 19:00 and 23:30 New York time: different UTC dates, same local day
+    assert key(datetime(2025, 1, 7, 0, 0, tzinfo=timezone.utc)) == key(late)
+    # Unknown zones bucket on UTC rather than failing
+    assert key(late, "Not/AZone") == key(after_midnight, "Not/AZone")
+
+
+def test_close_releases_disk_connections_and_reopens_on_use(tmp_path):
+    cache = ConstraintsCache(path=str(tmp_path / "c.sqlite3"))
+    now = datetime(2025, 1, 1, 9, 0, tzinfo=timezone.utc)
+    parsed = nlp._heuristic_parse("next two weeks", now, "UTC")
+    cache.put("k", parsed, now)
+    conn = cache._connect()
+
+    cache.close()
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    cache.clear()  # memory tier only: the next get reads the disk again
+    assert cache.get("k", now) == parsed
+    cache.close()
@@ -4,6 +4,7 @@ from datetime import datetime, timedelta, timezone
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.services.constraints_nlp_service import MAX_WINDOW_DAYS, _scan_instruction
 
 client = TestClient(app)
 
@@ -38,3 +39,46 @@ def test_constraints_parse_next_two_weeks_tue_thu_mornings():
     # Soft constraints
     assert set(sc["preferred_days_of_week"]) == {"TUE", "WED", "THU"}
     assert sc["preferred_time_of_day"] == ["MORNING"]
+
+
+def test_heuristic_parser_words_and_relative_windows():
+    # Wednesday
+    fixed_now = datetime(2025, 1, 1, 10, 0, 0, tzinfo=timezone.utc)
+
+    def parse(instruction):
+        resp = client.post(
+            "/constraints/parse",
+            json={"instruction": instruction, "timezone": "UTC", "now": fixed_now.isoformat()},
+        )
+        assert resp.status_code == 200, resp.text
+        return resp.json()
+
+    # "month" is not Monday, "saturday" is not Tuesday
+    data = parse("Sometime this month, ideally a Saturday afternoon")
+    assert data["soft_constraints"]["preferred_days_of_week"] == ["SAT"]
+    assert data["soft_constraints"]["preferred_time_of_day"] == ["AFTERNOON"]
+
+    data = parse("Within 10 days, Mondays or Fri evenings")
+    assert set(data["soft_constraints"]["preferred_days_of_week"]) == {"MON", "FRI"}
+    assert data["soft_constraints"]["preferred_time_of_day"] == ["EVENING"]
+    assert datetime.fromisoformat(data["hard_constraints"]["window_end"]) == (
+        fixed_now + timedelta(days=10)
+    )
+
+    # Absurd counts are capped instead of overflowing the datetime
+    data = parse("within 3000000 days")
+    assert datetime.fromisoformat(data["hard_constraints"]["window_end"]) == (
+        fixed_now + timedelta(days=MAX_WINDOW_DAYS)
+    )
+
+    # "this Friday": through the end of Friday Jan 3rd
+    data = parse("Can we do this Friday?")
+    assert data["soft_constraints"]["preferred_days_of_week"] == ["FRI"]
+    assert datetime.fromisoformat(data["hard_constraints"]["window_end"]) == datetime(
+        2025, 1, 4, tzinfo=timezone.utc
+    )
+
+
+def test_heuristic_parser_evening_words():
+    for text in ("fri evenings", "ideally in the evening", "can we talk tonight", "late night is best"):
+        assert _scan_instruction(text).preferred_time_of_day == ["EVENING"], text
@@ -2,7 +2,8 @@
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.db.session import engine, SessionLocal
+from app.config import Settings
+from app.db.session import build_engine, engine, engine_options, SessionLocal
 from app.models import Base, Lead
 
 
@@ -45,3 +46,19 @@ def test_create_and_read_lead():
         assert fetched.name == "Test Lead"
     finally:
         db.close()
+
+
+def test_sqlite_connections_use_wal_and_pool_settings(tmp_path):
+    s = Settings(SQLITE_BUSY_TIMEOUT_MS=1234, DB_POOL_SIZE=3, DB_MAX_OVERFLOW=1)
+    file_engine = build_engine(f"sqlite:///{tmp_path / 'wal.db'}", s)
+    try:
+        with file_engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+        assert file_engine.pool.size() == 3
+    finally:
+        file_engine.dispose()
+
+    # In-memory SQLite keeps its single-connection pool
+    assert "pool_size" not in engine_options("sqlite:///:memory:", s)
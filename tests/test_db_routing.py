@@ -0,0 +1,114 @@
+# tests/test_db_routing.py
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.db import routing
+from app.db.routing import ReadAfterWriteMiddleware, RoutingSession, mark_request_writes
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.models import Base, Lead, MeetingRequest
+
+
+def _engine(path) -> Engine:
+    e = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.drop_all(bind=e)
+    Base.metadata.create_all(bind=e)
+    return e
+
+
+def _seed_lead(e: Engine, name: str) -> None:
+    with Session(e) as db:
+        db.add(Lead(name=name, phone="+1", email=f"{name}@example.com", company="C", timezone="UTC"))
+        db.commit()
+
+
+def _lead_names(db) -> list:
+    return sorted(name for (name,) in db.query(Lead.name).all())
+
+
+def test_reads_go_to_replica_until_the_session_writes(tmp_path):
+    primary, replica = _engine(tmp_path / "primary.db"), _engine(tmp_path / "replica.db")
+    _seed_lead(primary, "primary")
+    _seed_lead(replica, "replica")
+
+    db = RoutingSession(primary=primary, replica=replica, autoflush=False)
+    try:
+        assert _lead_names(db) == ["replica"]
+
+        db.add(Lead(name="new", phone="+2", email="new@example.com", company="N", timezone="UTC"))
+        db.commit()
+
+        # The write went to the primary, and this session now reads it back there
+        assert _lead_names(db) == ["new", "primary"]
+    finally:
+        db.close()
+    with replica.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM leads")).scalar() == 1
+
+
+def test_write_elsewhere_in_request_pins_reads_to_primary(tmp_path):
+    primary, replica = _engine(tmp_path / "primary.db"), _engine(tmp_path / "replica.db")
+    mark_request_writes(primary)
+    _seed_lead(replica, "replica")
+    seen = {}
+
+    async def endpoint(scope, receive, send):
+        db = RoutingSession(primary=primary, replica=replica)
+        try:
+            seen["before"] = _lead_names(db)
+            # A write through another session / connection of the same request
+            _seed_lead(primary, "primary")
+            seen["after"] = _lead_names(db)
+        finally:
+            db.close()
+
+    asyncio.run(ReadAfterWriteMiddleware(endpoint)({"type": "http"}, None, None))
+
+    assert seen == {"before": ["replica"], "after": ["primary"]}
+    assert routing.request_has_written() is False
+
+
+@pytest.fixture
+def replica_settings(tmp_path, monkeypatch):
+    replica = _engine(tmp_path / "replica.db")
+    monkeypatch.setattr(get_settings(), "DATABASE_REPLICA_URL", str(replica.url))
+    yield replica
+    asyncio.run(routing.dispose_replica_engines())
+    replica.dispose()
+
+
+def _seed_meeting_request() -> int:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        mr = MeetingRequest(owner_id="am-1", title="Routing", duration_minutes=30)
+        db.add(mr)
+        db.commit()
+        return mr.id
+    finally:
+        db.close()
+
+
+def test_read_route_uses_replica_when_configured(replica_settings):
+    mr_id = _seed_meeting_request()
+    client = TestClient(app)
+
+    # Not replicated yet: the read-only routes only see the (empty) replica
+    assert client.get(f"/meeting-requests/{mr_id}").status_code == 404
+    assert client.get(f"/meeting-requests/{mr_id}/suggested-slot").status_code == 404
+
+
+def test_read_route_falls_back_to_primary_without_replica():
+    mr_id = _seed_meeting_request()
+    assert routing.get_read_sessionmaker() is SessionLocal
+
+    resp = TestClient(app).get(f"/meeting-requests/{mr_id}")
+
+    assert resp.status_code == 200
@@ -0,0 +1,71 @@
+# tests/test_json_response.py
+import json
+from datetime import datetime, timedelta, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.participant_availability import AvailabilityState
+from app.schemas.meeting_requests import MeetingRequestWithSlots
+from app.services import json_response
+from app.services.json_response import FastJSONResponse, dumps
+
+
+def _listing():
+    start = datetime(2025, 1, 1, 9, 0, 0, 1234)
+    return {
+        "meeting_request_id": 1,
+        "availabilities": [
+            {
+                "id": i,
+                "start_time": start + timedelta(minutes=30 * i),
+                "end_time": (start + timedelta(minutes=30 * (i + 1))).replace(tzinfo=timezone.utc),
+                "state": AvailabilityState.CANDIDATE,
+                "score": None,
+            }
+            for i in range(3)
+        ],
+    }
+
+
+def test_dumps_matches_jsonable_encoder(monkeypatch):
+    expected = jsonable_encoder(_listing())
+
+    assert json.loads(dumps(_listing())) == expected
+
+    # stdlib fallback when orjson isn't installed
+    monkeypatch.setattr(json_response, "orjson", None)
+    assert json.loads(dumps(_listing())) == expected
+
+
+def test_pydantic_content_is_dumped_directly():
+    body = FastJSONResponse(MeetingRequestWithSlots.model_validate({
+        "meeting_request": {
+            "id": 1, "owner_id": "am", "title": "t", "duration_minutes": 30,
+            "max_bookings": 0, "status": "ACTIVE",
+        },
+        "slots": [],
+    })).body
+
+    assert json.loads(body)["meeting_request"]["hard_constraints"] is None
+
+
+def test_meeting_request_routes_match_documented_shape():
+    client = TestClient(app)
+    resp = client.post("/meeting-requests/simple", json={
+        "owner_id": "am-json",
+        "title": "JSON",
+        "duration_minutes": 30,
+        "window_start": "2025-01-01T09:00:00",
+        "window_end": "2025-01-01T10:00:00",
+    })
+    assert resp.status_code == 200
+    assert resp.json()["slots"][0]["start_time"] == "2025-01-01T09:00:00"
+
+    mr_id = resp.json()["meeting_request"]["id"]
+    fetched = client.get(f"/meeting-requests/{mr_id}").json()
+    assert MeetingRequestWithSlots.model_validate(fetched).slots[1].start_time == datetime(2025, 1, 1, 9, 30)
+
+    schema = app.openapi()["paths"]["/meeting-requests/{meeting_request_id}"]["get"]
+    assert "MeetingRequestWithSlots" in json.dumps(schema)
@@ -0,0 +1,53 @@
+# tests/test_lead_service.py
+from app.db.session import engine, SessionLocal
+from app.models import Base, Lead
+from app.services.lead_service import bulk_upsert_leads
+
+
+def _clean_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def test_bulk_upsert_leads_dedupes_and_reuses_existing():
+    _clean_db()
+    db = SessionLocal()
+    try:
+        existing = Lead(name="Existing", phone="+111111111", timezone="Asia/Jerusalem")
+        db.add(existing)
+        db.commit()
+        db.refresh(existing)
+        existing_id = existing.id
+
+        rows = [
+            {"name": "Existing renamed", "phone": "+111111111"},
+            {"name": "New A", "phone": "+222222222", "email": "a@example.com"},
+            {"name": "New A duplicate", "phone": "+222222222"},
+            {"name": "New B", "phone": "+333333333", "timezone": "Europe/London"},
+        ]
+
+        # Tiny chunk size so the chunking path is exercised
+        by_phone = bulk_upsert_leads(db, rows, chunk_size=2)
+
+        assert set(by_phone) == {"+111111111", "+222222222", "+333333333"}
+
+        # Existing lead is reused untouched
+        assert by_phone["+111111111"].id == existing_id
+        assert by_phone["+111111111"].name == "Existing"
+
+        # First occurrence wins for duplicates; timezone defaults to UTC
+        assert by_phone["+222222222"].name == "New A"
+        assert by_phone["+222222222"].email == "a@example.com"
+        assert by_phone["+222222222"].timezone == "UTC"
+        assert by_phone["+333333333"].timezone == "Europe/London"
+
+        assert db.query(Lead).count() == 3
+
+        # Running again is a no-op
+        again = bulk_upsert_leads(db, rows)
+        assert {p: l.id for p, l in again.items()} == {
+            p: l.id for p, l in by_phone.items()
+        }
+        assert db.query(Lead).count() == 3
+    finally:
+        db.close()
@@ -0,0 +1,132 @@
+# tests/test_llm_batcher.py
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app.schemas.constraints import HardConstraints
+from app.services.availability_nlp_service import llm_windows_from_transcript_async
+from app.services.llm_batcher import (
+    TranscriptBatcher,
+    TranscriptItem,
+    set_transcript_batcher,
+)
+
+
+class StubLLM:
+    """
+    Answers a batch prompt by echoing each item's window start as a slot
+    of `duration_minutes`; transcripts containing "skip" are left out.
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.requests = []
+        self.delay = delay
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        await asyncio.sleep(self.delay)
+        content = kwargs["messages"][1]["content"]
+        items = json.loads(content.split("Items:\n", 1)[1].split("\n\n", 1)[0])
+        self.requests.append(items)
+        results = []
+        for item in items:
+            if "skip" in item["transcript"]:
+                continue
+            start = datetime.fromisoformat(item["window_start"])
+            end = start + timedelta(minutes=item["duration_minutes"])
+            results.append(
+                {"id": item["id"], "slots": [{"start": start.isoformat(), "end": end.isoformat()}]}
+            )
+        message = SimpleNamespace(content=json.dumps({"results": results}))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _hc(hour: int) -> HardConstraints:
+    return HardConstraints(
+        window_start=datetime(2025, 1, 1, hour, 0, tzinfo=timezone.utc),
+        window_end=datetime(2025, 1, 1, 17, 0, tzinfo=timezone.utc),
+        timezone="UTC",
+    )
+
+
+def test_concurrent_parses_share_one_request_and_demultiplex():
+    stub = StubLLM()
+
+    async def scenario():
+        batcher = TranscriptBatcher(max_wait_ms=50, max_batch=16, client_getter=lambda: stub)
+        await batcher.start()
+        set_transcript_batcher(batcher)
+        try:
+            return await asyncio.gather(
+                *(
+                    llm_windows_from_transcript_async(
+                        "skip me" if hour == 12 else f"caller {hour}", _hc(hour), 30
+                    )
+                    for hour in (9, 10, 11, 12)
+                )
+            ), batcher.snapshot()
+        finally:
+            set_transcript_batcher(None)
+            await batcher.stop()
+
+    results, snapshot = asyncio.run(scenario())
+
+    assert len(stub.requests) == 1
+    assert len(stub.requests[0]) == 4
+    for hour, windows in zip((9, 10, 11), results):
+        start = datetime(2025, 1, 1, hour, 0, tzinfo=timezone.utc)
+        assert windows == [(start, start + timedelta(minutes=30))]
+    # Left out of the model's answer → caller falls back on its own
+    assert results[3] is None
+    assert snapshot["items_missing"] == 1
+    assert snapshot["batches_sent"] == 1
+
+
+def test_full_queue_rejects_immediately():
+    stub = StubLLM(delay=0.2)
+    item = TranscriptItem("any", "2025-01-01T09:00:00+00:00", "2025-01-01T17:00:00+00:00", "UTC", 30)
+
+    async def scenario():
+        batcher = TranscriptBatcher(
+            max_wait_ms=10, max_batch=1, max_queue=1, max_concurrency=1, client_getter=lambda: stub
+        )
+        await batcher.start()
+        try:
+            # One batch in flight, one queued behind it: the third is refused
+            first = asyncio.ensure_future(batcher.parse(item))
+            await asyncio.sleep(0.05)
+            second = asyncio.ensure_future(batcher.parse(item))
+            await asyncio.sleep(0)
+            started = asyncio.get_running_loop().time()
+            third = await batcher.parse(item)
+            rejected_after = asyncio.get_running_loop().time() - started
+            return await first, await second, third, rejected_after, batcher.snapshot()
+        finally:
+            await batcher.stop()
+
+    first, second, third, rejected_after, snapshot = asyncio.run(scenario())
+    assert first and second
+    assert third is None
+    assert rejected_after < 0.05
+    assert snapshot["items_rejected"] == 1
+
+
+def test_cancelled_batch_resolves_its_callers():
+    stub = StubLLM(delay=10)
+    item = TranscriptItem("any", "2025-01-01T09:00:00+00:00", "2025-01-01T17:00:00+00:00", "UTC", 30)
+
+    async def scenario():
+        batcher = TranscriptBatcher(max_wait_ms=10, max_batch=4, client_getter=lambda: stub)
+        await batcher.start()
+        try:
+            parses = [asyncio.ensure_future(batcher.parse(item)) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            # e.g. the loop tearing down while the request is in flight
+            for task in list(batcher._in_flight):
+                task.cancel()
+            return await asyncio.wait_for(asyncio.gather(*parses), timeout=1)
+        finally:
+            await batcher.stop()
+
+    assert asyncio.run(scenario()) == [None, None]
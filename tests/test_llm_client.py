@@ -0,0 +1,67 @@
+# tests/test_llm_client.py
+import asyncio
+import threading
+import time
+
+from app.config import get_settings
+from app.services import llm_client
+
+
+def test_clients_are_shared_and_configured(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    settings = get_settings()
+    monkeypatch.setattr(settings, "openai_api_key", None)
+    asyncio.run(llm_client.close_llm_clients())
+
+    # No key: callers get None and use their fallbacks
+    assert llm_client.get_openai_client() is None
+
+    monkeypatch.setattr(settings, "openai_api_key", "sk-test")
+    monkeypatch.setattr(settings, "openai_max_retries", 1)
+    monkeypatch.setattr(settings, "openai_timeout_seconds", 7.0)
+    try:
+        client = llm_client.get_openai_client()
+        assert client is not None
+        assert llm_client.get_openai_client() is client
+        assert client.max_retries == 1
+        assert client.timeout.read == 7.0
+
+        async def two_lookups():
+            return llm_client.get_async_openai_client(), llm_client.get_async_openai_client()
+
+        first, second = asyncio.run(two_lookups())
+        assert first is second
+        # A new event loop gets its own pool
+        third, _ = asyncio.run(two_lookups())
+        assert third is not first
+    finally:
+        asyncio.run(llm_client.close_llm_clients())
+
+
+def test_replaced_async_client_is_closed_on_its_loop(monkeypatch):
+    monkeypatch.setattr(get_settings(), "openai_api_key", "sk-test")
+    asyncio.run(llm_client.close_llm_clients())
+
+    # A loop that keeps running in another thread (e.g. a worker's)
+    other = asyncio.new_event_loop()
+    thread = threading.Thread(target=other.run_forever, daemon=True)
+    thread.start()
+
+    async def lookup():
+        return llm_client.get_async_openai_client()
+
+    try:
+        old = asyncio.run_coroutine_threadsafe(lookup(), other).result(timeout=5)
+        new = asyncio.run(lookup())
+        assert new is not old
+
+        deadline = time.monotonic() + 5
+        while not old.is_closed() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert old.is_closed()
+        assert not new.is_closed()
+    finally:
+        asyncio.run(llm_client.close_llm_clients())
+        other.call_soon_threadsafe(other.stop)
+        thread.join(timeout=5)
+        other.close()
@@ -0,0 +1,62 @@
+# tests/test_llm_metrics.py
+import json
+import logging
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import call_script_service
+from app.services.llm_metrics import get_llm_metrics
+from app.services.llm_resilience import CircuitBreaker, set_breaker
+
+
+def _client(create):
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def test_calls_fallbacks_and_tokens_are_exposed(monkeypatch, caplog):
+    metrics = get_llm_metrics()
+    metrics.reset()
+    set_breaker("call_script", CircuitBreaker("call_script", failure_threshold=1, cooldown_seconds=60))
+
+    def ok(**kwargs):
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="Hello there"))],
+            usage=SimpleNamespace(prompt_tokens=42, completion_tokens=7),
+        )
+
+    def down(**kwargs):
+        raise ConnectionError("provider down")
+
+    try:
+        with caplog.at_level(logging.INFO, logger="app.llm"):
+            monkeypatch.setattr(call_script_service, "get_openai_client", lambda: _client(ok))
+            assert call_script_service.generate_call_script("Demo") == "Hello there"
+
+            monkeypatch.setattr(call_script_service, "get_openai_client", lambda: _client(down))
+            base = call_script_service.generate_call_script("Demo")
+            # Breaker is open now: no request, straight to the fallback
+            assert call_script_service.generate_call_script("Demo") == base
+
+            monkeypatch.setattr(call_script_service, "get_openai_client", lambda: None)
+            assert call_script_service.generate_call_script("Demo") == base
+
+        data = TestClient(app).get("/metrics/llm").json()
+        site = data["sites"]["call_script"]
+        assert site["calls"] == 2
+        assert sum(site["latency_ms"]["buckets"].values()) == 2
+        assert site["prompt_tokens"] == 42
+        assert site["completion_tokens"] == 7
+        assert site["errors"] == {"ConnectionError": 1}
+        assert site["fallbacks"] == {"llm_error": 1, "circuit_open": 1, "no_client": 1}
+        assert data["circuits"]["call_script"]["state"] == "open"
+
+        lines = [json.loads(r.getMessage()) for r in caplog.records if r.name == "app.llm"]
+        calls = [line for line in lines if line["event"] == "llm_call"]
+        assert calls[0]["site"] == "call_script"
+        assert calls[0]["prompt_tokens"] == 42
+        assert calls[1]["error"] == "ConnectionError"
+    finally:
+        set_breaker("call_script", None)
+        metrics.reset()
@@ -0,0 +1,137 @@
+# tests/test_llm_resilience.py
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import get_settings
+from app.services import constraints_nlp_service as nlp
+from app.services.llm_resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    LLMUnavailable,
+    call_llm,
+    call_llm_async,
+    get_breaker,
+    set_breaker,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_cools_down_and_probes():
+    clock = _Clock()
+    breaker = CircuitBreaker("t", failure_threshold=2, slow_call_seconds=1.0, cooldown_seconds=30, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    # A slow answer counts as a failure too
+    breaker.record_success(elapsed=2.0)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    clock.now = 31
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    # Only one probe at a time
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    clock.now = 62
+    assert breaker.allow()
+    breaker.record_success(elapsed=0.1)
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()["times_opened"] == 2
+
+
+def test_outage_skips_llm_after_threshold(monkeypatch):
+    calls = []
+
+    def failing_create(**kwargs):
+        calls.append(kwargs)
+        raise TimeoutError("provider down")
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=failing_create)))
+    monkeypatch.setattr(nlp, "get_openai_client", lambda: client)
+    monkeypatch.setattr(nlp, "get_constraints_cache", lambda: None)
+    set_breaker("constraints", CircuitBreaker("constraints", failure_threshold=3, cooldown_seconds=60))
+    try:
+        now = datetime(2025, 1, 1, 9, 0, tzinfo=timezone.utc)
+        for _ in range(10):
+            parsed = nlp.parse_natural_language_constraints("next week mornings", now, "UTC")
+            assert parsed.hard_constraints.window_end > now
+
+        # Three real attempts, each with the per-call timeout; then heuristic only
+        assert len(calls) == 3
+        assert calls[0]["timeout"] == get_settings().openai_call_timeout_seconds
+        with pytest.raises(LLMUnavailable):
+            call_llm("constraints", failing_create)
+    finally:
+        set_breaker("constraints", None)
+
+
+def test_hedged_request_wins_when_first_is_slow(monkeypatch):
+    monkeypatch.setattr(get_settings(), "openai_hedge_after_seconds", 0.02)
+    set_breaker("hedge", CircuitBreaker("hedge"))
+    attempts = []
+
+    async def create(**kwargs):
+        attempts.append(kwargs)
+        if len(attempts) == 1:
+            await asyncio.sleep(5)
+            return "slow"
+        return "fast"
+
+    async def scenario():
+        started = asyncio.get_running_loop().time()
+        result = await call_llm_async("hedge", create, model="m")
+        return result, asyncio.get_running_loop().time() - started
+
+    try:
+        result, elapsed = asyncio.run(scenario())
+        assert result == "fast"
+        assert elapsed < 1
+        assert len(attempts) == 2
+        snapshot = get_breaker("hedge").snapshot()
+        assert snapshot["hedges_sent"] == 1
+        assert snapshot["hedges_won"] == 1
+        assert snapshot["state"] == CLOSED
+    finally:
+        set_breaker("hedge", None)
+
+
+def test_cancelled_caller_cancels_the_unhedged_request(monkeypatch):
+    monkeypatch.setattr(get_settings(), "openai_hedge_after_seconds", 5.0)
+    set_breaker("hedge", CircuitBreaker("hedge"))
+    cancelled = []
+
+    async def create(**kwargs):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def scenario():
+        # Caller gives up before the hedge delay
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(call_llm_async("hedge", create, model="m"), 0.02)
+        await asyncio.sleep(0.01)
+        # Checked while the loop still runs (asyncio.run cancels leftovers)
+        assert cancelled == [True]
+
+    try:
+        asyncio.run(scenario())
+        assert get_breaker("hedge").snapshot()["hedges_sent"] == 0
+    finally:
+        set_breaker("hedge", None)
@@ -0,0 +1,67 @@
+# tests/test_query_stats.py
+import logging
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.db.query_stats import (
+    QueryBudgetExceeded,
+    QueryStatsMiddleware,
+    instrument_engine_queries,
+    query_budget,
+)
+from app.db.session import engine, get_db
+
+instrument_engine_queries(engine)
+
+app = FastAPI()
+app.add_middleware(QueryStatsMiddleware)
+
+
+@app.get("/loop/{n}")
+@query_budget(3)
+def loop(n: int, db: Session = Depends(get_db)):
+    # One query per "row": the shape the detector looks for
+    return {"rows": [db.execute(text("SELECT :i"), {"i": i}).scalar() for i in range(n)]}
+
+
+def test_headers_count_statements_and_flag_repeats(monkeypatch, caplog):
+    monkeypatch.setattr(get_settings(), "SQL_QUERY_HEADERS", True)
+    monkeypatch.setattr(get_settings(), "SQL_QUERY_BUDGET_STRICT", False)
+    monkeypatch.setattr(get_settings(), "SQL_N_PLUS_ONE_THRESHOLD", 5)
+
+    with caplog.at_level(logging.WARNING, logger="app.db.query_stats"):
+        resp = TestClient(app).get("/loop/6")
+
+    assert resp.status_code == 200
+    assert resp.headers["x-db-query-count"] == "6"
+    assert float(resp.headers["x-db-time-ms"]) >= 0
+    assert resp.headers["x-db-repeated-statements"] == "1"
+    assert any("Possible N+1 in GET /loop/{n}" in r.getMessage() for r in caplog.records)
+
+
+def test_strict_mode_fails_routes_over_budget(monkeypatch):
+    monkeypatch.setattr(get_settings(), "SQL_QUERY_HEADERS", False)
+    monkeypatch.setattr(get_settings(), "SQL_QUERY_BUDGET_STRICT", True)
+    client = TestClient(app)
+
+    resp = client.get("/loop/3")
+    assert resp.status_code == 200
+    assert "x-db-query-count" not in resp.headers
+
+    with pytest.raises(QueryBudgetExceeded, match=r"GET /loop/\{n\} ran 4 SQL statements \(budget 3\)"):
+        client.get("/loop/4")
+
+
+def test_strict_mode_fails_before_the_response_is_sent(monkeypatch):
+    monkeypatch.setattr(get_settings(), "SQL_QUERY_HEADERS", False)
+    monkeypatch.setattr(get_settings(), "SQL_QUERY_BUDGET_STRICT", True)
+
+    # A client that doesn't re-raise server errors sees what a real one
+    # would: a 500, not a 200 followed by an error in the server log
+    resp = TestClient(app, raise_server_exceptions=False).get("/loop/4")
+    assert resp.status_code == 500
@@ -0,0 +1,65 @@
+# tests/test_startup.py
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.main import app
+from app.models import Base
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Cumulative `python -X importtime` cost of app.main (fastapi + sqlalchemy
+# + pydantic dominate). Wall-clock, so only checked on demand
+# (IMPORT_BUDGET_CHECK=1) on a quiet machine; the lazy-module check below
+# catches an eagerly imported SDK everywhere
+IMPORT_BUDGET_US = 2_500_000
+
+LAZY_MODULES = ("twilio", "openai", "httpx", "aiosqlite")
+
+
+def _import_app_main() -> subprocess.CompletedProcess:
+    code = (
+        "import sys, app.main; "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+
+
+def _cumulative_us(importtime_log: str, module: str) -> int:
+    for line in importtime_log.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise AssertionError(f"{module} not in importtime output")
+
+
+def test_app_import_skips_heavy_sdks():
+    assert _import_app_main().stdout.strip() == ""
+
+
+@pytest.mark.skipif(not os.environ.get("IMPORT_BUDGET_CHECK"), reason="set IMPORT_BUDGET_CHECK=1")
+def test_app_import_fits_budget():
+    assert _cumulative_us(_import_app_main().stderr, "app.main") < IMPORT_BUDGET_US
+
+
+def test_startup_skips_create_all_when_disabled(monkeypatch):
+    calls = []
+    monkeypatch.setattr(Base.metadata, "create_all", lambda **kw: calls.append(kw))
+
+    monkeypatch.setattr(get_settings(), "DB_CREATE_SCHEMA_ON_STARTUP", False)
+    with TestClient(app):
+        pass
+    assert calls == []
+
+    monkeypatch.setattr(get_settings(), "DB_CREATE_SCHEMA_ON_STARTUP", True)
+    with TestClient(app):
+        pass
+    assert len(calls) == 1
@@ -58,3 +58,67 @@ def test_twilio_status_updates_call():
         assert updated.status == "completed"
     finally:
         db2.close()
+
+
+def test_twilio_status_persists_error_fields_and_ignores_unknown_sid():
+    _clean_db()
+    db = SessionLocal()
+    try:
+        call = Call(
+            provider_call_id="CA_TEST_FAILED",
+            status="initiated",
+            direction="outbound",
+        )
+        db.add(call)
+        db.commit()
+    finally:
+        db.close()
+
+    resp = client.post(
+        "/twilio/status",
+        data={
+            "CallSid": "CA_TEST_FAILED",
+            "CallStatus": "failed",
+            "ErrorCode": "13224",
+            "ErrorMessage": "Invalid phone number",
+        },
+    )
+    assert resp.status_code == 200
+
+    # Unknown CallSid: still acknowledged, nothing to update
+    resp = client.post(
+        "/twilio/status",
+        data={"CallSid": "CA_UNKNOWN", "CallStatus": "completed"},
+    )
+    assert resp.status_code == 200
+
+    db2 = SessionLocal()
+    try:
+        updated = db2.query(Call).filter_by(provider_call_id="CA_TEST_FAILED").first()
+        assert updated.status == "failed"
+        assert updated.error_code == "13224"
+        assert updated.error_message == "Invalid phone number"
+        assert db2.query(Call).count() == 1
+    finally:
+        db2.close()
+
+
+def test_twilio_status_sync_path_keeps_status_precedence():
+    _clean_db()
+    db = SessionLocal()
+    try:
+        db.add(Call(provider_call_id="CA_TEST_LATE", status="initiated", direction="outbound"))
+        db.commit()
+    finally:
+        db.close()
+
+    # No lifespan, so no buffer: every callback is written synchronously
+    for status in ("completed", "ringing"):
+        resp = client.post("/twilio/status", data={"CallSid": "CA_TEST_LATE", "CallStatus": status})
+        assert resp.status_code == 200
+
+    db2 = SessionLocal()
+    try:
+        assert db2.query(Call).filter_by(provider_call_id="CA_TEST_LATE").one().status == "completed"
+    finally:
+        db2.close()
@@ -1,7 +1,25 @@
 # tests/test_twilio_voice.py
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
 from fastapi.testclient import TestClient
+from twilio.twiml.voice_response import VoiceResponse
 
 from app.main import app
+from app.config import get_settings
+from app.db.session import SessionLocal, engine
+from app.models import Base, Call, Lead, MeetingRequest, ParticipantAvailability
+from app.routers import twilio_voice as voice_router
+from app.schemas.constraints import HardConstraints
+from app.services.twiml_templates import (
+    ANSWER,
+    ANSWER_SCRIPT,
+    ANSWER_WITH_SCRIPT,
+    GATHER_CONFIRMATION,
+    render_twiml,
+    static_twiml,
+)
 
 client = TestClient(app)
 
@@ -24,3 +42,226 @@ def test_twilio_voice_webhook_basic():
     assert "<Response>" in body
     assert "<Say>" in body
     assert "</Response>" in body
+
+
+def test_twiml_templates_match_sdk_output_and_escape_values():
+    # Filling the template gives byte-for-byte what VoiceResponse would build
+    vr = VoiceResponse()
+    vr.say(
+        "Great. I have recorded that you are available on Monday <A & B>. "
+        "We will confirm the final meeting time shortly. Goodbye."
+    )
+    assert render_twiml(GATHER_CONFIRMATION, "Monday <A & B>") == str(vr).encode()
+
+    assert render_twiml(ANSWER_WITH_SCRIPT, ANSWER_SCRIPT) == static_twiml(ANSWER)
+
+
+def _setup_gather_call(
+    sid: str,
+    window_start: datetime = datetime(2025, 1, 1, 9, 0, tzinfo=timezone.utc),
+    window_end: datetime = datetime(2025, 1, 1, 17, 0, tzinfo=timezone.utc),
+):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    db = SessionLocal()
+    try:
+        lead = Lead(name="Gather Lead", phone="+111111111", timezone="UTC")
+        hc = HardConstraints(
+            window_start=window_start,
+            window_end=window_end,
+            timezone="UTC",
+        )
+        mr = MeetingRequest(
+            owner_id="am-gather",
+            title="Gather",
+            duration_minutes=30,
+            hard_constraints=hc.model_dump(mode="json"),
+        )
+        db.add_all([lead, mr])
+        db.commit()
+        db.add(Call(provider_call_id=sid, lead_id=lead.id, meeting_request_id=mr.id))
+        db.commit()
+        return mr.id, lead.id
+    finally:
+        db.close()
+
+
+def test_gather_answers_within_budget_and_refines_in_background(monkeypatch):
+    mr_id, lead_id = _setup_gather_call("CA_SLOW_LLM")
+
+    async def slow_llm(transcript, hard_constraints, duration_minutes):
+        await asyncio.sleep(0.3)
+        return [(datetime(2025, 1, 1, 14, 0), datetime(2025, 1, 1, 15, 0))]
+
+    monkeypatch.setattr(voice_router, "llm_windows_from_transcript_async", slow_llm)
+    monkeypatch.setattr(get_settings(), "openai_gather_budget_seconds", 0.05)
+
+    def stored_starts():
+        db = SessionLocal()
+        try:
+            return [
+                pa.start_time
+                for pa in db.query(ParticipantAvailability).filter_by(
+                    meeting_request_id=mr_id, lead_id=lead_id
+                )
+            ]
+        finally:
+            db.close()
+
+    # A running lifespan keeps the event loop alive for the background task
+    with TestClient(app) as lifespan_client:
+        started = time.perf_counter()
+        resp = lifespan_client.post(
+            "/twilio/voice/gather",
+            # Nothing the local grammar can resolve, so the LLM is consulted
+            data={"CallSid": "CA_SLOW_LLM", "SpeechResult": "Hmm, whenever suits you best"},
+        )
+        elapsed = time.perf_counter() - started
+
+        assert resp.status_code == 200
+        assert elapsed < 0.3
+        # Deterministic fallback answered first: first slot of the window
+        assert "09:00" in resp.text
+        assert stored_starts() == [datetime(2025, 1, 1, 9, 0)]
+
+        deadline = time.time() + 5
+        while stored_starts() != [datetime(2025, 1, 1, 14, 0)] and time.time() < deadline:
+            time.sleep(0.05)
+
+    assert stored_starts() == [datetime(2025, 1, 1, 14, 0)]
+
+
+def test_late_refinement_does_not_overwrite_a_newer_gather(monkeypatch):
+    mr_id, lead_id = _setup_gather_call("CA_STALE_LLM")
+
+    async def slow_llm(transcript, hard_constraints, duration_minutes):
+        await asyncio.sleep(0.3)
+        return [(datetime(2025, 1, 1, 14, 0), datetime(2025, 1, 1, 15, 0))]
+
+    monkeypatch.setattr(voice_router, "llm_windows_from_transcript_async", slow_llm)
+    monkeypatch.setattr(get_settings(), "openai_gather_budget_seconds", 0.05)
+
+    def stored():
+        db = SessionLocal()
+        try:
+            return [
+                (pa.start_time, pa.source_text)
+                for pa in db.query(ParticipantAvailability).filter_by(
+                    meeting_request_id=mr_id, lead_id=lead_id
+                )
+            ]
+        finally:
+            db.close()
+
+    with TestClient(app) as lifespan_client:
+        lifespan_client.post(
+            "/twilio/voice/gather",
+            data={"CallSid": "CA_STALE_LLM", "SpeechResult": "Hmm, whenever suits you best"},
+        )
+        # The lead answers again (keypad) before the LLM is back
+        lifespan_client.post("/twilio/voice/gather", data={"CallSid": "CA_STALE_LLM", "Digits": "1"})
+        newer = stored()
+        assert [text for _, text in newer] == ["1"]
+
+        # Let the refinement finish; it must leave the newer answer alone
+        deadline = time.time() + 5
+        while voice_router._background_tasks and time.time() < deadline:
+            time.sleep(0.05)
+        assert not voice_router._background_tasks
+
+    assert stored() == newer
+
+
+def test_failed_persist_cancels_the_pending_llm_call(monkeypatch):
+    _setup_gather_call("CA_PERSIST_FAILS")
+    cancelled = []
+
+    async def slow_llm(transcript, hard_constraints, duration_minutes):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    def broken_record(*args, **kwargs):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(voice_router, "llm_windows_from_transcript_async", slow_llm)
+    monkeypatch.setattr(voice_router, "record_availability_for_lead", broken_record)
+    monkeypatch.setattr(get_settings(), "openai_gather_budget_seconds", 0.05)
+
+    with TestClient(app, raise_server_exceptions=False) as lifespan_client:
+        resp = lifespan_client.post(
+            "/twilio/voice/gather",
+            data={"CallSid": "CA_PERSIST_FAILS", "SpeechResult": "Hmm, whenever suits you best"},
+        )
+        assert resp.status_code == 500
+        deadline = time.time() + 2
+        while not cancelled and time.time() < deadline:
+            time.sleep(0.01)
+        assert cancelled == [True]
+        assert not voice_router._background_tasks
+
+
+def test_gather_uses_local_grammar_without_llm(monkeypatch):
+    # Next Monday 09:00 → Friday 17:00 (UTC); "Wednesday" resolves inside it
+    today = datetime.now(timezone.utc).date()
+    monday = today + timedelta(days=7 - today.weekday())
+    wednesday = datetime(monday.year, monday.month, monday.day) + timedelta(days=2)
+    mr_id, lead_id = _setup_gather_call(
+        "CA_GRAMMAR",
+        window_start=datetime.combine(monday, datetime.min.time(), timezone.utc)
+        + timedelta(hours=9),
+        window_end=datetime.combine(monday, datetime.min.time(), timezone.utc)
+        + timedelta(days=4, hours=17),
+    )
+
+    async def no_llm(*args, **kwargs):
+        raise AssertionError("LLM called for a confidently parsed answer")
+
+    monkeypatch.setattr(voice_router, "llm_windows_from_transcript_async", no_llm)
+
+    resp = client.post(
+        "/twilio/voice/gather",
+        data={"CallSid": "CA_GRAMMAR", "SpeechResult": "Wednesday at 2 pm or after 4"},
+    )
+    assert resp.status_code == 200
+    assert "14:00" in resp.text
+
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(ParticipantAvailability)
+            .filter_by(meeting_request_id=mr_id, lead_id=lead_id)
+            .order_by(ParticipantAvailability.start_time)
+            .all()
+        )
+        # "or after 4" joins the same Wednesday clause
+        assert [(r.start_time, r.end_time) for r in rows] == [
+            (wednesday + timedelta(hours=14), wednesday + timedelta(hours=14, minutes=30)),
+            (wednesday + timedelta(hours=16), wednesday + timedelta(hours=18)),
+        ]
+    finally:
+        db.close()
+
+
+def test_shutdown_drains_background_refinements():
+    finished = []
+
+    async def quick():
+        await asyncio.sleep(0.01)
+        finished.append("quick")
+
+    async def stuck():
+        await asyncio.sleep(60)
+        finished.append("stuck")
+
+    async def scenario():
+        voice_router._spawn_background(quick())
+        voice_router._spawn_background(stuck())
+        return await voice_router.drain_background_tasks(timeout=0.2)
+
+    assert asyncio.run(scenario()) == 1
+    assert finished == ["quick"]
+    assert not voice_router._background_tasks
@@ -0,0 +1,139 @@
+# tests/test_webhook_idempotency.py
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+
+from app.config import get_settings
+from app.main import app
+from app.db.session import SessionLocal, engine
+from app.models import Base, Call, Lead, MeetingRequest, WebhookResponse
+from app.routers import twilio_voice as voice_router
+from app.schemas.constraints import HardConstraints
+from app.services.webhook_idempotency import (
+    WebhookIdempotency,
+    get_webhook_idempotency,
+    run_purge_periodically,
+    webhook_key,
+)
+
+client = TestClient(app)
+
+
+def _clean_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def test_duplicate_gather_replays_first_response(monkeypatch):
+    _clean_db()
+    get_webhook_idempotency().clear()
+
+    db = SessionLocal()
+    try:
+        lead = Lead(name="Dup Lead", phone="+122222222", timezone="UTC")
+        hc = HardConstraints(
+            window_start=datetime(2025, 1, 1, 9, 0, tzinfo=timezone.utc),
+            window_end=datetime(2025, 1, 1, 17, 0, tzinfo=timezone.utc),
+            timezone="UTC",
+        )
+        mr = MeetingRequest(
+            owner_id="am-dup",
+            title="Dup",
+            duration_minutes=30,
+            hard_constraints=hc.model_dump(mode="json"),
+        )
+        db.add_all([lead, mr])
+        db.commit()
+        db.add(Call(provider_call_id="CA_DUP", lead_id=lead.id, meeting_request_id=mr.id))
+        db.commit()
+    finally:
+        db.close()
+
+    recorded = []
+    original = voice_router.record_availability_for_lead
+
+    def counting_record(*args, **kwargs):
+        recorded.append(args)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(voice_router, "record_availability_for_lead", counting_record)
+
+    payload = {"CallSid": "CA_DUP", "Digits": "1"}
+    first = client.post("/twilio/voice/gather", data=payload)
+    second = client.post("/twilio/voice/gather", data=payload)
+
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+    assert second.headers["content-type"].startswith("application/xml")
+    assert len(recorded) == 1
+
+    # A different input on the same call is a new gather, not a retry
+    third = client.post("/twilio/voice/gather", data={"CallSid": "CA_DUP", "Digits": "2"})
+    assert third.status_code == 200
+    assert len(recorded) == 2
+
+
+def test_shared_backend_replays_across_instances():
+    _clean_db()
+    key = webhook_key("CA_SHARED", "voice/gather", [("Digits", "1"), ("CallSid", "CA_SHARED")])
+    assert key == webhook_key(
+        "CA_SHARED", "voice/gather", [("CallSid", "CA_SHARED"), ("Digits", "1")]
+    )
+
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        return Response(content=b"<Response/>", media_type="application/xml")
+
+    async def scenario():
+        # Two workers: separate memory tiers, one shared table
+        worker_a = WebhookIdempotency(session_factory=SessionLocal)
+        worker_b = WebhookIdempotency(session_factory=SessionLocal)
+        first = await worker_a.run(
+            key=key, endpoint="voice/gather", call_sid="CA_SHARED", handler=handler
+        )
+        second = await worker_b.run(
+            key=key, endpoint="voice/gather", call_sid="CA_SHARED", handler=handler
+        )
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first.body == second.body == b"<Response/>"
+    assert len(calls) == 1
+
+    db = SessionLocal()
+    try:
+        assert db.query(WebhookResponse).filter_by(provider_call_id="CA_SHARED").count() == 1
+    finally:
+        db.close()
+
+
+def test_periodic_purge_removes_expired_shared_responses():
+    _clean_db()
+    db = SessionLocal()
+    try:
+        old = datetime.utcnow() - timedelta(seconds=get_settings().WEBHOOK_IDEMPOTENCY_TTL_SECONDS + 1)
+        db.add_all([
+            WebhookResponse(key="old", endpoint="gather", body=b"<Response/>", media_type="text/xml", created_at=old),
+            WebhookResponse(key="new", endpoint="gather", body=b"<Response/>", media_type="text/xml"),
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+    async def scenario():
+        task = asyncio.create_task(run_purge_periodically(SessionLocal, 0.01))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+    db = SessionLocal()
+    try:
+        assert [r.key for r in db.query(WebhookResponse).all()] == ["new"]
+    finally:
+        db.close()